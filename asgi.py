@@ -0,0 +1,10 @@
+"""
+ASGI entry point for HTTPilot application.
+Used for deployment with ASGI servers like Uvicorn: uvicorn asgi:app
+"""
+
+from src.asgi import create_asgi_app
+import os
+
+# Create the ASGI application
+app = create_asgi_app(os.environ.get('FLASK_ENV', 'production'))
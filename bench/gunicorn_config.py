@@ -0,0 +1,221 @@
+"""
+Compare gunicorn worker settings under HTTPilot's mixed workload.
+
+Each configuration starts gunicorn with ``gunicorn.conf.py`` (settings
+passed through its environment variables), keeps ``--slow`` clients busy
+on ``/drip``, ``/delay`` and a slow ``/range`` (both admission classes)
+and meanwhile measures throughput and latency
+of cheap requests (``/get``, ``/health``, ``/json``). The memory of the
+server process tree is recorded after startup, as RSS and as PSS (pages
+shared between processes split among them); only PSS shows what
+``preload_app`` saves.
+
+Needs gunicorn (and uvicorn for the ``uvicorn`` row).
+
+Usage:
+    python -m bench.gunicorn_config [--configs default,sync,gthread-4,...]
+                                    [--duration 10] [--concurrency 16]
+                                    [--slow 24] [--output FILE]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.histogram import Histogram  # noqa: E402
+from bench.idle import process_tree, tree_usage  # noqa: E402
+from bench.load import (  # noqa: E402
+    RESULTS_DIR,
+    Worker,
+    free_port,
+    git_revision,
+    run_family,
+    wait_ready,
+)
+
+CHEAP = [
+    ("GET", "/get?a=1", None, {}),
+    ("GET", "/health", None, {}),
+    ("GET", "/json", None, {}),
+]
+SLOW = [
+    ("GET", "/drip?duration=2&numbytes=4", None, {}),
+    ("GET", "/delay/1", None, {}),
+    ("GET", "/range/1024?duration=2&chunk_size=256", None, {}),
+]
+
+# gunicorn's own defaults, which HTTPilot ran with before gunicorn.conf.py
+# set any: one sync worker, 30s timeouts, no preloading.
+PREVIOUS = {
+    "GUNICORN_WORKER_CLASS": "sync",
+    "WEB_CONCURRENCY": "1",
+    "GUNICORN_PRELOAD": "0",
+    "GUNICORN_CMD_ARGS": "--keep-alive 2 --timeout 30 --graceful-timeout 30",
+}
+
+# name: (environment for gunicorn.conf.py, required module)
+CONFIGS = {
+    "default": ({}, "gunicorn"),
+    "previous": (PREVIOUS, "gunicorn"),
+    "sync": ({"GUNICORN_WORKER_CLASS": "sync"}, "gunicorn"),
+    "gthread-4": ({"GUNICORN_THREADS": "4"}, "gunicorn"),
+    "gthread-8": ({"GUNICORN_THREADS": "8"}, "gunicorn"),
+    "gthread-16": ({"GUNICORN_THREADS": "16"}, "gunicorn"),
+    "preload-4w": ({"WEB_CONCURRENCY": "4"}, "gunicorn"),
+    "no-preload-4w": ({"WEB_CONCURRENCY": "4", "GUNICORN_PRELOAD": "0"}, "gunicorn"),
+    "uvicorn": ({"GUNICORN_WORKER_CLASS": "uvicorn"}, "uvicorn"),
+}
+
+
+def tree_pss(pid):
+    """Return the proportional set size of the process tree in bytes (Linux)."""
+    pss = 0
+    for member in process_tree(pid):
+        try:
+            with open(f"/proc/{member}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        pss += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return pss
+
+
+def start(port, overrides):
+    env = dict(
+        os.environ,
+        FLASK_ENV="production",
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        **overrides,
+    )
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=log,
+    )
+    process.log = log
+    return process
+
+
+def measure(overrides, concurrency, slow, duration, warmup):
+    port = free_port()
+    process = start(port, overrides)
+    try:
+        wait_ready("127.0.0.1", port, process)
+        time.sleep(1)  # let every worker finish booting
+        rss, threads = tree_usage(process.pid)
+        pss = tree_pss(process.pid)
+
+        deadline = time.perf_counter() + warmup + duration + 2
+        slow_workers = [
+            Worker("127.0.0.1", port, SLOW, deadline, offset) for offset in range(slow)
+        ]
+        for worker in slow_workers:
+            worker.start()
+        cheap = run_family("127.0.0.1", port, CHEAP, concurrency, duration, warmup)
+        for worker in slow_workers:
+            worker.join()
+    finally:
+        process.terminate()
+        process.wait(30)
+
+    slow_histogram = Histogram()
+    slow_statuses = {}
+    for worker in slow_workers:
+        slow_histogram.merge(worker.histogram)
+        for status, count in worker.statuses.items():
+            slow_statuses[str(status)] = slow_statuses.get(str(status), 0) + count
+    return {
+        "env": overrides,
+        "rss": rss,
+        "pss": pss,
+        "threads": threads,
+        "cheap": cheap,
+        "slow": {
+            "completed": slow_histogram.total,
+            "statuses": slow_statuses,
+            "errors": sum(worker.errors for worker in slow_workers),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--configs", default=",".join(CONFIGS))
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--slow", type=int, default=24)
+    parser.add_argument("--output", help="results file (default: bench/results/)")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.configs.split(",") if name.strip()]
+    unknown = set(names) - set(CONFIGS)
+    if unknown:
+        parser.error(f"unknown configs: {', '.join(sorted(unknown))}")
+    if importlib.util.find_spec("gunicorn") is None:
+        parser.error("gunicorn is not installed")
+
+    results = {
+        "meta": {
+            "date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "concurrency": args.concurrency,
+            "slow_clients": args.slow,
+            "duration": args.duration,
+        },
+        "configs": {},
+    }
+    print(
+        f"{args.concurrency} cheap + {args.slow} slow connections, {args.duration}s each"
+    )
+    print(
+        f"{'config':<14}{'rps':>8}{'p50':>11}{'p99':>11}{'errors':>8}"
+        f"{'slow ok':>9}{'slow 503':>9}{'RSS MiB':>9}{'PSS MiB':>9}"
+    )
+    for name in names:
+        overrides, module = CONFIGS[name]
+        if importlib.util.find_spec(module) is None:
+            print(f"{name:<14}{module} not installed, skipped")
+            continue
+        result = measure(overrides, args.concurrency, args.slow, args.duration, args.warmup)
+        results["configs"][name] = result
+        cheap, slow = result["cheap"], result["slow"]
+        latency = cheap["latency_us"]
+        print(
+            f"{name:<14}{cheap['rps']:>8.0f}"
+            f"{latency['p50'] / 1000:>9.1f}ms{latency['p99'] / 1000:>9.1f}ms"
+            f"{cheap['errors']:>8}{slow['statuses'].get('200', 0):>9}"
+            f"{slow['statuses'].get('503', 0):>9}{result['rss'] / 2**20:>9.1f}"
+            f"{result['pss'] / 2**20:>9.1f}"
+        )
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"gunicorn-{stamp}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
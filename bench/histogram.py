@@ -0,0 +1,76 @@
+"""
+Log-linear latency histogram in the style of HdrHistogram.
+
+Values (microseconds) are counted in buckets that double in width every
+``sub_buckets`` buckets, so the relative error stays below
+``1 / sub_buckets`` from 1us up to hours with a few thousand counters.
+"""
+
+
+class Histogram:
+    """Fixed relative-precision histogram of non-negative integers."""
+
+    def __init__(self, sub_buckets=128):
+        # sub_buckets must be a power of two
+        self.sub_buckets = sub_buckets
+        self.shift = sub_buckets.bit_length() - 1
+        self.counts = {}
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.sum = 0
+
+    def _index(self, value):
+        exponent = max(0, value.bit_length() - self.shift - 1)
+        return (exponent << self.shift) + (value >> exponent)
+
+    def _lowest(self, index):
+        exponent = index >> self.shift
+        sub = index & (self.sub_buckets - 1)
+        if exponent:
+            sub += self.sub_buckets
+            exponent -= 1
+        return sub << exponent
+
+    def record(self, value):
+        value = max(0, int(value))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, p):
+        """Return the lowest value of the bucket holding the p-th percentile."""
+        if not self.total:
+            return 0
+        rank = max(1, round(p / 100 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._lowest(index), self.max)
+        return self.max
+
+    def summary(self):
+        """Return count, mean and the usual percentiles in microseconds."""
+        return {
+            "count": self.total,
+            "mean": round(self.sum / self.total, 1) if self.total else 0,
+            "min": self.min or 0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max,
+        }
@@ -0,0 +1,244 @@
+"""
+Idle connection benchmark: how many slow streams a server holds, and at what memory cost.
+
+Opens N connections that each request a slow ``/drip`` (one byte per
+second), waits for them to settle, then counts how many got a response
+and measures the resident memory and threads of the server process tree.
+Compares the ASGI entry point under uvicorn with gunicorn sync workers
+(or Werkzeug's threaded server when gunicorn is not installed).
+
+Usage:
+    python -m bench.idle [--servers uvicorn,gunicorn-sync,werkzeug]
+                         [--connections 500] [--workers 2] [--settle 5]
+                         [--output FILE]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import resource
+import select
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.load import RESULTS_DIR, free_port, git_revision, wait_ready  # noqa: E402
+
+SERVERS = ("uvicorn", "gunicorn-sync", "werkzeug")
+
+
+def available(kind):
+    module = {"uvicorn": "uvicorn", "gunicorn-sync": "gunicorn"}.get(kind)
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def start_server(kind, port, workers):
+    """Start HTTPilot under kind and return ``(process, description)``."""
+    if kind == "uvicorn":
+        cmd = [
+            sys.executable, "-m", "uvicorn", "asgi:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning", "--no-access-log",
+        ]
+        description = f"uvicorn asgi {workers} workers"
+    elif kind == "gunicorn-sync":
+        cmd = [
+            sys.executable, "-m", "gunicorn",
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers),
+            "--worker-class", "sync",
+            "--timeout", "120",
+            "--log-level", "warning",
+            "wsgi:app",
+        ]
+        description = f"gunicorn sync {workers} workers"
+    else:
+        cmd = [sys.executable, "-m", "bench.server", "--port", str(port)]
+        description = "werkzeug threaded"
+
+    # Measure what the server itself can hold, not the admission limits.
+    env = dict(os.environ, FLASK_ENV="production", ADMISSION_CONTROL="0")
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=log
+    )
+    process.log = log
+    return process, description
+
+
+def process_tree(pid):
+    """Return pid and all its descendants (Linux /proc)."""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        parents.setdefault(ppid, []).append(int(entry))
+    tree, todo = [], [pid]
+    while todo:
+        current = todo.pop()
+        tree.append(current)
+        todo.extend(parents.get(current, ()))
+    return tree
+
+
+def tree_usage(pid):
+    """Return ``(rss_bytes, threads)`` summed over the process tree."""
+    rss = threads = 0
+    for member in process_tree(pid):
+        try:
+            with open(f"/proc/{member}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss += int(line.split()[1]) * 1024
+                    elif line.startswith("Threads:"):
+                        threads += int(line.split()[1])
+        except OSError:
+            continue
+    return rss, threads
+
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+
+def open_streams(port, count, hold):
+    """Open count connections each asking for a slow drip."""
+    request = (
+        f"GET /drip?duration={hold}&numbytes={hold} HTTP/1.1\r\n"
+        "Host: 127.0.0.1\r\n\r\n"
+    ).encode()
+    sockets, failed = [], 0
+    for _ in range(count):
+        sock = socket.socket()
+        sock.settimeout(2)
+        try:
+            sock.connect(("127.0.0.1", port))
+            sock.sendall(request)
+        except OSError:
+            failed += 1
+            sock.close()
+            continue
+        sock.setblocking(False)
+        sockets.append(sock)
+    return sockets, failed
+
+
+def count_served(sockets, settle):
+    """Return how many sockets got a 200 response within settle seconds."""
+    served = set()
+    deadline = time.monotonic() + settle
+    pending = list(sockets)
+    while pending and time.monotonic() < deadline:
+        readable, _, _ = select.select(pending, [], [], 0.2)
+        for sock in readable:
+            try:
+                data = sock.recv(65536)
+            except OSError:
+                data = b""
+            if data.startswith((b"HTTP/1.1 200", b"HTTP/1.0 200")):
+                served.add(sock)
+            pending.remove(sock)
+    return len(served)
+
+
+def measure(kind, connections, workers, settle):
+    port = free_port()
+    process, description = start_server(kind, port, workers)
+    try:
+        wait_ready("127.0.0.1", port, process)
+        rss_before, threads_before = tree_usage(process.pid)
+        hold = int(settle) + 30
+        sockets, failed = open_streams(port, connections, hold)
+        served = count_served(sockets, settle)
+        rss_after, threads_after = tree_usage(process.pid)
+        for sock in sockets:
+            sock.close()
+    finally:
+        process.terminate()
+        process.wait(10)
+
+    return {
+        "server": description,
+        "connections": connections,
+        "connect_failed": failed,
+        "served": served,
+        "rss_before": rss_before,
+        "rss_after": rss_after,
+        "rss_per_connection": round((rss_after - rss_before) / served) if served else None,
+        "threads_before": threads_before,
+        "threads_after": threads_after,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--servers", default=",".join(SERVERS))
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--settle", type=float, default=5.0)
+    parser.add_argument("--output", help="results file (default: bench/results/)")
+    args = parser.parse_args()
+
+    if not os.path.isdir("/proc"):
+        parser.error("memory is read from /proc, run this on Linux")
+    kinds = [k.strip() for k in args.servers.split(",") if k.strip()]
+    unknown = set(kinds) - set(SERVERS)
+    if unknown:
+        parser.error(f"unknown servers: {', '.join(sorted(unknown))}")
+
+    raise_fd_limit(args.connections * 2 + 256)
+    results = {
+        "meta": {
+            "date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "servers": {},
+    }
+    print(f"{args.connections} slow /drip connections, {args.settle}s to settle")
+    print(f"{'server':<28}{'served':>8}{'failed':>8}{'threads':>9}{'RSS MiB':>9}{'KiB/conn':>10}")
+    for kind in kinds:
+        if not available(kind):
+            print(f"{kind:<28}not installed, skipped")
+            continue
+        result = measure(kind, args.connections, args.workers, args.settle)
+        results["servers"][kind] = result
+        per_connection = result["rss_per_connection"]
+        print(
+            f"{result['server']:<28}{result['served']:>8}{result['connect_failed']:>8}"
+            f"{result['threads_after']:>9}{result['rss_after'] / 2**20:>9.1f}"
+            f"{per_connection / 1024 if per_connection else 0:>10.1f}"
+        )
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"idle-{stamp}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
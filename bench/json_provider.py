@@ -0,0 +1,139 @@
+"""
+Compare JSON providers on the echo routes.
+
+Usage: python -m bench.json_provider [--requests N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+
+from src import json_provider
+from src.app import create_app
+
+ECHO_ROUTES = [
+    ("GET", "/get?param1=value1&param2=value2", None),
+    ("POST", "/post", {"key": "value", "items": list(range(20))}),
+    ("GET", "/headers", None),
+    ("GET", "/cookies", None),
+    ("GET", "/uuid", None),
+    ("GET", "/json", None),
+]
+
+HEADERS = {
+    "User-Agent": "httpilot-bench/1.0",
+    "Accept": "application/json",
+    "Cookie": "session=abc123; theme=dark; lang=en",
+}
+
+
+def make_app(provider):
+    """Create a production-like app using the named JSON provider."""
+    app = create_app("testing")
+    app.debug = False
+
+    if provider == "flask-default":
+        app.json = DefaultJSONProvider(app)
+    elif provider == "flask-pretty":
+        app.json = DefaultJSONProvider(app)
+        app.json.compact = False
+    return app
+
+
+def run(app, method, path, body, requests):
+    """Return requests per second for one route."""
+    client = app.test_client()
+    kwargs = {"headers": HEADERS}
+    if body is not None:
+        kwargs["json"] = body
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.open(path, method=method, **kwargs)
+    return requests / (time.perf_counter() - start)
+
+
+def serialize(app, payload, requests):
+    """Return serializations per second of payload by app.json.response."""
+    with app.test_request_context("/get", headers=HEADERS):
+        start = time.perf_counter()
+        for _ in range(requests):
+            app.json.response(payload)
+        return requests / (time.perf_counter() - start)
+
+
+def with_provider(provider, fn, *args):
+    """Call fn(app, *args) with an app using the named provider."""
+    orjson = json_provider.orjson
+    if provider == "stdlib":
+        json_provider.orjson = None
+    try:
+        return fn(make_app(provider), *args)
+    finally:
+        json_provider.orjson = orjson
+
+
+def request_payload():
+    """Return a /post-sized echo payload."""
+    app = create_app("testing")
+    with app.test_request_context(
+        "/post?param1=value1&param2=value2", method="POST", headers=HEADERS
+    ):
+        from src.routes.http_methods import get_request_info
+
+        info = dict(get_request_info())
+        info["json"] = {"key": "value", "items": list(range(20))}
+        return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    providers = ["flask-pretty", "flask-default", "stdlib"]
+    if json_provider.orjson is not None:
+        providers.append("orjson")
+
+    # Interleave providers and keep the best round to damp machine noise.
+    results = {p: [0.0] * len(ECHO_ROUTES) for p in providers}
+    for _ in range(args.rounds):
+        for provider in providers:
+            for i, (method, path, body) in enumerate(ECHO_ROUTES):
+                rps = with_provider(provider, run, method, path, body, args.requests)
+                results[provider][i] = max(results[provider][i], rps)
+
+    width = max(len(path) for _, path, _ in ECHO_ROUTES)
+    print("End-to-end through the test client:")
+    print(f"{'route':<{width + 5}}" + "".join(f"{p:>15}" for p in providers))
+    for i, (method, path, _) in enumerate(ECHO_ROUTES):
+        row = "".join(f"{results[p][i]:>11.0f} rps" for p in providers)
+        print(f"{method:<5}{path:<{width}}{row}")
+
+    baseline = results["flask-default"]
+    for provider in providers:
+        gain = sum(r / b for r, b in zip(results[provider], baseline)) / len(baseline)
+        print(f"  {provider}: {gain:.2f}x mean throughput vs flask-default")
+
+    payload = request_payload()
+    print("\nSerialization of a /post echo payload:")
+    serialized = {
+        p: max(
+            with_provider(p, serialize, payload, args.requests * 5)
+            for _ in range(args.rounds)
+        )
+        for p in providers
+    }
+    for provider in providers:
+        gain = serialized[provider] / serialized["flask-default"]
+        print(f"  {provider:<15}{serialized[provider]:>10.0f} ops/s  {gain:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
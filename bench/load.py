@@ -0,0 +1,384 @@
+"""
+HTTP load benchmark for HTTPilot under a real server.
+
+Starts HTTPilot on localhost (gunicorn when installed, otherwise Werkzeug's
+threaded server), drives each endpoint family with concurrent keep-alive
+connections and records latency percentiles and requests per second.
+Results are written as JSON and can be compared against a baseline.
+
+Usage:
+    python -m bench.load [--families a,b] [--duration S] [--concurrency N]
+                         [--server auto|gunicorn|werkzeug] [--url URL]
+                         [--output FILE] [--baseline FILE] [--threshold 0.1]
+                         [--save-baseline]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.histogram import Histogram  # noqa: E402
+
+BASELINE = os.path.join(ROOT, "bench", "baseline.json")
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+
+MULTIPART = (
+    b"--bench\r\n"
+    b'Content-Disposition: form-data; name="file"; filename="a.bin"\r\n'
+    b"Content-Type: application/octet-stream\r\n\r\n" + b"x" * 4096 + b"\r\n"
+    b"--bench--\r\n"
+)
+
+# (method, path, body, extra headers) per endpoint family
+FAMILIES = {
+    "http_methods": [
+        ("GET", "/get?a=1&b=2", None, {}),
+        ("POST", "/post", b'{"key": "value"}', {"Content-Type": "application/json"}),
+        ("PUT", "/put", b"a=1&b=2", {"Content-Type": "application/x-www-form-urlencoded"}),
+        ("PATCH", "/patch", b"x" * 1024, {}),
+        ("DELETE", "/delete", None, {}),
+    ],
+    "status_codes": [
+        ("GET", "/status/200", None, {}),
+        ("GET", "/status/404", None, {}),
+        ("POST", "/status/201", None, {}),
+    ],
+    "request_inspect": [
+        ("GET", "/headers", None, {}),
+        ("GET", "/ip", None, {}),
+        ("GET", "/user-agent", None, {}),
+    ],
+    "response_inspect": [
+        ("GET", "/response-headers?X-Bench=1", None, {}),
+        ("GET", "/response-headers?X-Bench=1&X-Bench=2&Cache-Control=no-cache", None, {}),
+        ("POST", "/response-headers?X-Bench=1", None, {}),
+    ],
+    "response_format": [
+        ("GET", "/json", None, {}),
+        ("GET", "/xml", None, {}),
+        ("GET", "/html", None, {}),
+        ("GET", "/gzip", None, {}),
+        ("GET", "/deflate", None, {}),
+        ("GET", "/brotli", None, {}),
+        ("GET", "/robots.txt", None, {}),
+        ("GET", "/encoding/utf8", None, {}),
+    ],
+    "dynamic_data": [
+        ("GET", "/uuid", None, {}),
+        ("GET", "/base64/encoding/aHR0cGlsb3Q", None, {}),
+        ("GET", "/bytes/1024", None, {}),
+        ("GET", "/stream/10", None, {}),
+        ("GET", "/stream-bytes/4096", None, {}),
+        ("GET", "/drip?duration=0&numbytes=10", None, {}),
+        ("GET", "/links/10/2", None, {}),
+        ("GET", "/range/4096", None, {"Range": "bytes=0-1023"}),
+    ],
+    "cookies": [
+        ("GET", "/cookies", None, {"Cookie": "a=1; b=2"}),
+        ("GET", "/cookies/set?a=1", None, {}),
+    ],
+    "cache": [
+        ("GET", "/cache", None, {}),
+        ("GET", "/cache", None, {"If-None-Match": "*"}),
+        ("GET", "/cache/60", None, {}),
+        ("GET", "/etag/abc", None, {"If-None-Match": '"abc"'}),
+    ],
+    "redirect": [
+        ("GET", "/redirect/1", None, {}),
+        ("GET", "/relative-redirect/1", None, {}),
+        ("GET", "/absolute-redirect/1", None, {}),
+    ],
+    "image": [
+        ("GET", "/image/png", None, {}),
+        ("GET", "/image/svg", None, {}),
+        ("GET", "/image", None, {"Accept": "image/webp"}),
+    ],
+    "upload": [
+        ("POST", "/sink", b"x" * 65536, {}),
+        (
+            "POST",
+            "/upload",
+            MULTIPART,
+            {"Content-Type": "multipart/form-data; boundary=bench"},
+        ),
+    ],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def have_gunicorn():
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def start_server(kind, port, workers, threads):
+    """Start HTTPilot in a subprocess and return ``(process, description)``."""
+    if kind == "auto":
+        kind = "gunicorn" if have_gunicorn() else "werkzeug"
+
+    env = dict(os.environ, FLASK_ENV="production")
+    if kind == "gunicorn":
+        cmd = [
+            sys.executable, "-m", "gunicorn",
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers),
+            "--threads", str(threads),
+            "--worker-class", "gthread",
+            "--log-level", "warning",
+            "wsgi:app",
+        ]
+        description = f"gunicorn gthread {workers}x{threads}"
+    else:
+        cmd = [sys.executable, "-m", "bench.server", "--port", str(port)]
+        description = "werkzeug threaded"
+
+    # Server output goes to a file: an unread pipe would fill up and block it.
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=log
+    )
+    process.log = log
+    return process, description
+
+
+def server_log(process):
+    process.log.seek(0)
+    return process.log.read().decode("utf-8", "replace")
+
+
+def wait_ready(host, port, process=None, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"server exited:\n{server_log(process)}")
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on {host}:{port} did not become ready")
+
+
+class Worker(threading.Thread):
+    """One keep-alive connection sending a family's requests in a loop."""
+
+    def __init__(self, host, port, requests, deadline, offset):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.requests = requests
+        self.deadline = deadline
+        self.offset = offset
+        self.histogram = Histogram()
+        self.errors = 0
+        self.statuses = {}
+
+    def connect(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def run(self):
+        conn = self.connect()
+        requests = self.requests
+        i = self.offset
+        clock = time.perf_counter
+        while clock() < self.deadline:
+            method, path, body, headers = requests[i % len(requests)]
+            i += 1
+            start = clock()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = self.connect()
+                continue
+            self.histogram.record((clock() - start) * 1e6)
+            status = response.status
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if status >= 500:
+                self.errors += 1
+            if response.will_close:
+                conn.close()
+                conn = self.connect()
+        conn.close()
+
+
+def run_family(host, port, requests, concurrency, duration, warmup):
+    """Drive one family and return its results."""
+    if warmup:
+        run_family(host, port, requests, concurrency, warmup, 0)
+
+    start = time.perf_counter()
+    deadline = start + duration
+    workers = [
+        Worker(host, port, requests, deadline, offset)
+        for offset in range(concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    histogram = Histogram()
+    statuses = {}
+    for worker in workers:
+        histogram.merge(worker.histogram)
+        for status, count in worker.statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+
+    return {
+        "rps": round(histogram.total / elapsed, 1),
+        "errors": sum(worker.errors for worker in workers),
+        "statuses": {str(s): c for s, c in sorted(statuses.items())},
+        "latency_us": histogram.summary(),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions of results against baseline."""
+    regressions = []
+    for family, current in results["families"].items():
+        previous = baseline.get("families", {}).get(family)
+        if previous is None:
+            continue
+        if current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(
+                f"{family}: {current['rps']} rps vs {previous['rps']} in baseline"
+            )
+        p99, old_p99 = current["latency_us"]["p99"], previous["latency_us"]["p99"]
+        if old_p99 and p99 > old_p99 * (1 + threshold):
+            regressions.append(f"{family}: p99 {p99}us vs {old_p99}us in baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--families", default=",".join(FAMILIES))
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--server", choices=["auto", "gunicorn", "werkzeug"], default="auto")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--url", help="benchmark a running server instead")
+    parser.add_argument("--output", help="results file (default: bench/results/)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    families = [f.strip() for f in args.families.split(",") if f.strip()]
+    unknown = set(families) - set(FAMILIES)
+    if unknown:
+        parser.error(f"unknown families: {', '.join(sorted(unknown))}")
+
+    process = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+        server = args.url
+    else:
+        host, port = "127.0.0.1", free_port()
+        process, server = start_server(args.server, port, args.workers, args.threads)
+
+    try:
+        wait_ready(host, port, process)
+        results = {
+            "meta": {
+                "date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "revision": git_revision(),
+                "server": server,
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+            },
+            "families": {},
+        }
+        print(f"{server}, {args.concurrency} connections, {args.duration}s per family")
+        print(f"{'family':<18}{'rps':>10}{'p50':>9}{'p99':>9}{'p999':>9}{'errors':>8}")
+        for family in families:
+            result = run_family(
+                host, port, FAMILIES[family], args.concurrency, args.duration, args.warmup
+            )
+            results["families"][family] = result
+            latency = result["latency_us"]
+            print(
+                f"{family:<18}{result['rps']:>10.0f}"
+                f"{latency['p50'] / 1000:>7.2f}ms{latency['p99'] / 1000:>7.2f}ms"
+                f"{latency['p999'] / 1000:>7.2f}ms{result['errors']:>8}"
+            )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(10)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"load-{stamp}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"regressions beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""
+Micro-benchmarks of fast lane routes, answered from the table and through Flask.
+"""
+
+import pytest
+
+from config import TestingConfig
+
+PATHS = ["/health", "/robots.txt", "/json"]
+
+
+@pytest.fixture(params=[True, False], ids=["fast_lane", "flask"])
+def app(request, monkeypatch):
+    monkeypatch.setattr(TestingConfig, "FAST_LANE", request.param)
+    return request.getfixturevalue("app")
+
+
+@pytest.mark.parametrize("path", PATHS)
+def bench_fast_lane(client, bench, path):
+    """GET a fast lane route and read the whole body."""
+
+    def call():
+        response = client.get(path)
+        response.get_data()
+        response.close()
+
+    bench(call)
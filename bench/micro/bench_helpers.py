@@ -0,0 +1,95 @@
+"""
+Micro-benchmarks for hot helpers called on most requests.
+"""
+
+import pytest
+from flask import Response
+
+from src.routes import cookies, dynamic_data, filters, redirect, utils
+from src.routes.http_methods import get_request_info
+from src.routes.status_codes import status_code
+
+parse_request_range = getattr(dynamic_data, "__parse_request_range")
+
+PAYLOAD = b'{"message": "Get encoded data", "timestamp": "2024-01-01T00:00:00Z"}' * 8
+
+
+def bench_get_request_info(app, bench):
+    """Build and fully materialize the common request info."""
+    with app.test_request_context(
+        "/get?a=1&b=2", headers={"User-Agent": "bench", "Accept": "*/*"}
+    ):
+        bench(lambda: dict(get_request_info()))
+
+
+@pytest.mark.parametrize("name", ["utcnow", "http_date"])
+def bench_clock(bench, name):
+    """Format the current time from the shared clock."""
+    bench(getattr(utils, name))
+
+
+@pytest.mark.parametrize("code", [200, 302, 418])
+def bench_status_code(app, bench, code):
+    """Build the response for a status code."""
+    with app.test_request_context(f"/status/{code}"):
+        bench(lambda: status_code(code))
+
+
+@pytest.mark.parametrize("name", ["gzip", "deflate", "brotli"])
+def bench_filter(bench, name):
+    """Compress a small JSON response with a filters decorator."""
+    view = getattr(filters, name)(lambda: Response(PAYLOAD, mimetype="application/json"))
+    bench(view)
+
+
+@pytest.mark.parametrize("header", [None, "bytes=10-20", "bytes=1024-", "bytes=-999"])
+def bench_parse_request_range(bench, header):
+    """Parse a Range header."""
+    bench(lambda: parse_request_range(header))
+
+
+def bench_get_request_range(bench):
+    """Resolve a Range header against the resource size."""
+    headers = {"range": "bytes=-999"}
+    bench(lambda: dynamic_data.get_request_range(headers, 102400))
+
+
+@pytest.mark.parametrize("n", [10, 200])
+def bench_link_page(app, bench, n):
+    """Render a page of n links."""
+    with app.test_request_context(f"/links/{n}/0"):
+        bench(lambda: dynamic_data.link_page(n, 0))
+
+
+@pytest.mark.parametrize("degree", [10, 200])
+def bench_graph_page(app, bench, degree):
+    """Render a node of the implicit link graph."""
+    with app.test_request_context(f"/graph/1/5?degree={degree}&depth=3&slow=0"):
+        bench(lambda: dynamic_data.graph_page(1, 5))
+
+
+@pytest.mark.parametrize("query", ["", "?status=301,307&hosts=1"])
+def bench_redirect_chain(app, bench, query):
+    """Answer one hop of a redirect chain."""
+    with app.test_request_context(f"/redirect-chain/500{query}"):
+        bench(lambda: redirect.redirect_chain(500))
+
+
+def bench_redirect_hop(app, bench):
+    """Answer one hop of /relative-redirect, for comparison."""
+    with app.test_request_context("/relative-redirect/500"):
+        bench(lambda: redirect.relative_redirect_n_times(500))
+
+
+@pytest.mark.parametrize("count", [100, 10000])
+def bench_bulk_cookies(app, bench, count):
+    """Set count cookies of 64 bytes in one response."""
+    with app.test_request_context(f"/cookies/bulk?count={count}&domain_spread=3"):
+        bench(cookies.bulk_cookies)
+
+
+def bench_view_cookies(app, bench):
+    """Return 5000 cookies sent in one Cookie header."""
+    header = "; ".join(f"c{i}={i}" for i in range(5000))
+    with app.test_request_context("/cookies", headers={"Cookie": header}):
+        bench(cookies.view_cookies)
@@ -0,0 +1,33 @@
+"""
+Micro-benchmarks of 404s for URLs without a route, as sent by scanners.
+
+``repeated`` asks for the same path (answered by the middleware once the
+path is known), ``distinct`` for a new path every call (answered by the
+first ``before_request`` hook).
+"""
+
+import itertools
+
+import pytest
+
+from config import TestingConfig
+
+
+@pytest.fixture(params=[128, 0], ids=["tracked", "untracked"])
+def app(request, monkeypatch):
+    monkeypatch.setattr(TestingConfig, "NOT_FOUND_TOP_PATHS", request.param)
+    return request.getfixturevalue("app")
+
+
+@pytest.mark.parametrize("kind", ["repeated", "distinct"])
+def bench_not_found(client, bench, kind):
+    """GET a missing path and read the whole body."""
+    counter = itertools.count()
+
+    def call():
+        path = "/wp-login.php" if kind == "repeated" else f"/scan/{next(counter)}"
+        response = client.get(path)
+        response.get_data()
+        response.close()
+
+    bench(call)
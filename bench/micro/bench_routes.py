@@ -0,0 +1,29 @@
+"""
+Micro-benchmarks of every route in the load harness through the test client.
+
+Measures the full in-process path (routing, hooks, middleware, handler and
+serialization) without sockets, so handler changes show up without the
+noise of a real server.
+"""
+
+import pytest
+
+from bench.load import FAMILIES
+
+CASES = [
+    pytest.param(method, path, body, headers, id=f"{family}:{method} {path}")
+    for family, requests in FAMILIES.items()
+    for method, path, body, headers in requests
+]
+
+
+@pytest.mark.parametrize("method,path,body,headers", CASES)
+def bench_route(client, bench, method, path, body, headers):
+    """Issue the request and read the whole body."""
+
+    def call():
+        response = client.open(path, method=method, data=body, headers=headers)
+        response.get_data()
+        response.close()
+
+    bench(call)
@@ -0,0 +1,153 @@
+"""
+Fixtures and reporting for the in-process micro-benchmarks.
+
+Run with ``make bench-micro``. Each ``bench`` call times a callable (best
+of several rounds, calibrated to ~50ms per round, gc disabled like timeit)
+and measures its allocations with tracemalloc on a separate call. Results
+are written to ``bench/results/micro-<time>.json`` and compared against
+``bench/micro-baseline.json`` when it exists (``--micro-save-baseline``
+to record it).
+"""
+
+import gc
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime
+
+import pytest
+
+from src.app import create_app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+BASELINE = os.path.join(ROOT, "bench", "micro-baseline.json")
+
+ROUNDS = 5
+ROUND_TIME = 0.05
+
+_results = {}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--micro-save-baseline",
+        action="store_true",
+        help="save micro-benchmark results as bench/micro-baseline.json",
+    )
+
+
+def measure(fn, rounds=ROUNDS, round_time=ROUND_TIME):
+    """Return timing and allocation figures of calling fn()."""
+    clock = time.perf_counter_ns
+
+    def timed(number):
+        start = clock()
+        for _ in range(number):
+            fn()
+        return clock() - start
+
+    fn()  # warm caches and lazy imports
+    number = 1
+    while True:
+        elapsed = timed(number)
+        if elapsed >= round_time * 1e9 or number >= 1 << 20:
+            break
+        number *= 2
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        per_call = [timed(number) / number for _ in range(rounds)]
+    finally:
+        if enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_us": round(min(per_call) / 1000, 3),
+        "mean_us": round(sum(per_call) / len(per_call) / 1000, 3),
+        "calls": number * rounds,
+        "peak_bytes": peak - before,
+        "retained_bytes": current - before,
+    }
+
+
+@pytest.fixture
+def app():
+    """Production-like app (debug off, compact JSON)."""
+    app = create_app("testing")
+    app.debug = False
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def bench(request):
+    """Time a callable and record the result under the benchmark's name."""
+
+    def run(fn, name=None):
+        key = request.node.name if name is None else f"{request.node.name}[{name}]"
+        _results[key] = result = measure(fn)
+        return result
+
+    return run
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)["results"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def pytest_sessionfinish(session):
+    if not _results:
+        return
+    document = {
+        "date": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": dict(sorted(_results.items())),
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    session.config._micro_output = os.path.join(RESULTS_DIR, f"micro-{stamp}.json")
+    with open(session.config._micro_output, "w") as f:
+        json.dump(document, f, indent=2)
+    if session.config.getoption("--micro-save-baseline", default=False):
+        with open(BASELINE, "w") as f:
+            json.dump(document, f, indent=2)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _results:
+        return
+    baseline = _load(BASELINE) or {}
+    write = terminalreporter.write_line
+    terminalreporter.section("micro-benchmarks")
+    width = max(len(name) for name in _results)
+    write(f"{'benchmark':<{width}} {'best':>10} {'peak':>10} {'retained':>9} {'vs base':>8}")
+    for name, result in sorted(_results.items()):
+        change = ""
+        previous = baseline.get(name)
+        if previous and previous["best_us"]:
+            change = f"{result['best_us'] / previous['best_us'] - 1:+.0%}"
+        write(
+            f"{name:<{width}} {result['best_us']:>8.1f}us {result['peak_bytes']:>9}B "
+            f"{result['retained_bytes']:>8}B {change:>8}"
+        )
+    output = getattr(config, "_micro_output", None)
+    if output:
+        write(f"results written to {output}")
@@ -0,0 +1,31 @@
+"""
+Serve HTTPilot with Werkzeug's threaded server for benchmarks.
+
+Used by ``bench.load`` when gunicorn is not installed.
+
+Usage: python -m bench.server --port 8000
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import run_simple
+
+from src.app import create_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    app = create_app("production")
+    run_simple(args.host, args.port, app, threaded=True, use_reloader=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Startup cost of HTTPilot, measured with ``python -X importtime``.
+
+Reports the import time HTTPilot adds on top of Flask itself (the self
+time of every module imported by ``create_app`` that ``import flask`` does
+not import), the import time of Flask itself and the time of one
+``create_app`` call, each the median of fresh interpreters with warm
+bytecode caches. ``tests/test_startup.py`` holds HTTPilot's figures to a
+share of the Flask baselines measured in the same run, so a slow machine
+does not fail it.
+
+Usage: python -m bench.startup [--rounds 5] [--top 15] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP_CODE = (
+    "import time; from src.app import create_app; start = time.perf_counter(); "
+    "create_app('testing'); print(time.perf_counter() - start)"
+)
+FLASK_CODE = "import json, sys, flask; print(json.dumps(sorted(sys.modules)))"
+FLASK_IMPORT_CODE = "import flask"
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _env(pycache):
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache)
+    # Without cached bytecode every run would time compilation as well.
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def _run(args, env):
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def plain_flask_app(rules):
+    """Return a Flask app with rules plain routes, the baseline of create_app."""
+    from flask import Flask
+
+    app = Flask("baseline")
+    for i in range(rules):
+        app.add_url_rule(f"/route{i}/<int:n>", f"route{i}", lambda n: "")
+    return app
+
+
+def measure_once(env, baseline):
+    """Return (import overhead in us, create_app seconds, per-module self times)."""
+    result = _run(["-X", "importtime", "-c", APP_CODE], env)
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match and match[4] not in baseline:
+            modules[match[4]] = int(match[1])
+    return sum(modules.values()), float(result.stdout.strip()), modules
+
+
+def flask_import_once(env):
+    """Return the time ``import flask`` takes in a fresh interpreter, in us."""
+    result = _run(["-X", "importtime", "-c", FLASK_IMPORT_CODE], env)
+    return sum(
+        int(match[1]) for match in map(LINE.match, result.stderr.splitlines()) if match
+    )
+
+
+def measure(rounds=5):
+    """Return the median startup figures over rounds fresh interpreters."""
+    with tempfile.TemporaryDirectory() as pycache:
+        env = _env(pycache)
+        baseline = set(json.loads(_run(["-c", FLASK_CODE], env).stdout))
+        measure_once(env, baseline)  # fill the bytecode cache
+        runs = [measure_once(env, baseline) for _ in range(rounds)]
+        flask_runs = [flask_import_once(env) for _ in range(rounds)]
+
+    modules = {}
+    for _, _, times in runs:
+        for name, us in times.items():
+            modules.setdefault(name, []).append(us)
+    return {
+        "import_overhead_ms": round(statistics.median(r[0] for r in runs) / 1000, 2),
+        "flask_import_ms": round(statistics.median(flask_runs) / 1000, 2),
+        "create_app_ms": round(statistics.median(r[1] for r in runs) * 1000, 2),
+        "modules_us": dict(
+            sorted(
+                ((name, statistics.median(times)) for name, times in modules.items()),
+                key=lambda item: -item[1],
+            )
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="results file (default: bench/results/)")
+    args = parser.parse_args()
+
+    result = measure(args.rounds)
+    print(f"import on top of flask: {result['import_overhead_ms']:.1f}ms")
+    print(f"import flask:           {result['flask_import_ms']:.1f}ms")
+    print(f"create_app:             {result['create_app_ms']:.1f}ms")
+    print("slowest modules (self time):")
+    for name, us in list(result["modules_us"].items())[: args.top]:
+        print(f"  {us / 1000:>6.2f}ms  {name}")
+
+    output = args.output
+    if output is None:
+        results_dir = os.path.join(ROOT, "bench", "results")
+        os.makedirs(results_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(results_dir, f"startup-{stamp}.json")
+    result["date"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
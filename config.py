@@ -1,17 +1,142 @@
 """Configuration settings for HTTPilot."""
 
 import os
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+
+def _find_dotenv():
+    """Return the nearest .env file at or above this directory, like python-dotenv."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+# Load environment variables from .env file; python-dotenv is only imported
+# when there is one.
+_dotenv = _find_dotenv()
+if _dotenv:
+    from dotenv import load_dotenv
+
+    load_dotenv(_dotenv)
 
 
 class Config:
     """Base configuration class."""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     JSON_SORT_KEYS = False
-    JSONIFY_PRETTYPRINT_REGULAR = True
+    # Compact JSON unless DEBUG is on or the client passes ?pretty
+    JSONIFY_PRETTYPRINT_REGULAR = False
+
+    # /post, /put and /patch stream the request body in chunks and only keep
+    # the first BODY_ECHO_LIMIT bytes for the response.
+    BODY_CHUNK_SIZE = 64 * 1024
+    BODY_ECHO_LIMIT = 64 * 1024
+    BODY_DIGESTS = ("sha256", "md5", "crc32")
+
+    # /upload parses multipart bodies incrementally. With ?store=spool each
+    # file part is written to a temporary file of at most UPLOAD_SPOOL_LIMIT,
+    # deleted again once the body is parsed.
+    UPLOAD_MAX_PARTS = 1000
+    UPLOAD_MAX_BUFFER = 1024 * 1024
+    UPLOAD_FIELD_ECHO_LIMIT = 1024
+    UPLOAD_SPOOL_LIMIT = 1024 * 1024 * 1024
+    UPLOAD_SPOOL_DIR = os.environ.get("UPLOAD_SPOOL_DIR")
+
+    # /sink discards bodies; reads slower than SINK_STALL_THRESHOLD seconds
+    # are reported as stalls.
+    SINK_CHUNK_SIZE = 256 * 1024
+    SINK_STALL_THRESHOLD = 0.1
+    SINK_MAX_STALLS = 100
+
+    # /redirect-chain/<n>?hosts=1 sends hop after hop to the next of these
+    # hosts, keeping the request's port unless an alias names one. All of
+    # them must reach this server.
+    REDIRECT_HOST_ALIASES = tuple(
+        host.strip()
+        for host in os.environ.get("REDIRECT_HOST_ALIASES", "localhost,127.0.0.1").split(",")
+        if host.strip()
+    )
+
+    # Answer views marked with @fast_lane (/health, /robots.txt, /json, ...)
+    # from their rendered bytes without going through Flask
+    FAST_LANE = os.environ.get("FAST_LANE", "1") == "1"
+
+    # Missing paths counted in a top-k sketch (/debug/not-found); paths in it
+    # are answered with 404 before Flask runs. 0 turns both off.
+    NOT_FOUND_TOP_PATHS = int(os.environ.get("NOT_FOUND_TOP_PATHS", "128"))
+
+    # Per-route request metrics on /metrics (Prometheus text format)
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+    # Directory for metrics shared between worker processes (memory-mapped
+    # files). Unset keeps metrics per process.
+    METRICS_DIR = os.environ.get("METRICS_DIR")
+    # JSON access log written by a background thread: a file path, or "-"
+    # for stdout. Records beyond ACCESS_LOG_QUEUE_SIZE waiting are dropped.
+    ACCESS_LOG = os.environ.get("ACCESS_LOG")
+    ACCESS_LOG_QUEUE_SIZE = 10000
+    ACCESS_LOG_BATCH_SIZE = 256
+    ACCESS_LOG_FLUSH_INTERVAL = 0.5
+    # Admission control: per class, at most "concurrency" requests run at
+    # once and up to "queue" more wait "timeout" seconds for a slot; the rest
+    # get 503 with Retry-After. Waiting requests hold a worker thread too, so
+    # keep concurrency + queue of all classes below the threads per worker
+    # (32 in gunicorn.conf.py). Views that wait only for some requests (slow
+    # /graph nodes, delayed /redirect-chain hops) take a "slow" slot around
+    # the wait, see admission.hold.
+    ADMISSION_CONTROL = os.environ.get("ADMISSION_CONTROL", "1") == "1"
+    ADMISSION_CLASSES = {
+        "slow": {
+            "endpoints": (
+                "dynamic_data.delay_response",
+                "dynamic_data.drip",
+            ),
+            "concurrency": 8,
+            "queue": 4,
+            "timeout": 1.0,
+            "retry_after": 2,
+        },
+        "bulk": {
+            "endpoints": (
+                "dynamic_data.random_bytes",
+                "dynamic_data.stream_random_bytes",
+                "dynamic_data.range_request",
+            ),
+            "concurrency": 8,
+            "queue": 4,
+            "timeout": 2.0,
+            "retry_after": 1,
+        },
+    }
+    # Threads running Flask for requests the ASGI entry point (asgi.py) does
+    # not serve natively
+    ASGI_THREADS = int(os.environ.get("ASGI_THREADS", "32"))
+    # Add a Server-Timing header (routing, handler, json, compress, ttfb)
+    SERVER_TIMING = os.environ.get("SERVER_TIMING", "0") == "1"
+
+    # Debug tooling (/debug/*, X-Profile) is only installed when a secret is
+    # set, and then requires it in the X-Debug-Secret request header.
+    DEBUG_SECRET = os.environ.get("DEBUG_SECRET")
+    # Sampling interval of X-Profile: collapsed, in seconds
+    PROFILE_INTERVAL = 0.001
+    # Number of attached profiles kept for /debug/profiles/<id>
+    PROFILE_KEEP = 32
+    # Background sampling of request threads for /debug/flamegraph (needs
+    # DEBUG_SECRET): one trie of at most SAMPLING_MAX_NODES per minute for
+    # the last SAMPLING_WINDOW minutes.
+    SAMPLING_PROFILER = os.environ.get("SAMPLING_PROFILER", "0") == "1"
+    SAMPLING_INTERVAL = float(os.environ.get("SAMPLING_INTERVAL", "0.01"))
+    SAMPLING_WINDOW = 10
+    SAMPLING_MAX_NODES = 20000
+    # /debug/allocations: tracemalloc frames per trace, sites per report and
+    # the longest tracking window in seconds
+    ALLOCATIONS_FRAMES = 10
+    ALLOCATIONS_TOP = 10
+    ALLOCATIONS_MAX_WINDOW = 600
 
 
 class DevelopmentConfig(Config):
@@ -0,0 +1,83 @@
+"""Gunicorn settings for HTTPilot, loaded automatically from the project root.
+
+Defaults suit the mix HTTPilot serves: many cheap requests plus endpoints
+that wait (``/delay`` up to 60s) or stream for long (``/drip``). The
+threaded worker keeps idle keep-alive connections out of its threads, and
+``bench/gunicorn_config.py`` compares these defaults with the alternatives.
+
+Override with environment variables:
+
+- ``GUNICORN_WORKER_CLASS``: ``gthread`` (default), ``sync``, or ``uvicorn``
+  to serve the ASGI entry point with async streaming routes
+- ``WEB_CONCURRENCY``: worker processes (default: one per CPU for gthread
+  and uvicorn, ``2 * CPUs + 1`` for sync)
+- ``GUNICORN_THREADS``: threads per gthread worker (default 32)
+- ``GUNICORN_PRELOAD``: ``0`` to import the app in each worker
+- ``GUNICORN_BIND`` or ``PORT``
+"""
+
+import os
+
+from src import shared_metrics
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+
+
+def cpu_count():
+    """CPUs this process may run on (container CPU sets included)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+kind = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+worker_class = WORKER_CLASSES.get(kind, kind)
+# The uvicorn worker serves the ASGI app; the others the WSGI one.
+wsgi_app = "asgi:app" if kind == "uvicorn" else "wsgi:app"
+
+bind = os.environ.get("GUNICORN_BIND") or f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+if "WEB_CONCURRENCY" in os.environ:
+    workers = int(os.environ["WEB_CONCURRENCY"])
+elif kind == "sync":
+    # One request per process, so oversubscribe the CPUs.
+    workers = 2 * cpu_count() + 1
+else:
+    workers = cpu_count()
+
+# Requests mostly wait on the network or sleep, so threads beyond the CPU
+# count pay off; admission control (ADMISSION_CLASSES) keeps slow endpoints
+# from taking all of them.
+threads = int(os.environ.get("GUNICORN_THREADS", "32")) if kind == "gthread" else 1
+
+# Import the app once in the master: the compiled routes, templates and
+# caches built by create_app are shared copy-on-write by all workers.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+# Longer than the 60s idle timeout of common load balancers, so the balancer
+# closes idle connections first and never sends into a closing socket.
+keepalive = 75
+# /delay allows 60s; sync workers are killed after timeout, and the other
+# classes use it for their heartbeat. Let in-flight requests finish on reload.
+timeout = 75
+graceful_timeout = 75
+
+# The heartbeat file is touched constantly; keep it off disk.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+metrics_dir = os.environ.get("METRICS_DIR")
+
+
+def on_starting(server):
+    # Samples of workers from a previous run would be counted again.
+    if metrics_dir:
+        shared_metrics.clear(metrics_dir)
+
+
+def child_exit(server, worker):
+    shared_metrics.mark_process_dead(worker.pid, metrics_dir)
@@ -33,6 +33,7 @@ setup(
     entry_points={
         "console_scripts": [
             "httpilot=src.app:main",
+            "httpilot-serve=src.serve:main",
         ],
     },
 )
\ No newline at end of file
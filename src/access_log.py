@@ -0,0 +1,202 @@
+"""
+Structured JSON access log written by a background thread.
+
+Set ``ACCESS_LOG`` to a file path, or ``-`` for stdout. When a request
+finishes its fields are appended to an in-memory queue (a ``deque``, whose
+``append`` and ``popleft`` are atomic, so request threads take no lock);
+a writer thread formats and writes them in batches. If the queue holds
+``ACCESS_LOG_QUEUE_SIZE`` records, new ones are dropped and counted (see
+``httpilot_access_log_dropped_total`` on ``/metrics``) rather than making
+requests wait for a slow sink. One line per request::
+
+    {"time":"2024-01-01T00:00:00.000000Z","method":"GET","path":"/get",
+     "endpoint":"http_methods.view_get","status":200,"bytes_in":0,
+     "bytes_out":312,"duration":0.000412,"completed":true,"worker":4242}
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from .lifecycle import get_lifecycle
+from .metrics import get_registry
+
+EXTENSION = "httpilot.access_log"
+
+
+def format_entry(entry, worker):
+    """Render a queued entry as one JSON log line."""
+    finished, method, path, endpoint, status, bytes_in, bytes_out, duration, completed = (
+        entry
+    )
+    started = datetime.fromtimestamp(finished - duration, timezone.utc)
+    return json.dumps(
+        {
+            "time": started.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "method": method,
+            "path": path,
+            "endpoint": endpoint or None,
+            "status": status,
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "duration": round(duration, 6),
+            "completed": completed,
+            "worker": worker,
+        },
+        separators=(",", ":"),
+    )
+
+
+class AccessLog:
+    """Queue finished requests and write them from a background thread."""
+
+    def __init__(self, target, queue_size=10000, batch_size=256, flush_interval=0.5):
+        self.target = target
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = deque()
+        self.written = 0
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._stream = None
+
+    def request_finished(self, record):
+        queue = self.queue
+        if len(queue) >= self.queue_size:
+            self._drop(1)
+            return
+        queue.append(
+            (
+                time.time(),
+                record.method,
+                record.path,
+                record.endpoint,
+                record.status,
+                record.bytes_in,
+                record.bytes_out,
+                record.duration,
+                record.completed,
+            )
+        )
+        if len(queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _open(self):
+        if self.target == "-":
+            return sys.stdout
+        return open(self.target, "a", encoding="utf-8")
+
+    def flush(self):
+        """Write everything queued so far."""
+        queue = self.queue
+        worker = os.getpid()
+        while queue:
+            lines = []
+            try:
+                for _ in range(self.batch_size):
+                    lines.append(format_entry(queue.popleft(), worker))
+            except IndexError:
+                pass
+            try:
+                if self._stream is None:
+                    self._stream = self._open()
+                self._stream.write("\n".join(lines) + "\n")
+                self._stream.flush()
+                self.written += len(lines)
+            except (OSError, ValueError):
+                self._drop(len(lines))
+
+    def _drop(self, count):
+        # Only taken when records are lost, never on the normal path.
+        with self._dropped_lock:
+            self.dropped += count
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="httpilot-access-log", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the writer thread after writing what is queued."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self._stream is not None and self._stream is not sys.stdout:
+            self._stream.close()
+        self._stream = None
+
+    def _after_fork(self):
+        # The writer thread did not survive fork(); records queued in the
+        # parent were the parent's to write.
+        self.queue.clear()
+        self._stream = None
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._dropped_lock = threading.Lock()
+        if self._thread is not None:
+            self.start()
+
+    def samples(self):
+        """Metrics collector: dropped records and queue depth."""
+        return [
+            ("httpilot_access_log_dropped_total", (), self.dropped),
+            ("httpilot_access_log_queue_depth", (), len(self.queue)),
+        ]
+
+
+def get_access_log(app):
+    """Return the app's AccessLog, or None if ACCESS_LOG is unset."""
+    return app.extensions.get(EXTENSION)
+
+
+def init_app(app):
+    """Write a JSON access log to ACCESS_LOG if it is set."""
+    target = app.config.get("ACCESS_LOG")
+    if not target:
+        return
+
+    access_log = AccessLog(
+        target,
+        queue_size=app.config.get("ACCESS_LOG_QUEUE_SIZE", 10000),
+        batch_size=app.config.get("ACCESS_LOG_BATCH_SIZE", 256),
+        flush_interval=app.config.get("ACCESS_LOG_FLUSH_INTERVAL", 0.5),
+    )
+    get_lifecycle(app).on_finish(access_log.request_finished)
+    access_log.start()
+    atexit.register(access_log.stop)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=access_log._after_fork)
+
+    registry = get_registry(app)
+    if registry is not None:
+        registry.describe(
+            "httpilot_access_log_dropped_total",
+            "counter",
+            "Access log records dropped because the queue was full or the sink failed.",
+        )
+        registry.describe(
+            "httpilot_access_log_queue_depth",
+            "gauge",
+            "Access log records waiting to be written.",
+        )
+        registry.add_collector(access_log.samples)
+    app.extensions[EXTENSION] = access_log
@@ -0,0 +1,211 @@
+"""
+Concurrency admission control for expensive endpoints.
+
+Endpoints such as ``/delay`` and ``/drip`` hold a worker thread for as long
+as they run. ``ADMISSION_CLASSES`` groups them into classes, each with a
+:class:`Limiter` allowing ``concurrency`` requests at once and ``queue``
+more to wait up to ``timeout`` seconds for a slot. Anything beyond that is
+answered right away with ``503 Service Unavailable`` and ``Retry-After``,
+so requests to other endpoints (``/health``, ``/get``, ...) still find a
+free thread. A slot is held until the response body has been sent, which
+covers streamed endpoints like ``/drip``.
+
+Views that only wait for some requests (a slow ``/graph`` node, a delayed
+``/redirect-chain`` hop) are not listed in a class; they take a slot of it
+with :func:`hold` around the wait instead.
+
+Occupancy is exported on ``/metrics`` as ``httpilot_admission_*``.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, current_app, request
+
+from .lifecycle import RECORD_KEY, get_lifecycle
+from .metrics import get_registry
+
+EXTENSION = "httpilot.admission"
+
+
+class Limiter:
+    """A counting semaphore with a bounded number of waiters."""
+
+    def __init__(self, name, concurrency, queue=0, timeout=0.0, retry_after=1):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "timeout": 0}
+        self._cond = threading.Condition(threading.Lock())
+
+    def acquire(self):
+        """Take a slot, waiting in the queue if there is room; False if shed."""
+        with self._cond:
+            if self.active < self.concurrency:
+                self.active += 1
+                self.admitted += 1
+                return True
+            if self.waiting >= self.queue:
+                self.shed["queue_full"] += 1
+                return False
+
+            self.waiting += 1
+            deadline = time.monotonic() + self.timeout
+            try:
+                while self.active >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed["timeout"] += 1
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+class AdmissionControl:
+    """Apply a Limiter to the endpoints of each admission class."""
+
+    def __init__(self, classes):
+        self.limiters = {}
+        self.by_endpoint = {}
+        self._rejections = {}
+        for name, spec in classes.items():
+            limiter = Limiter(
+                name,
+                spec["concurrency"],
+                queue=spec.get("queue", 0),
+                timeout=spec.get("timeout", 0.0),
+                retry_after=spec.get("retry_after", 1),
+            )
+            self.limiters[name] = limiter
+            for endpoint in spec["endpoints"]:
+                self.by_endpoint[endpoint] = limiter
+            self._rejections[name] = json.dumps(
+                {
+                    "error": "Service Unavailable",
+                    "message": f"Too many concurrent '{name}' requests, retry later.",
+                    "status": 503,
+                }
+            ).encode()
+
+    def reject(self, limiter):
+        """Return the 503 response for a shed request."""
+        return Response(
+            self._rejections[limiter.name],
+            status=503,
+            mimetype="application/json",
+            headers={"Retry-After": str(limiter.retry_after)},
+        )
+
+    def _before_request(self):
+        limiter = self.by_endpoint.get(request.endpoint)
+        if limiter is None:
+            return None
+        if not limiter.acquire():
+            return self.reject(limiter)
+        record = request.environ.get(RECORD_KEY)
+        if record is not None:
+            record.admission = limiter
+        return None
+
+    def request_finished(self, record):
+        limiter = record.admission
+        if limiter is not None:
+            record.admission = None
+            limiter.release()
+
+    def samples(self):
+        """Metrics collector: occupancy and outcomes per admission class."""
+        samples = []
+        for name, limiter in self.limiters.items():
+            labels = (("class", name),)
+            samples += [
+                ("httpilot_admission_limit", labels, limiter.concurrency),
+                ("httpilot_admission_active", labels, limiter.active),
+                ("httpilot_admission_queued", labels, limiter.waiting),
+                ("httpilot_admission_admitted_total", labels, limiter.admitted),
+            ]
+            for reason, count in limiter.shed.items():
+                samples.append(
+                    ("httpilot_admission_shed_total", labels + (("reason", reason),), count)
+                )
+        return samples
+
+
+def get_admission(app):
+    """Return the app's AdmissionControl, or None if it is disabled."""
+    return app.extensions.get(EXTENSION)
+
+
+@contextmanager
+def hold(name):
+    """Hold a slot of admission class name for the block, from a view.
+
+    Yields the 503 response if the request was shed and None otherwise,
+    including when admission control or the class is disabled::
+
+        with admission.hold("slow") as rejected:
+            if rejected is not None:
+                return rejected
+            time.sleep(delay)
+    """
+    admission = get_admission(current_app)
+    limiter = admission.limiters.get(name) if admission is not None else None
+    if limiter is None:
+        yield None
+    elif not limiter.acquire():
+        yield admission.reject(limiter)
+    else:
+        try:
+            yield None
+        finally:
+            limiter.release()
+
+
+def init_app(app):
+    """Limit concurrent requests per ADMISSION_CLASSES if ADMISSION_CONTROL is set."""
+    classes = app.config.get("ADMISSION_CLASSES")
+    if not (app.config.get("ADMISSION_CONTROL") and classes):
+        return
+
+    admission = AdmissionControl(classes)
+    # A request that was not admitted never gets a slot, so releasing on
+    # finish (after the body was sent, or the client went away) is exact.
+    get_lifecycle(app).on_finish(admission.request_finished)
+    app.before_request(admission._before_request)
+
+    registry = get_registry(app)
+    if registry is not None:
+        registry.describe(
+            "httpilot_admission_limit", "gauge", "Concurrent requests allowed per class."
+        )
+        registry.describe(
+            "httpilot_admission_active", "gauge", "Requests holding an admission slot."
+        )
+        registry.describe(
+            "httpilot_admission_queued", "gauge", "Requests waiting for an admission slot."
+        )
+        registry.describe(
+            "httpilot_admission_admitted_total", "counter", "Requests admitted per class."
+        )
+        registry.describe(
+            "httpilot_admission_shed_total",
+            "counter",
+            "Requests answered with 503 because the queue was full or the wait timed out.",
+        )
+        registry.add_collector(admission.samples)
+    app.extensions[EXTENSION] = admission
@@ -0,0 +1,229 @@
+"""
+Per-endpoint allocation tracking with :mod:`tracemalloc`.
+
+A tracking window is started from ``/debug/allocations/start`` and ends
+after the requested number of seconds or on ``/debug/allocations/stop``.
+While it is open, each request is measured between its start and finish:
+
+* ``peak`` - highest traced memory above the level at request start,
+  which includes temporary buffers freed before the request finished
+  (before Python 3.9 there is no ``tracemalloc.reset_peak``, so this is
+  the memory still traced at finish instead);
+* ``retained`` - a snapshot diff, grouped by allocation site, of what was
+  still allocated at finish (this includes the response body).
+
+tracemalloc is process wide, so only one request is measured at a time;
+requests that overlap it are counted as ``skipped``.
+"""
+import linecache
+import threading
+import time
+import tracemalloc
+
+from .lifecycle import get_lifecycle
+from .routes.utils import utcnow
+
+EXTENSION = "httpilot.allocations"
+
+# tracemalloc.reset_peak was added in Python 3.9.
+RESET_PEAK = hasattr(tracemalloc, "reset_peak")
+
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _site(traceback):
+    frame = traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+def top_sites(diff, limit):
+    """Return the limit largest growing entries of a snapshot diff."""
+    growing = [stat for stat in diff if stat.size_diff > 0]
+    growing.sort(key=lambda stat: stat.size_diff, reverse=True)
+    return [
+        {"site": _site(stat.traceback), "size": stat.size_diff, "count": stat.count_diff}
+        for stat in growing[:limit]
+    ]
+
+
+class EndpointAllocations:
+    """Allocation totals of one endpoint over a tracking window."""
+
+    def __init__(self):
+        self.requests = 0
+        self.skipped = 0
+        self.peak_max = 0
+        self.peak_total = 0
+        self.retained_total = 0
+        self.sites = {}
+
+    def add(self, peak, diff):
+        self.requests += 1
+        self.peak_max = max(self.peak_max, peak)
+        self.peak_total += peak
+        for stat in diff:
+            if stat.size_diff <= 0:
+                continue
+            self.retained_total += stat.size_diff
+            site = _site(stat.traceback)
+            size, count = self.sites.get(site, (0, 0))
+            self.sites[site] = (size + stat.size_diff, count + stat.count_diff)
+
+    def to_dict(self, limit):
+        requests = self.requests or 1
+        top = sorted(self.sites.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            "requests": self.requests,
+            "skipped": self.skipped,
+            "peak": {"max": self.peak_max, "mean": self.peak_total // requests},
+            "retained": {"mean": self.retained_total // requests},
+            "top": [
+                {"site": site, "size": size, "count": count}
+                for site, (size, count) in top[:limit]
+            ],
+        }
+
+
+class AllocationTracker:
+    """Run tracemalloc for a window and attribute allocations to endpoints."""
+
+    def __init__(self, frames=10, top=10, max_window=600):
+        self.frames = frames
+        self.top = top
+        self.max_window = max_window
+        self.active = False
+        self.started_at = None
+        self.deadline = None
+        self.endpoints = {}
+        self._baseline = None
+        self._growth = []
+        self._owns_tracing = False
+        self._lock = threading.Lock()
+        self._measuring = threading.Lock()
+        self._current = None
+
+    def start(self, seconds, frames=None):
+        """Open a tracking window of seconds, discarding the previous results."""
+        seconds = max(1, min(seconds, self.max_window))
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames or self.frames)
+                self._owns_tracing = True
+            self.endpoints = {}
+            self._baseline = self._snapshot()
+            self.started_at = utcnow()
+            self.deadline = time.monotonic() + seconds
+            self.active = True
+
+    def stop(self):
+        """Close the tracking window, keeping its results for the report."""
+        with self._lock:
+            self._stop()
+
+    def _stop(self):
+        if not self.active:
+            return
+        self.active = False
+        self._growth = self._diff_since_baseline()
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def _diff_since_baseline(self):
+        if self._baseline is None or not tracemalloc.is_tracing():
+            return []
+        diff = self._snapshot().compare_to(self._baseline, "lineno")
+        return top_sites(diff, self.top)
+
+    def _endpoint(self, record):
+        name = record.endpoint or "unmatched"
+        stats = self.endpoints.get(name)
+        if stats is None:
+            stats = self.endpoints[name] = EndpointAllocations()
+        return stats
+
+    def request_started(self, record):
+        if not self.active:
+            return
+        if time.monotonic() > self.deadline:
+            self.stop()
+            return
+        if not self._measuring.acquire(blocking=False):
+            with self._lock:
+                self._endpoint(record).skipped += 1
+            return
+
+        self._current = (record, self._snapshot(), tracemalloc.get_traced_memory()[0])
+        if RESET_PEAK:
+            tracemalloc.reset_peak()
+
+    def request_finished(self, record):
+        current = self._current
+        if current is None or current[0] is not record:
+            return
+        self._current = None
+        try:
+            _, before, start_memory = current
+            if not tracemalloc.is_tracing():
+                return
+            traced, peak = tracemalloc.get_traced_memory()
+            peak = (peak if RESET_PEAK else traced) - start_memory
+            diff = self._snapshot().compare_to(before, "lineno")
+            with self._lock:
+                self._endpoint(record).add(max(peak, 0), diff)
+        finally:
+            self._measuring.release()
+
+    def report(self):
+        """Return the results of the current or last window."""
+        with self._lock:
+            tracing = self.active and tracemalloc.is_tracing()
+            growth = self._diff_since_baseline() if tracing else self._growth
+            current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+            return {
+                "active": self.active,
+                "started": self.started_at,
+                "remaining": max(0, round(self.deadline - time.monotonic(), 3))
+                if self.active
+                else 0,
+                "traced_memory": {"current": current, "peak": peak},
+                "endpoints": {
+                    name: stats.to_dict(self.top)
+                    for name, stats in sorted(self.endpoints.items())
+                },
+                "growth": growth,
+            }
+
+
+def get_tracker(app):
+    """Return the app's AllocationTracker, or None if not installed."""
+    return app.extensions.get(EXTENSION)
+
+
+def init_app(app):
+    """Install the allocation tracker if DEBUG_SECRET is set.
+
+    Nothing is traced until a window is started.
+    """
+    if not app.config.get("DEBUG_SECRET"):
+        return
+
+    tracker = AllocationTracker(
+        frames=app.config.get("ALLOCATIONS_FRAMES", 10),
+        top=app.config.get("ALLOCATIONS_TOP", 10),
+        max_window=app.config.get("ALLOCATIONS_MAX_WINDOW", 600),
+    )
+    lifecycle = get_lifecycle(app)
+    lifecycle.on_start(tracker.request_started)
+    lifecycle.on_finish(tracker.request_finished)
+    app.extensions[EXTENSION] = tracker
@@ -7,7 +7,7 @@ import json
 import time
 from datetime import datetime
 from urllib.parse import urlencode
-from flask import Flask, request, jsonify, render_template, redirect, url_for
+from flask import Flask, request, render_template, redirect, url_for
 from werkzeug.exceptions import HTTPException
 
 
@@ -15,6 +15,11 @@ def create_app(config_name="development"):
     """Create and configure Flask application."""
     app = Flask(__name__)
 
+    # Compile url_for builders on first use rather than for every route now
+    from .routing import rule_class
+
+    app.url_rule_class = rule_class()
+
     # Load configuration
     if config_name == "production":
         app.config.from_object("config.ProductionConfig")
@@ -23,6 +28,11 @@ def create_app(config_name="development"):
     else:
         app.config.from_object("config.DevelopmentConfig")
 
+    # JSON provider reads JSON_* settings, so install it after the config
+    from .json_provider import FastJSONProvider
+
+    app.json = FastJSONProvider(app)
+
     # Register blueprints
     from .routes import (
         main,
@@ -36,6 +46,7 @@ def create_app(config_name="development"):
         cache,
         redirect,
         image,
+        upload,
     )
 
     app.register_blueprint(main.bp)
@@ -49,33 +60,36 @@ def create_app(config_name="development"):
     app.register_blueprint(cache.bp)
     app.register_blueprint(redirect.bp)
     app.register_blueprint(image.bp)
+    app.register_blueprint(upload.bp)
+
+    # Instrumentation
+    from . import (
+        access_log,
+        admission,
+        allocations,
+        errors,
+        fast_lane,
+        metrics,
+        profiling,
+        sampling,
+        server_timing,
+    )
+
+    # Inside the lifecycle middleware installed by metrics
+    fast_lane.init_app(app)
+    errors.init_app(app)
+    metrics.init_app(app)
+    access_log.init_app(app)
+    admission.init_app(app)
+    server_timing.init_app(app)
+    profiling.init_app(app)
+    sampling.init_app(app)
+    allocations.init_app(app)
+
+    if app.config.get("DEBUG_SECRET"):
+        from .routes import debug
 
-    # Error handlers
-    @app.errorhandler(404)
-    def not_found(error):
-        return (
-            jsonify(
-                {
-                    "error": "Not Found",
-                    "message": "The requested resource was not found on this server.",
-                    "status": 404,
-                }
-            ),
-            404,
-        )
-
-    @app.errorhandler(500)
-    def internal_error(error):
-        return (
-            jsonify(
-                {
-                    "error": "Internal Server Error",
-                    "message": "An internal server error occurred.",
-                    "status": 500,
-                }
-            ),
-            500,
-        )
+        app.register_blueprint(debug.bp)
 
     return app
 
@@ -0,0 +1,320 @@
+"""
+ASGI entry point for HTTPilot.
+
+The waiting and streaming endpoints (``/delay``, ``/drip``, ``/stream``,
+``/stream-bytes`` and ``/range``) have native async handlers in
+:mod:`src.routes.dynamic_data_async`, so an open stream costs a coroutine
+instead of a thread. Every other request is passed to the Flask app through
+:class:`WSGIBridge`, which runs it on a small thread pool and streams the
+request and response bodies, so the whole route surface stays available.
+
+Native requests get a :class:`~src.lifecycle.RequestRecord` like WSGI ones
+and show up in ``/metrics`` and the access log. Flask hooks (Server-Timing,
+profiling, admission control) only apply to bridged requests.
+
+Run with any ASGI server, e.g. ``uvicorn asgi:app``.
+"""
+import asyncio
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .lifecycle import RequestRecord, get_lifecycle
+
+routes = []
+
+
+def route(rule, endpoint):
+    """Register an async handler for GET requests matching rule.
+
+    ``rule`` uses the ``<int:name>`` placeholders of the Flask route it
+    mirrors, and ``endpoint`` is that route's endpoint name.
+    """
+    pattern = re.sub(r"<int:(\w+)>", r"(?P<\1>[0-9]+)", rule)
+
+    def decorator(handler):
+        routes.append((re.compile(pattern + "$"), endpoint, handler))
+        return handler
+
+    return decorator
+
+
+def build_environ(scope, body):
+    """Return the WSGI environ for an ASGI HTTP scope."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]) if server[1] is not None else "80",
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", ()):
+        name = name.decode("latin-1")
+        value = value.decode("latin-1")
+        if name == "content-type":
+            key = "CONTENT_TYPE"
+        elif name == "content-length":
+            key = "CONTENT_LENGTH"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        if key in environ:
+            value = f"{environ[key]},{value}"
+        environ[key] = value
+    return environ
+
+
+def encode_headers(headers):
+    return [
+        (name.lower().encode("latin-1"), str(value).encode("latin-1"))
+        for name, value in headers
+    ]
+
+
+class InputStream:
+    """Blocking ``wsgi.input`` fed by the ASGI ``receive`` channel.
+
+    Read from a bridge thread; each message is fetched on the event loop.
+    """
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = bytearray()
+        self._more = True
+
+    def _fill(self):
+        message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+        if message["type"] == "http.request":
+            self._buffer += message.get("body", b"")
+            self._more = message.get("more_body", False)
+        else:
+            # http.disconnect: whatever was received is all there is.
+            self._more = False
+
+    def read(self, size=-1):
+        while self._more and (size is None or size < 0 or len(self._buffer) < size):
+            self._fill()
+        if size is None or size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+    def readline(self, size=-1):
+        while self._more and b"\n" not in self._buffer:
+            if 0 <= size <= len(self._buffer):
+                break
+            self._fill()
+        end = self._buffer.find(b"\n") + 1 or len(self._buffer)
+        if size is not None and size >= 0:
+            end = min(end, size)
+        return self.read(end)
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+
+class WSGIBridge:
+    """Serve ASGI HTTP requests with a WSGI app on a thread pool."""
+
+    def __init__(self, wsgi_app, threads=32):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="httpilot-wsgi")
+
+    async def __call__(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        environ = build_environ(scope, InputStream(receive, loop))
+        response = []
+
+        def start_response(status, headers, exc_info=None):
+            response[:] = [int(status[:3]), encode_headers(headers)]
+
+        run = loop.run_in_executor
+        body = await run(self.executor, self.wsgi_app, environ, start_response)
+        try:
+            if isinstance(body, (list, tuple)):
+                chunks = [chunk for chunk in body if chunk]
+            else:
+                chunks = None
+                iterator = iter(body)
+                chunk = await run(self.executor, next, iterator, None)
+
+            status, headers = response
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            if chunks is not None:
+                for chunk in chunks:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                while chunk is not None:
+                    if chunk:
+                        await send(
+                            {"type": "http.response.body", "body": chunk, "more_body": True}
+                        )
+                    chunk = await run(self.executor, next, iterator, None)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            close = getattr(body, "close", None)
+            if close is not None:
+                close()
+
+
+class Exchange:
+    """One native request: its parsed request and the response being sent."""
+
+    def __init__(self, app, scope, receive, send, record):
+        self.app = app
+        self.scope = scope
+        self.record = record
+        self._receive = receive
+        self._send = send
+        self._request = None
+        self._disconnected = asyncio.Event()
+        self._watcher = asyncio.ensure_future(self._watch())
+
+    async def _watch(self):
+        while True:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                self._disconnected.set()
+                return
+
+    @property
+    def request(self):
+        """The request as a Flask ``Request`` (no body, it is never read)."""
+        if self._request is None:
+            self._request = self.app.request_class(build_environ(self.scope, None))
+        return self._request
+
+    @property
+    def disconnected(self):
+        return self._disconnected.is_set()
+
+    async def sleep(self, seconds):
+        """Wait, returning False as soon as the client goes away."""
+        if seconds > 0:
+            try:
+                await asyncio.wait_for(self._disconnected.wait(), seconds)
+            except asyncio.TimeoutError:
+                pass
+        return not self.disconnected
+
+    def json_body(self, obj):
+        """Serialize obj exactly like ``jsonify`` does for this request."""
+        with self.app.request_context(self.request.environ):
+            return self.app.json.response(obj).get_data()
+
+    async def start(self, status, headers):
+        self.record.status = status
+        await self._send(
+            {"type": "http.response.start", "status": status, "headers": encode_headers(headers)}
+        )
+
+    async def write(self, chunk):
+        self.record.bytes_out += len(chunk)
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    async def end(self):
+        await self._send({"type": "http.response.body", "body": b"", "more_body": False})
+        self.record.completed = True
+
+    async def respond(self, status, headers, body=b""):
+        """Send a complete response."""
+        headers = list(headers) + [("Content-Length", str(len(body)))]
+        await self.start(status, headers)
+        if body:
+            await self.write(body)
+        await self.end()
+
+    def close(self):
+        self._watcher.cancel()
+
+
+class HTTPilotASGI:
+    """ASGI application serving HTTPilot's routes."""
+
+    def __init__(self, app):
+        from .routes import dynamic_data_async, redirect_async  # noqa: F401 - registers routes
+
+        self.app = app
+        self.lifecycle = get_lifecycle(app)
+        self.bridge = WSGIBridge(app.wsgi_app, threads=app.config.get("ASGI_THREADS", 32))
+
+    async def __call__(self, scope, receive, send):
+        kind = scope["type"]
+        if kind == "http":
+            await self.http(scope, receive, send)
+        elif kind == "lifespan":
+            await self.lifespan(receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type {kind!r}")
+
+    async def http(self, scope, receive, send):
+        if scope["method"] == "GET":
+            path = scope["path"]
+            for pattern, endpoint, handler in routes:
+                match = pattern.match(path)
+                if match is not None:
+                    await self.native(scope, receive, send, endpoint, handler, match)
+                    return
+        await self.bridge(scope, receive, send)
+
+    async def native(self, scope, receive, send, endpoint, handler, match):
+        record = RequestRecord(
+            time.perf_counter_ns(),
+            "GET",
+            scope["path"],
+            endpoint.rpartition(".")[0],
+            endpoint,
+            0,
+        )
+        lifecycle = self.lifecycle
+        lifecycle.start(record)
+        exchange = Exchange(self.app, scope, receive, send, record)
+        try:
+            kwargs = {name: int(value) for name, value in match.groupdict().items()}
+            await handler(exchange, **kwargs)
+        except BaseException:
+            if record.status is None:
+                record.status = 500
+            raise
+        finally:
+            exchange.close()
+            lifecycle.finish(record)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.bridge.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app(config_name="production"):
+    """Create the Flask app and wrap it for ASGI servers."""
+    from .app import create_app
+
+    return HTTPilotASGI(create_app(config_name))
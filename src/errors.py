@@ -0,0 +1,169 @@
+"""
+JSON error responses and a cheap path for unmatched URLs.
+
+Error bodies are serialized once per app, compact and indented, instead of
+by ``jsonify`` on every error. Requests whose URL matches no route are
+answered by the first ``before_request`` function, so the other hooks and
+the error handler lookup are skipped, and their paths are counted in a
+:class:`TopPaths` sketch. Scanners ask for the same junk paths over and
+over; once a path is in the sketch, :class:`NotFoundMiddleware` answers it
+before Flask creates a request context at all.
+
+The most requested missing paths are listed on ``/debug/not-found``.
+"""
+import threading
+
+from flask import request
+from werkzeug.exceptions import NotFound
+
+EXTENSION = "httpilot.errors"
+
+# status: (error, message)
+ERRORS = {
+    404: ("Not Found", "The requested resource was not found on this server."),
+    500: ("Internal Server Error", "An internal server error occurred."),
+}
+
+# Longer paths are answered through Flask but not remembered.
+MAX_PATH_LENGTH = 256
+
+
+class TopPaths:
+    """Approximate top-k counter of paths (Space-Saving).
+
+    At most ``size`` paths are tracked. A path that is not tracked replaces
+    the one with the lowest count and inherits that count as its error, so
+    ``count - error`` is a lower bound of how often it was requested and
+    every path requested more than ``total / size`` times is tracked.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.total = 0
+        self.counts = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, path):
+        return path in self.counts
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, path):
+        with self._lock:
+            self.total += 1
+            counts = self.counts
+            if path in counts:
+                counts[path] += 1
+            elif len(counts) < self.size:
+                counts[path] = 1
+                self.errors[path] = 0
+            else:
+                evicted = min(counts, key=counts.get)
+                count = counts.pop(evicted)
+                del self.errors[evicted]
+                counts[path] = count + 1
+                self.errors[path] = count
+
+    def top(self, n=None):
+        """Return ``[(path, count, error), ...]``, most requested first."""
+        with self._lock:
+            items = [(path, count, self.errors[path]) for path, count in self.counts.items()]
+        items.sort(key=lambda item: -item[1])
+        return items[:n] if n is not None else items
+
+
+class ErrorPages:
+    """Pre-serialized JSON bodies of the error responses in ERRORS."""
+
+    def __init__(self, app, top=None):
+        self.app = app
+        self.top = top
+        self.mimetype = app.json.mimetype
+        self.bodies = {}
+        for status, (error, message) in ERRORS.items():
+            payload = {"error": error, "message": message, "status": status}
+            for pretty in (False, True):
+                if pretty:
+                    body = app.json.dumps(payload, indent=2)
+                else:
+                    body = app.json.dumps(payload, separators=(",", ":"))
+                self.bodies[status, pretty] = f"{body}\n".encode()
+
+    def body(self, status, pretty=None):
+        if pretty is None:
+            pretty = self.app.json.wants_pretty()
+        return self.bodies[status, pretty]
+
+    def response(self, status):
+        """Return a new Response carrying the error body for status."""
+        return self.app.response_class(self.body(status), status, mimetype=self.mimetype)
+
+    def handle(self, error):
+        return self.response(error.code)
+
+    def _before_request(self):
+        # Registered first, so nothing else runs for URLs without a route.
+        if isinstance(request.routing_exception, NotFound):
+            path = request.path
+            if self.top is not None and len(path) <= MAX_PATH_LENGTH:
+                self.top.add(path)
+            return self.response(404)
+        return None
+
+
+class NotFoundMiddleware:
+    """Answer requests for paths already known to match no route."""
+
+    def __init__(self, wsgi_app, pages, top):
+        self.wsgi_app = wsgi_app
+        self.pages = pages
+        self.top = top
+        self.status = "404 NOT FOUND"
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO")
+        # ?pretty is left to Flask, which knows how to parse it
+        if path not in self.top or "pretty" in environ.get("QUERY_STRING", ""):
+            return self.wsgi_app(environ, start_response)
+
+        self.top.add(path)
+        pages = self.pages
+        app = pages.app
+        body = pages.body(404, app.json.pretty or app.debug)
+        start_response(
+            self.status,
+            [("Content-Type", pages.mimetype), ("Content-Length", str(len(body)))],
+        )
+        return [body] if environ.get("REQUEST_METHOD") != "HEAD" else []
+
+
+def get_error_pages(app):
+    """Return the app's ErrorPages."""
+    return app.extensions[EXTENSION]
+
+
+def get_top_paths(app):
+    """Return the TopPaths of missing paths, or None if not tracked."""
+    pages = app.extensions.get(EXTENSION)
+    return pages.top if pages is not None else None
+
+
+def init_app(app):
+    """Install the JSON error handlers and the cheap path for unmatched URLs.
+
+    NOT_FOUND_TOP_PATHS sets how many missing paths are tracked and answered
+    from the middleware; 0 turns both off. Call before the lifecycle
+    middleware is installed, so that it wraps this one.
+    """
+    size = app.config.get("NOT_FOUND_TOP_PATHS", 0)
+    top = TopPaths(size) if size > 0 else None
+    pages = ErrorPages(app, top)
+    app.extensions[EXTENSION] = pages
+
+    for status in ERRORS:
+        app.register_error_handler(status, pages.handle)
+    app.before_request_funcs.setdefault(None, []).insert(0, pages._before_request)
+    if top is not None:
+        app.wsgi_app = NotFoundMiddleware(app.wsgi_app, pages, top)
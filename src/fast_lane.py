@@ -0,0 +1,126 @@
+"""
+Raw WSGI fast lane for endpoints whose response does not depend on the request.
+
+Views opt in with :func:`fast_lane`. The first GET to such a route goes
+through Flask as usual and its response is kept; later GET and HEAD
+requests without a query string are answered from a ``path -> response``
+table before Flask creates a request context, routes or serializes
+anything. With ``ttl`` the kept response is rendered again once it is that
+many seconds old, which suits samples that carry a timestamp.
+
+The middleware sits inside the request lifecycle, so answered requests are
+still counted on ``/metrics`` and written to the access log.
+"""
+import time
+
+from .lifecycle import RECORD_KEY
+
+EXTENSION = "httpilot.fast_lane"
+ATTRIBUTE = "fast_lane_ttl"
+FOREVER = float("inf")
+
+
+def fast_lane(ttl=None):
+    """Serve the decorated view's response from the fast lane.
+
+    ``ttl`` is how long one rendering may be served, in seconds; None keeps
+    it for the life of the process.
+    """
+
+    def decorator(f):
+        setattr(f, ATTRIBUTE, FOREVER if ttl is None else ttl)
+        return f
+
+    return decorator
+
+
+class Route:
+    """A fast lane route and the response currently served for it."""
+
+    __slots__ = ("endpoint", "blueprint", "ttl", "response", "expires")
+
+    def __init__(self, endpoint, ttl):
+        self.endpoint = endpoint
+        self.blueprint = endpoint.rpartition(".")[0]
+        self.ttl = ttl
+        self.response = None
+        self.expires = 0.0
+
+
+class FastLaneMiddleware:
+    """Answer opted-in routes from rendered bytes, bypassing Flask."""
+
+    def __init__(self, wsgi_app, routes):
+        self.wsgi_app = wsgi_app
+        self.routes = routes
+
+    def __call__(self, environ, start_response):
+        route = self.routes.get(environ.get("PATH_INFO"))
+        method = environ.get("REQUEST_METHOD")
+        if route is None or environ.get("QUERY_STRING") or method not in ("GET", "HEAD"):
+            return self.wsgi_app(environ, start_response)
+
+        response = route.response
+        if response is None or time.monotonic() >= route.expires:
+            if method == "HEAD":
+                return self.wsgi_app(environ, start_response)
+            return self._render(route, environ, start_response)
+
+        record = environ.get(RECORD_KEY)
+        if record is not None:
+            record.endpoint = route.endpoint
+            record.blueprint = route.blueprint
+        status, headers, body = response
+        start_response(status, list(headers))
+        return [body] if method == "GET" else []
+
+    def _render(self, route, environ, start_response):
+        """Serve the request through Flask and keep a cacheable response."""
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers]
+            return start_response(status, headers, exc_info)
+
+        iterable = self.wsgi_app(environ, capture)
+        try:
+            body = b"".join(iterable)
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+
+        status, headers = captured
+        if status.startswith("200") and not any(
+            name.lower() == "set-cookie" for name, _ in headers
+        ):
+            route.response = (status, tuple(headers), body)
+            route.expires = time.monotonic() + route.ttl
+        return [body]
+
+
+def get_fast_lane(app):
+    """Return the app's path -> Route table, or None if disabled."""
+    return app.extensions.get(EXTENSION)
+
+
+def init_app(app):
+    """Serve views decorated with fast_lane from the fast lane if FAST_LANE is set.
+
+    Call after the blueprints are registered and before the lifecycle
+    middleware is installed, so that it wraps this one.
+    """
+    if not app.config.get("FAST_LANE", True):
+        return
+
+    routes = {}
+    for rule in app.url_map.iter_rules():
+        view = app.view_functions.get(rule.endpoint)
+        ttl = getattr(view, ATTRIBUTE, None)
+        if ttl is not None and not rule.arguments and "GET" in rule.methods:
+            routes[rule.rule] = Route(rule.endpoint, ttl)
+    if not routes:
+        return
+
+    app.wsgi_app = FastLaneMiddleware(app.wsgi_app, routes)
+    app.extensions[EXTENSION] = routes
@@ -0,0 +1,118 @@
+"""
+JSON provider used by every ``jsonify`` call in HTTPilot.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Both produce the same JSON values; the stdlib path keeps Flask's
+ASCII escaping because it is the faster mode of the stdlib encoder.
+"""
+from collections.abc import Mapping
+
+from flask import request, has_request_context
+from flask.json.provider import DefaultJSONProvider
+
+from .server_timing import probe
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(o):
+    """Serialize the types orjson hands back to us.
+
+    orjson is told to pass subclasses of builtins through (see
+    ``OPT_PASSTHROUGH_SUBCLASS``) so that e.g. Werkzeug's ``MultiDict`` is
+    serialized via its public ``items()`` like the stdlib encoder does, not
+    from its internal list values.
+    """
+    if isinstance(o, Mapping):
+        return dict(o.items())
+    if isinstance(o, str):
+        return str(o)
+    if isinstance(o, int):
+        return int(o)
+    if isinstance(o, (list, tuple)):
+        return list(o)
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Compact JSON provider backed by orjson when available.
+
+    Responses are compact unless the app runs in debug mode,
+    ``JSONIFY_PRETTYPRINT_REGULAR`` is set, or the request asks for
+    ``?pretty``. ``JSON_SORT_KEYS`` is honoured.
+    """
+
+    default = staticmethod(_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.sort_keys = app.config.get("JSON_SORT_KEYS", False)
+        self.pretty = app.config.get("JSONIFY_PRETTYPRINT_REGULAR", False)
+
+        if orjson is not None:
+            self._options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS
+            self._options |= orjson.OPT_PASSTHROUGH_DATETIME
+            if self.sort_keys:
+                self._options |= orjson.OPT_SORT_KEYS
+
+    def dumps(self, obj, **kwargs):
+        """Serialize data as JSON to a string.
+
+        Only ``indent`` is understood by the fast path, and only as a
+        switch: any truthy value gives orjson's 2-space indent. Any other
+        keyword argument sends the call to :func:`json.dumps`.
+        """
+        if orjson is None or kwargs.keys() - {"indent"}:
+            return super().dumps(obj, **kwargs)
+
+        options = self._options
+        if kwargs.get("indent"):
+            options |= orjson.OPT_INDENT_2
+
+        try:
+            return orjson.dumps(obj, default=self.default, option=options).decode()
+        except TypeError:
+            # Values orjson refuses (e.g. integers wider than 64 bits) are
+            # still valid for the stdlib encoder, formatted like orjson would.
+            if kwargs.get("indent"):
+                return super().dumps(obj, indent=2)
+            return super().dumps(obj, separators=(",", ":"))
+
+    def loads(self, s, **kwargs):
+        """Deserialize data as JSON from a string or bytes."""
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than the stdlib (NaN, huge integers), let
+            # json.loads make the final call.
+            return super().loads(s)
+
+    def wants_pretty(self):
+        """Return True if the current response should be indented."""
+        if self.pretty or self._app.debug:
+            return True
+
+        if not has_request_context() or b"pretty" not in request.query_string:
+            return False
+
+        return request.args.get("pretty", "").lower() not in ("0", "false", "no")
+
+    def response(self, *args, **kwargs):
+        """Serialize the given arguments as a JSON response."""
+        obj = self._prepare_response_obj(args, kwargs)
+
+        with probe("json"):
+            if self.wants_pretty():
+                body = self.dumps(obj, indent=2)
+            elif orjson is None:
+                body = self.dumps(obj, separators=(",", ":"))
+            else:
+                body = self.dumps(obj)
+
+        return self._app.response_class(f"{body}\n", mimetype=self.mimetype)
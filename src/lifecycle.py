@@ -0,0 +1,254 @@
+"""
+Request lifecycle tracking shared by HTTPilot's instrumentation.
+
+Every request gets a :class:`RequestRecord` that is created when the request
+enters the WSGI app and finished exactly once: when the response body has
+been sent, or when the server closed it early (e.g. the client went away).
+Instrumentation subscribes with :meth:`Lifecycle.on_start` and
+:meth:`Lifecycle.on_finish`.
+"""
+import time
+
+from flask import request
+
+EXTENSION = "httpilot.lifecycle"
+RECORD_KEY = "httpilot.record"
+START_KEY = "httpilot.start_ns"
+
+
+class RequestRecord:
+    """What is known about one request while it is served."""
+
+    __slots__ = (
+        "start_ns",
+        "end_ns",
+        "method",
+        "path",
+        "blueprint",
+        "endpoint",
+        "status",
+        "bytes_in",
+        "bytes_out",
+        "completed",
+        "started",
+        "finished",
+        "admission",
+        "thread_ident",
+    )
+
+    def __init__(self, start_ns, method, path, blueprint, endpoint, bytes_in):
+        self.start_ns = start_ns
+        self.end_ns = None
+        self.method = method
+        self.path = path
+        self.blueprint = blueprint
+        self.endpoint = endpoint
+        self.status = None
+        self.bytes_in = bytes_in
+        self.bytes_out = 0
+        self.completed = False
+        self.started = False
+        self.finished = False
+        # Limiter slot held by the request, see src.admission
+        self.admission = None
+        # Thread the request started on, see src.sampling
+        self.thread_ident = None
+
+    @property
+    def duration(self):
+        """Seconds from WSGI entry to finish (or to now while in flight)."""
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e9
+
+
+class TrackedInput:
+    """Wrap ``wsgi.input`` to count the bytes the app reads.
+
+    Used for bodies without Content-Length (chunked uploads), whose size is
+    only known once they have been read.
+    """
+
+    __slots__ = ("_stream", "_record")
+
+    def __init__(self, stream, record):
+        self._stream = stream
+        self._record = record
+
+    def _count(self, size):
+        if size:
+            self._record.bytes_in += size
+
+    def read(self, *args):
+        data = self._stream.read(*args)
+        self._count(len(data))
+        return data
+
+    def readline(self, *args):
+        line = self._stream.readline(*args)
+        self._count(len(line))
+        return line
+
+    def readlines(self, *args):
+        lines = self._stream.readlines(*args)
+        self._count(sum(map(len, lines)))
+        return lines
+
+    def readinto(self, buffer):
+        readinto = getattr(self._stream, "readinto", None)
+        if readinto is None:
+            data = self._stream.read(len(buffer))
+            size = len(data)
+            buffer[:size] = data
+        else:
+            size = readinto(buffer)
+        self._count(size)
+        return size
+
+    def __iter__(self):
+        for line in self._stream:
+            self._count(len(line))
+            yield line
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class TrackedBody:
+    """Wrap a response body to count bytes and finish the record."""
+
+    __slots__ = ("_iterable", "_record", "_finish")
+
+    def __init__(self, iterable, record, finish):
+        self._iterable = iterable
+        self._record = record
+        self._finish = finish
+
+    def __iter__(self):
+        record = self._record
+        for chunk in self._iterable:
+            record.bytes_out += len(chunk)
+            yield chunk
+        record.completed = True
+        self._finish(record)
+
+    def close(self):
+        close = getattr(self._iterable, "close", None)
+        try:
+            if close is not None:
+                close()
+        finally:
+            self._finish(self._record)
+
+
+class LifecycleMiddleware:
+    """Start a RequestRecord on WSGI entry and finish it once the body is sent.
+
+    Status and byte counts are taken from what the app hands to the server,
+    so only a single Flask hook (to learn the endpoint) runs per request.
+    """
+
+    def __init__(self, wsgi_app, lifecycle):
+        self.wsgi_app = wsgi_app
+        self.lifecycle = lifecycle
+
+    def __call__(self, environ, start_response):
+        try:
+            bytes_in = max(0, int(environ.get("CONTENT_LENGTH") or 0))
+        except ValueError:
+            bytes_in = 0
+        record = RequestRecord(
+            time.perf_counter_ns(),
+            environ.get("REQUEST_METHOD", "GET"),
+            environ.get("PATH_INFO", "/"),
+            "",
+            "",
+            bytes_in,
+        )
+        environ[START_KEY] = record.start_ns
+        environ[RECORD_KEY] = record
+        if not bytes_in and "HTTP_TRANSFER_ENCODING" in environ:
+            # Chunked: count the body as it is read
+            environ["wsgi.input"] = TrackedInput(environ["wsgi.input"], record)
+
+        def tracked_start_response(status, headers, exc_info=None):
+            record.status = int(status[:3])
+            return start_response(status, headers, exc_info)
+
+        finish = self.lifecycle.finish
+        try:
+            body = self.wsgi_app(environ, tracked_start_response)
+        except BaseException:
+            # Only reached when exceptions propagate (e.g. under TESTING).
+            record.status = 500
+            finish(record)
+            raise
+        return TrackedBody(body, record, finish)
+
+
+class Lifecycle:
+    """Start and finish hooks for every request handled by an app."""
+
+    def __init__(self, app=None):
+        self.start_hooks = []
+        self.finish_hooks = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions[EXTENSION] = self
+        app.wsgi_app = LifecycleMiddleware(app.wsgi_app, self)
+        app.before_request(self._before_request)
+
+    def on_start(self, hook):
+        """Call hook(record) when a request starts."""
+        self.start_hooks.append(hook)
+        return hook
+
+    def on_finish(self, hook):
+        """Call hook(record) once when a request is finished."""
+        self.finish_hooks.append(hook)
+        return hook
+
+    def start(self, record):
+        if record.started:
+            return
+        record.started = True
+        for hook in self.start_hooks:
+            hook(record)
+
+    def finish(self, record):
+        if record.finished:
+            return
+        record.finished = True
+        record.end_ns = time.perf_counter_ns()
+        # Requests answered before our before_request ran are started here,
+        # so hooks always see a start for every finish.
+        self.start(record)
+        if record.status is None:
+            record.status = 500
+        for hook in self.finish_hooks:
+            hook(record)
+
+    def _before_request(self):
+        req = request._get_current_object()
+        record = req.environ.get(RECORD_KEY)
+        if record is None:
+            return
+        rule = req.url_rule
+        if rule is not None:
+            record.endpoint = rule.endpoint
+            record.blueprint = rule.endpoint.rpartition(".")[0]
+        self.start(record)
+
+
+def get_lifecycle(app):
+    """Return the app's Lifecycle, installing it on first use."""
+    lifecycle = app.extensions.get(EXTENSION)
+    if lifecycle is None:
+        lifecycle = Lifecycle(app)
+    return lifecycle
+
+
+def current_record():
+    """Return the RequestRecord of the current request, if any."""
+    return request.environ.get(RECORD_KEY)
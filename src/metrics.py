@@ -0,0 +1,288 @@
+"""
+Server-side request metrics exposed on ``/metrics`` in Prometheus format.
+
+Values are recorded into per-thread shards: a thread only ever writes its
+own dict, so recording needs no lock. A scrape sums all shards. Shards of
+threads that have exited are folded into a retired total so the list does
+not grow with servers that use a thread per connection.
+
+A single process only sees its own traffic; with several workers set
+METRICS_DIR to share values between them.
+"""
+import threading
+from bisect import bisect_left
+
+from flask import Blueprint, Response, current_app
+
+from .lifecycle import get_lifecycle
+
+EXTENSION = "httpilot.metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 100us doubling up to ~52s, fixed so histograms from any worker can be summed.
+LATENCY_BUCKETS = tuple(0.0001 * 2**i for i in range(20))
+
+# The method label comes from the client; anything else is counted as "other".
+METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "DELETE", "CONNECT", "OPTIONS", "TRACE", "PATCH")
+)
+
+bp = Blueprint("metrics", __name__)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{0}="{1}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for name, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+class Registry:
+    """Counters, gauges and histograms kept in per-thread shards."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_labels = tuple(_format_value(b) for b in self.buckets) + ("+Inf",)
+        self.families = {}
+        self.collectors = []
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, help_text):
+        """Declare a metric family (counter, gauge or histogram)."""
+        self.families[name] = (kind, help_text)
+
+    def add_collector(self, collector):
+        """Add a callable returning ``(name, labels, value)`` samples at scrape."""
+        self.collectors.append(collector)
+        return collector
+
+    def _shard(self):
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), values))
+            return values
+
+    def _retire_dead_shards(self):
+        alive = []
+        for thread, values in self._shards:
+            if thread.is_alive():
+                alive.append((thread, values))
+            else:
+                for key, value in values.items():
+                    self._retired[key] = self._retired.get(key, 0) + value
+        self._shards = alive
+
+    def _add(self, key, amount):
+        values = self._shard()
+        values[key] = values.get(key, 0) + amount
+
+    def inc(self, name, labels=(), amount=1):
+        """Add amount to a counter or gauge."""
+        self._add((name, labels), amount)
+
+    def dec(self, name, labels=(), amount=1):
+        """Subtract amount from a gauge."""
+        self._add((name, labels), -amount)
+
+    def observe(self, name, labels, value):
+        """Record value in a histogram."""
+        le = self.bucket_labels[bisect_left(self.buckets, value)]
+        self._add((name + "_bucket", labels + (("le", le),)), 1)
+        self._add((name + "_sum", labels), value)
+        self._add((name + "_count", labels), 1)
+
+    def collect(self):
+        """Return the summed value of every sample key."""
+        with self._lock:
+            self._retire_dead_shards()
+            totals = dict(self._retired)
+            shards = [values for _, values in self._shards]
+
+        for values in shards:
+            # dict.copy() is atomic, the owning thread may keep writing.
+            for key, value in values.copy().items():
+                totals[key] = totals.get(key, 0) + value
+
+        for collector in self.collectors:
+            for name, labels, value in collector():
+                totals[(name, labels)] = value
+        return totals
+
+    def exposition(self):
+        """Render all metrics in the Prometheus text format."""
+        samples = {}
+        for (name, labels), value in self.collect().items():
+            family = name
+            if name not in self.families:
+                for suffix in ("_bucket", "_sum", "_count"):
+                    if name.endswith(suffix):
+                        family = name[: -len(suffix)]
+            samples.setdefault(family, []).append((name, labels, value))
+
+        order = {le: i for i, le in enumerate(self.bucket_labels)}
+        suffix_order = {"_bucket": 0, "_sum": 1, "_count": 2}
+        lines = []
+        for family in sorted(self.families):
+            kind, help_text = self.families[family]
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {kind}")
+            family_samples = samples.get(family, [])
+
+            if kind == "histogram":
+                lines.extend(self._histogram_lines(family, family_samples, order))
+                continue
+
+            for name, labels, value in sorted(family_samples, key=lambda s: s[1]):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def _histogram_lines(self, family, samples, order):
+        series = {}
+        for name, labels, value in samples:
+            suffix = name[len(family):]
+            if suffix == "_bucket":
+                base = tuple(pair for pair in labels if pair[0] != "le")
+                le = dict(labels)["le"]
+                series.setdefault(base, {}).setdefault("buckets", {})[le] = value
+            else:
+                series.setdefault(labels, {})[suffix] = value
+
+        lines = []
+        for labels in sorted(series):
+            data = series[labels]
+            buckets = data.get("buckets", {})
+            cumulative = 0
+            for le in self.bucket_labels:
+                cumulative += buckets.get(le, 0)
+                bucket_labels = labels + (("le", le),)
+                lines.append(
+                    f"{family}_bucket{_format_labels(bucket_labels)} {_format_value(cumulative)}"
+                )
+            lines.append(
+                f"{family}_sum{_format_labels(labels)} {_format_value(data.get('_sum', 0))}"
+            )
+            lines.append(
+                f"{family}_count{_format_labels(labels)} {_format_value(data.get('_count', 0))}"
+            )
+        return lines
+
+
+class RequestMetrics:
+    """Record request counts, sizes and latencies into a Registry."""
+
+    def __init__(self, app=None, registry=None):
+        self.registry = registry or Registry()
+        self._labels = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        registry = self.registry
+        registry.describe(
+            "httpilot_requests_total", "counter", "Requests served, by status class."
+        )
+        registry.describe(
+            "httpilot_requests_in_flight", "gauge", "Requests currently being served."
+        )
+        registry.describe(
+            "httpilot_request_bytes_total", "counter", "Request body bytes received."
+        )
+        registry.describe(
+            "httpilot_response_bytes_total", "counter", "Response body bytes sent."
+        )
+        registry.describe(
+            "httpilot_request_duration_seconds",
+            "histogram",
+            "Time from WSGI entry until the response body was sent.",
+        )
+
+        lifecycle = get_lifecycle(app)
+        lifecycle.on_start(self.request_started)
+        lifecycle.on_finish(self.request_finished)
+
+        app.extensions[EXTENSION] = self
+        app.register_blueprint(bp)
+
+    def route_labels(self, record):
+        key = (record.blueprint, record.endpoint)
+        labels = self._labels.get(key)
+        if labels is None:
+            # Bounded by the number of routes, 404s share "unmatched".
+            labels = self._labels[key] = (
+                ("blueprint", record.blueprint),
+                ("endpoint", record.endpoint or "unmatched"),
+            )
+        return labels
+
+    def request_started(self, record):
+        self.registry.inc("httpilot_requests_in_flight", self.route_labels(record))
+
+    def request_finished(self, record):
+        registry = self.registry
+        labels = self.route_labels(record)
+        status_class = f"{record.status // 100}xx"
+        method = record.method if record.method in METHODS else "other"
+
+        registry.dec("httpilot_requests_in_flight", labels)
+        registry.inc(
+            "httpilot_requests_total",
+            labels + (("method", method), ("status_class", status_class)),
+        )
+        if record.bytes_in:
+            registry.inc("httpilot_request_bytes_total", labels, record.bytes_in)
+        if record.bytes_out:
+            registry.inc("httpilot_response_bytes_total", labels, record.bytes_out)
+        registry.observe("httpilot_request_duration_seconds", labels, record.duration)
+
+
+def get_registry(app):
+    """Return the metrics Registry of app, or None if metrics are disabled."""
+    metrics = app.extensions.get(EXTENSION)
+    return metrics.registry if metrics is not None else None
+
+
+def init_app(app):
+    """Install request metrics on app if METRICS_ENABLED is set.
+
+    With METRICS_DIR set, values are shared between worker processes
+    through files in that directory (see :mod:`src.shared_metrics`).
+    """
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    registry = None
+    directory = app.config.get("METRICS_DIR")
+    if directory:
+        from .shared_metrics import SharedRegistry
+
+        registry = SharedRegistry(directory)
+    RequestMetrics(app, registry)
+
+
+@bp.route("/metrics")
+def metrics():
+    """Return all metrics in the Prometheus text exposition format."""
+    registry = get_registry(current_app)
+    return Response(registry.exposition(), content_type=CONTENT_TYPE)
@@ -0,0 +1,222 @@
+"""
+On-demand profiling of single requests.
+
+Only installed when ``DEBUG_SECRET`` is set; otherwise nothing is added to
+the request path. A request is profiled when it carries both headers::
+
+    X-Debug-Secret: <DEBUG_SECRET>
+    X-Profile: collapsed | pstats | prof
+
+``collapsed`` samples the request's thread every ``PROFILE_INTERVAL``
+seconds and returns folded stacks (for flamegraph.pl or speedscope),
+``pstats`` runs :mod:`cProfile` and returns its text report, ``prof`` the
+binary cProfile dump. The whole response body is consumed under the
+profiler, so streaming generators are covered.
+
+By default the profile replaces the response body (the original status is
+in ``X-Profile-Status``). With ``X-Profile-Mode: attach`` the response is
+returned unchanged with an ``X-Profile-Id`` header; the profile can then be
+fetched from ``/debug/profiles/<id>``.
+"""
+import hmac
+import io
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+EXTENSION = "httpilot.profiling"
+FORMATS = {
+    "collapsed": "text/plain; charset=utf-8",
+    "pstats": "text/plain; charset=utf-8",
+    "prof": "application/octet-stream",
+}
+
+
+def frame_name(code, module):
+    """Return the name used for a code object in collapsed stacks."""
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{module}:{name}"
+
+
+def collapse_stack(frame, stop_code=None):
+    """Return the stack of frame as a tuple of names, outermost first.
+
+    Frames from stop_code outwards (the server and the profiler itself) are
+    left out.
+    """
+    names = []
+    while frame is not None and frame.f_code is not stop_code:
+        names.append(frame_name(frame.f_code, frame.f_globals.get("__name__", "?")))
+        frame = frame.f_back
+    names.reverse()
+    return tuple(names)
+
+
+def format_collapsed(counts):
+    """Render {stack: samples} as folded stack lines."""
+    return "".join(
+        f"{';'.join(stack)} {count}\n" for stack, count in counts.most_common()
+    )
+
+
+def is_authorized(secret, value):
+    """Compare a client supplied secret in constant time."""
+    if not secret or not value:
+        return False
+    return hmac.compare_digest(secret.encode("utf-8"), value.encode("latin-1"))
+
+
+class RequestSampler:
+    """Sample one thread's stack at a fixed interval from a helper thread."""
+
+    def __init__(self, thread_id, interval, stop_code=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stop_code = stop_code
+        self.counts = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="httpilot-request-sampler", daemon=True
+        )
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = collapse_stack(frame, self.stop_code)
+                if stack:
+                    self.counts[stack] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+class ProfilingMiddleware:
+    """Profile requests that ask for it with X-Profile and the debug secret."""
+
+    def __init__(self, wsgi_app, secret, interval=0.001, keep=32):
+        self.wsgi_app = wsgi_app
+        self.secret = secret
+        self.interval = interval
+        self.keep = keep
+        self.profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        fmt = environ.get("HTTP_X_PROFILE")
+        if fmt is None:
+            return self.wsgi_app(environ, start_response)
+        if fmt not in FORMATS or not is_authorized(
+            self.secret, environ.get("HTTP_X_DEBUG_SECRET")
+        ):
+            return self.wsgi_app(environ, start_response)
+
+        captured = []
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured[:] = [status, headers]
+            return lambda data: None
+
+        start = time.perf_counter()
+        chunks, profile = self._profile(fmt, environ, capture_start_response)
+        elapsed = time.perf_counter() - start
+        status, headers = captured
+
+        if environ.get("HTTP_X_PROFILE_MODE", "").lower() == "attach":
+            profile_id = self._store(fmt, profile)
+            headers = headers + [("X-Profile-Id", profile_id)]
+            start_response(status, headers)
+            return chunks
+
+        start_response(
+            "200 OK",
+            [
+                ("Content-Type", FORMATS[fmt]),
+                ("Content-Length", str(len(profile))),
+                ("X-Profile-Status", status.split(" ", 1)[0]),
+                ("X-Profile-Elapsed", f"{elapsed:.6f}"),
+            ],
+        )
+        return [profile]
+
+    def _run_app(self, environ, start_response):
+        body = self.wsgi_app(environ, start_response)
+        try:
+            return list(body)
+        finally:
+            close = getattr(body, "close", None)
+            if close is not None:
+                close()
+
+    def _profile(self, fmt, environ, start_response):
+        """Run the app and its body under the profiler for fmt."""
+        if fmt == "collapsed":
+            sampler = RequestSampler(
+                threading.get_ident(), self.interval, stop_code=self._profile.__code__
+            )
+            sampler.start()
+            try:
+                chunks = self._run_app(environ, start_response)
+            finally:
+                sampler.stop()
+            return chunks, format_collapsed(sampler.counts).encode("utf-8")
+
+        # Only needed when a profile is requested, keep them off startup.
+        import cProfile
+        import marshal
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            chunks = self._run_app(environ, start_response)
+        finally:
+            profiler.disable()
+
+        if fmt == "prof":
+            profiler.create_stats()
+            return chunks, marshal.dumps(profiler.stats)
+
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(100)
+        return chunks, out.getvalue().encode("utf-8")
+
+    def _store(self, fmt, profile):
+        profile_id = uuid.uuid4().hex
+        with self._lock:
+            self.profiles[profile_id] = (fmt, profile)
+            while len(self.profiles) > self.keep:
+                self.profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id):
+        """Return ``(format, data)`` of an attached profile, or None."""
+        with self._lock:
+            return self.profiles.get(profile_id)
+
+
+def get_profiler(app):
+    """Return the app's ProfilingMiddleware, or None if not installed."""
+    return app.extensions.get(EXTENSION)
+
+
+def init_app(app):
+    """Install per-request profiling if DEBUG_SECRET is set."""
+    secret = app.config.get("DEBUG_SECRET")
+    if not secret:
+        return
+
+    middleware = ProfilingMiddleware(
+        app.wsgi_app,
+        secret,
+        interval=app.config.get("PROFILE_INTERVAL", 0.001),
+        keep=app.config.get("PROFILE_KEEP", 32),
+    )
+    app.wsgi_app = middleware
+    app.extensions[EXTENSION] = middleware
@@ -0,0 +1,256 @@
+"""
+Streaming request body helpers.
+
+Bodies are read from the WSGI input in fixed-size chunks and hashed as they
+arrive, so memory use does not depend on the upload size. Only the first
+``BODY_ECHO_LIMIT`` bytes are kept for echoing back to the client.
+:func:`drain` is the cheapest path: it only counts bytes and read timing.
+"""
+import hashlib
+import threading
+import time
+import zlib
+from io import BytesIO
+
+from flask import current_app, request
+
+DIGESTS = ("sha256", "md5", "crc32")
+
+# Scratch buffers for drain(), one per thread and reused across requests.
+_scratch = threading.local()
+
+
+class CRC32:
+    """hashlib-style wrapper around :func:`zlib.crc32`."""
+
+    name = "crc32"
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        return f"{self.value:08x}"
+
+
+def new_digest(name):
+    """Return a new hash object for one of DIGESTS."""
+    if name == "crc32":
+        return CRC32()
+    if name in DIGESTS:
+        return hashlib.new(name)
+    raise ValueError(f"unsupported digest: {name}")
+
+
+def requested_digests(default):
+    """Return the digests asked for with ``?digest=a,b`` (``none`` for none)."""
+    value = request.args.get("digest")
+    if value is None:
+        return tuple(default)
+    names = [name.strip().lower() for name in value.split(",")]
+    return tuple(name for name in names if name in DIGESTS)
+
+
+class BodyStats:
+    """Size, digests, timing and echo prefix of a request body."""
+
+    def __init__(self, digests=DIGESTS, echo_limit=0):
+        self.size = 0
+        self.digests = {name: new_digest(name) for name in digests}
+        self.echo_limit = echo_limit
+        self.prefix = bytearray()
+        self.elapsed = 0.0
+
+    def update(self, chunk):
+        """Account for the next chunk of the body."""
+        self.size += len(chunk)
+        for digest in self.digests.values():
+            digest.update(chunk)
+
+        room = self.echo_limit - len(self.prefix)
+        if room > 0:
+            self.prefix += chunk[:room]
+
+    @property
+    def truncated(self):
+        """True if the body did not fit in the echo prefix."""
+        return self.size > len(self.prefix)
+
+    @property
+    def throughput(self):
+        """Observed read rate in bytes per second."""
+        if not self.elapsed:
+            return 0
+        return int(self.size / self.elapsed)
+
+    def text(self):
+        """Return the echo prefix decoded as UTF-8, or None for binary data.
+
+        A truncated prefix may end in the middle of a multi-byte character,
+        so up to three trailing bytes are dropped before giving up.
+        """
+        data = bytes(self.prefix)
+        attempts = 4 if self.truncated else 1
+        for cut in range(attempts):
+            try:
+                return data[: len(data) - cut].decode("utf-8")
+            except UnicodeDecodeError:
+                continue
+        return None
+
+    def to_dict(self):
+        stats = {"size": self.size}
+        for name, digest in self.digests.items():
+            stats[name] = digest.hexdigest()
+        stats["elapsed"] = round(self.elapsed, 6)
+        stats["throughput"] = self.throughput
+        stats["truncated"] = self.truncated
+        return stats
+
+
+def read_body(stream, chunk_size, digests=DIGESTS, echo_limit=0):
+    """Read stream to the end in chunks and return its BodyStats."""
+    stats = BodyStats(digests, echo_limit)
+    read = stream.read
+    start = time.perf_counter()
+
+    chunk = read(chunk_size)
+    while chunk:
+        stats.update(chunk)
+        chunk = read(chunk_size)
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def read_request_body():
+    """Stream the current request body using the app's BODY_* settings."""
+    config = current_app.config
+    return read_body(
+        request.stream,
+        config["BODY_CHUNK_SIZE"],
+        requested_digests(config["BODY_DIGESTS"]),
+        config["BODY_ECHO_LIMIT"],
+    )
+
+
+def echo_limit_error(body):
+    """Return the message for a body too large to keep for parsing."""
+    return f"body of {body.size} bytes exceeds the echo limit of {body.echo_limit} bytes"
+
+
+def parse_form(body):
+    """Parse a form body from the echo prefix, or None if it was truncated."""
+    if body.truncated:
+        return None
+    parser = request.make_form_data_parser()
+    _, form, _ = parser.parse(
+        BytesIO(bytes(body.prefix)),
+        request.mimetype,
+        body.size,
+        request.mimetype_params,
+    )
+    return form
+
+
+def parse_json(body):
+    """Parse a JSON body from the echo prefix.
+
+    Raises ValueError if the body is invalid or was too large to keep.
+    """
+    if body.truncated:
+        raise ValueError(echo_limit_error(body))
+    return current_app.json.loads(bytes(body.prefix))
+
+
+class SinkStats:
+    """Byte counts and read timing of a drained request body.
+
+    A stall is a read that took longer than stall_threshold seconds to return
+    data. Only the first max_stalls are listed; all are counted.
+    """
+
+    def __init__(self, stall_threshold, max_stalls):
+        self.size = 0
+        self.reads = 0
+        self.elapsed = 0.0
+        self.ttfb = None
+        self.stall_threshold = stall_threshold
+        self.max_stalls = max_stalls
+        self.stalls = []
+        self.stall_count = 0
+        self.stall_time = 0.0
+        self.longest_stall = 0.0
+
+    def stall(self, at, duration):
+        self.stall_count += 1
+        self.stall_time += duration
+        self.longest_stall = max(self.longest_stall, duration)
+        if len(self.stalls) < self.max_stalls:
+            self.stalls.append(
+                {"offset": self.size, "at": round(at, 6), "duration": round(duration, 6)}
+            )
+
+    def to_dict(self):
+        return {
+            "size": self.size,
+            "reads": self.reads,
+            "elapsed": round(self.elapsed, 6),
+            "throughput": int(self.size / self.elapsed) if self.elapsed else 0,
+            "ttfb": None if self.ttfb is None else round(self.ttfb, 6),
+            "stalls": {
+                "threshold": self.stall_threshold,
+                "count": self.stall_count,
+                "total": round(self.stall_time, 6),
+                "longest": round(self.longest_stall, 6),
+                "intervals": self.stalls,
+            },
+        }
+
+
+def drain(stream, chunk_size, stall_threshold=0.1, max_stalls=100, start=None):
+    """Read stream to the end, discarding the data, and return SinkStats.
+
+    Streams that support ``readinto`` are read into a per-thread scratch
+    buffer so draining allocates nothing per chunk. ``start`` is the
+    perf_counter reference for ttfb and stall offsets.
+    """
+    stats = SinkStats(stall_threshold, max_stalls)
+    clock = time.perf_counter
+    if start is None:
+        start = clock()
+
+    readinto = getattr(stream, "readinto", None)
+    if readinto is not None:
+        buffer = getattr(_scratch, "buffer", None)
+        if buffer is None or len(buffer) != chunk_size:
+            buffer = _scratch.buffer = memoryview(bytearray(chunk_size))
+
+        def read():
+            return readinto(buffer) or 0
+
+    else:
+
+        def read():
+            return len(stream.read(chunk_size))
+
+    last = clock()
+    while True:
+        n = read()
+        now = clock()
+        if not n:
+            break
+
+        if stats.ttfb is None:
+            stats.ttfb = now - start
+        elif now - last > stall_threshold:
+            stats.stall(last - start, now - last)
+
+        stats.size += n
+        stats.reads += 1
+        last = now
+
+    stats.elapsed = last - start
+    return stats
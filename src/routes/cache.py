@@ -2,10 +2,9 @@
 Cache routes.
 """
 from flask import Blueprint, request, jsonify, make_response
-from werkzeug.http import http_date
 import uuid
 
-from .utils import utcnow
+from .utils import http_date, utcnow
 from .status_codes import status_code
 
 bp = Blueprint("cache", __name__)
@@ -1,4 +1,6 @@
 """Cookie manipulation routes."""
+import ipaddress
+import string
 
 from flask import Blueprint, redirect, request, jsonify, make_response, url_for
 
@@ -6,11 +8,39 @@ from .utils import utcnow
 
 bp = Blueprint("cookies", __name__)
 
+MAX_BULK_COOKIES = 10000
+MAX_BULK_VALUE_SIZE = 4000
+MAX_BULK_BYTES = 4 * 1024 * 1024
+# Cookie values are cut from this, so they never need quoting.
+VALUE_ALPHABET = string.ascii_letters + string.digits + "-_"
+EXPIRY_KINDS = ("session", "persistent", "expired")
+EXPIRED = "; Expires=Thu, 01 Jan 1970 00:00:00 GMT; Max-Age=0"
+
+
+def parse_cookies(header):
+    """Return the first value of each cookie in a Cookie header.
+
+    Same result as ``dict(request.cookies.items())`` for headers without
+    quoted values, with a split instead of Werkzeug's regular expression
+    and no MultiDict.
+    """
+    cookies = {}
+    for pair in header.split(";"):
+        key, _, value = pair.partition("=")
+        key = key.strip()
+        if key and key not in cookies:
+            cookies[key] = value.strip()
+    return cookies
+
 
 @bp.route("/cookies", methods=["GET"])
 def view_cookies():
     """Return cookie data."""
-    cookies = dict(request.cookies.items())
+    header = ";".join(request.headers.getlist("Cookie"))
+    if '"' in header:
+        cookies = dict(request.cookies.items())
+    else:
+        cookies = parse_cookies(header)
     response_data = {"cookies": cookies, "timestamp": utcnow()}
     return make_response(jsonify(response_data))
 
@@ -47,3 +77,110 @@ def delete_cookies():
         response.delete_cookie(key=key)
 
     return response
+
+
+def cookie_domains(host):
+    """Return the Domain attributes a client accepts from host, None for host-only.
+
+    These are the host itself and its parent domains with at least two
+    labels; IP addresses and single-label hosts only get host-only cookies.
+    """
+    host = host.rpartition(":")[0] if host.rpartition(":")[2].isdigit() else host
+    domains = [None]
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return domains
+    except ValueError:
+        pass
+    labels = host.split(".")
+    domains.extend(".".join(labels[i:]) for i in range(len(labels) - 1))
+    return domains
+
+
+def bulk_cookie_lines(count, size, domains, kinds, secure):
+    """Return ``count`` Set-Cookie header values, attributes in dump_cookie order.
+
+    Cookies cycle through the domains, then the kinds, then the lifetimes
+    of persistent cookies (1 to 24 hours), so every combination is used.
+    Every distinct attribute suffix is rendered once.
+    """
+    flags = ("; Secure" if secure else "") + "; HttpOnly; Path=/"
+    lifetimes = {
+        "session": [""],
+        "persistent": [f"; Max-Age={3600 * hours}" for hours in range(1, 25)],
+        "expired": [EXPIRED],
+    }
+    # suffixes[domain][kind] lists the attribute strings cookies cycle through
+    suffixes = []
+    for domain in domains:
+        prefix = "" if domain is None else f"; Domain={domain}"
+        suffixes.append(
+            [[f"{prefix}{expiry}{flags}" for expiry in lifetimes[kind]] for kind in kinds]
+        )
+    values = VALUE_ALPHABET * (size // len(VALUE_ALPHABET) + 2)
+    period = len(VALUE_ALPHABET)
+    n_domains, n_kinds = len(domains), len(kinds)
+    lines = []
+    for i in range(count):
+        turn, domain = divmod(i, n_domains)
+        turn, kind = divmod(turn, n_kinds)
+        choices = suffixes[domain][kind]
+        start = i % period
+        lines.append(f"c{i}={values[start:start + size]}{choices[turn % len(choices)]}")
+    return lines
+
+
+def _bulk_arguments(args):
+    try:
+        count = int(args.get("count", 100))
+        size = int(args.get("size", 16))
+        spread = int(args.get("domain_spread", 1))
+        weights = [int(w) for w in args.get("expiry_mix", "1,0,0").split(",")]
+    except ValueError:
+        raise ValueError("count, size, domain_spread and expiry_mix must be integers") from None
+    if not 1 <= count <= MAX_BULK_COOKIES:
+        raise ValueError(f"count must be between 1 and {MAX_BULK_COOKIES}")
+    if not 1 <= size <= MAX_BULK_VALUE_SIZE:
+        raise ValueError(f"size must be between 1 and {MAX_BULK_VALUE_SIZE}")
+    if count * size > MAX_BULK_BYTES:
+        raise ValueError(f"count * size must be at most {MAX_BULK_BYTES}")
+    if spread < 1:
+        raise ValueError("domain_spread must be positive")
+    if len(weights) != 3 or min(weights) < 0 or not 0 < sum(weights) <= 1000:
+        raise ValueError("expiry_mix must be three weights: session,persistent,expired")
+    return count, size, spread, weights
+
+
+@bp.route("/cookies/bulk")
+def bulk_cookies():
+    """Sets count deterministic cookies in one response, for cookie jar tests.
+
+    ``size`` is the length of each value, ``domain_spread`` the number of
+    Domain attributes used in turn (host-only, the host, its parents) and
+    ``expiry_mix`` the session,persistent,expired weights.
+    """
+    try:
+        count, size, spread, weights = _bulk_arguments(request.args)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    domains = cookie_domains(request.host)[:spread]
+    kinds = [kind for kind, weight in zip(EXPIRY_KINDS, weights) for _ in range(weight)]
+    lines = bulk_cookie_lines(count, size, domains, kinds, request.is_secure)
+
+    # Cookie i has kind kinds[i // len(domains) % len(kinds)]
+    expiry = dict.fromkeys(EXPIRY_KINDS, 0)
+    for turn, start in enumerate(range(0, count, len(domains))):
+        expiry[kinds[turn % len(kinds)]] += min(len(domains), count - start)
+
+    response = jsonify(
+        {
+            "count": count,
+            "size": size,
+            "domains": domains,
+            "expiry": expiry,
+            "header_bytes": sum(map(len, lines)),
+        }
+    )
+    response.headers.extend([("Set-Cookie", line) for line in lines])
+    return response
@@ -0,0 +1,105 @@
+"""Debug routes, only registered when DEBUG_SECRET is set."""
+
+from flask import Blueprint, Response, abort, current_app, request, jsonify
+
+from ..allocations import get_tracker
+from ..errors import get_top_paths
+from ..profiling import FORMATS, get_profiler, is_authorized
+from ..sampling import format_folded, get_sampler, render_svg
+
+bp = Blueprint("debug", __name__, url_prefix="/debug")
+
+
+@bp.before_request
+def require_secret():
+    """Hide every debug route from requests without the X-Debug-Secret header."""
+    if not is_authorized(
+        current_app.config.get("DEBUG_SECRET"), request.headers.get("X-Debug-Secret")
+    ):
+        abort(404)
+
+
+@bp.route("/profiles/<profile_id>")
+def profile(profile_id):
+    """Return a profile attached to an earlier request with X-Profile-Mode: attach."""
+    profiler = get_profiler(current_app)
+    stored = profiler.get(profile_id) if profiler is not None else None
+    if stored is None:
+        abort(404)
+    fmt, data = stored
+    return Response(data, content_type=FORMATS[fmt])
+
+
+@bp.route("/flamegraph")
+def flamegraph():
+    """Return the continuous profiler's samples of the last ``?minutes=``.
+
+    ``?format=svg`` renders a flame graph, the default is folded stacks.
+    """
+    sampler = get_sampler(current_app)
+    if sampler is None:
+        return jsonify({"error": "the sampling profiler is not enabled"}), 404
+
+    minutes = request.args.get("minutes", sampler.window, type=int)
+    minutes = max(1, min(minutes, sampler.window))
+    trie = sampler.snapshot(minutes)
+
+    if request.args.get("format") == "svg":
+        title = f"HTTPilot, last {minutes} min"
+        return Response(render_svg(trie, title), content_type="image/svg+xml")
+    return Response(format_folded(trie), content_type=FORMATS["collapsed"])
+
+
+def _tracker():
+    tracker = get_tracker(current_app)
+    if tracker is None:
+        abort(404)
+    return tracker
+
+
+@bp.route("/allocations/start", methods=["POST"])
+def allocations_start():
+    """Start tracing allocations for ``?seconds=`` (default 60)."""
+    tracker = _tracker()
+    tracker.start(
+        request.args.get("seconds", 60, type=int),
+        request.args.get("frames", type=int),
+    )
+    return jsonify(tracker.report())
+
+
+@bp.route("/allocations/stop", methods=["POST"])
+def allocations_stop():
+    """Stop tracing allocations and return the report."""
+    tracker = _tracker()
+    tracker.stop()
+    return jsonify(tracker.report())
+
+
+@bp.route("/allocations")
+def allocations():
+    """Return per-endpoint peak memory and top allocation sites."""
+    return jsonify(_tracker().report())
+
+
+@bp.route("/not-found")
+def not_found():
+    """Return the most requested missing paths, ``?n=`` of them (default 20).
+
+    Counts are approximate: each path's true count lies between
+    ``count - error`` and ``count``.
+    """
+    top = get_top_paths(current_app)
+    if top is None:
+        abort(404)
+    n = max(1, request.args.get("n", 20, type=int))
+    return jsonify(
+        {
+            "total": top.total,
+            "tracked": len(top),
+            "paths": [
+                {"path": path, "count": count, "error": error}
+                for path, count, error in top.top(n)
+            ],
+        }
+    )
@@ -1,15 +1,16 @@
 """Dynamic data routes."""
 
 import uuid
-from flask import Blueprint, json, request, jsonify, make_response, Response, url_for
+from flask import Blueprint, abort, json, request, jsonify, make_response, Response
 import base64
 import time
 import random
-from six.moves import range as xrange
 
+from .graph import DEAD, SLOW, Graph
 from .http_methods import get_request_info
 
-from .utils import utcnow
+from .utils import url_template, utcnow
+from .. import admission
 
 bp = Blueprint("dynamic_data", __name__)
 
@@ -60,7 +61,7 @@ def random_bytes(n):
 
     response = make_response()
 
-    response.data = bytearray(random.randint(0, 255) for i in range(n))
+    response.data = bytes(random.randint(0, 255) for i in range(n))
     response.content_type = "application/octet-stream"
     return response
 
@@ -77,7 +78,8 @@ def view_uuid():
 def stream_n_messages(n):
     """Stream n JSON responses."""
     n = min(n, 100)
-    response = get_request_info()
+    # Materialize once: the generator runs after the request context is gone.
+    response = dict(get_request_info())
 
     def generate_stream():
         for i in range(n):
@@ -102,7 +104,7 @@ def stream_random_bytes(n):
     def generate_bytes():
         chunks = bytearray()
 
-        for i in xrange(n):
+        for i in range(n):
             chunks.append(random.randint(0, 255))
             if len(chunks) == chunk_size:
                 yield (bytes(chunks))
@@ -134,7 +136,7 @@ def drip():
     pause = duration / numbytes
 
     def generate_byte():
-        for i in xrange(numbytes):
+        for i in range(numbytes):
             yield b"*"
             time.sleep(pause)
 
@@ -148,24 +150,74 @@ def drip():
     )
 
 
+# (script root, n): (page, [(start, end) of each link in page])
+_link_pages = {}
+MAX_LINK_PAGES = 1024
+
+
+def _build_link_page(n):
+    template = url_template("dynamic_data.link_page", "offset", n=n)
+    page = "<html><head><title>Links</title></head><body>"
+    spans = []
+    for i in range(n):
+        link = f"<a href='{template(i)}'>{i}</a> "
+        spans.append((len(page), len(page) + len(link)))
+        page += link
+    return page + "</body></html>", spans
+
+
 @bp.route("/links/<int:n>/<int:offset>")
 def link_page(n, offset):
-    """Generate a page containing n links to other pages which do the same."""
+    """Generate a page containing n links to other pages which do the same.
+
+    The page with every entry linked is built once per n; a request only
+    replaces the link at offset with its plain number.
+    """
     n = min(max(1, n), 200)  # limit to between 1 and 200 links
 
-    link = "<a href='{0}'>{1}</a> "
-    html = ["<html><head><title>Links</title></head><body>"]
+    key = (request.script_root, n)
+    cached = _link_pages.get(key)
+    if cached is None:
+        if len(_link_pages) >= MAX_LINK_PAGES:
+            _link_pages.clear()
+        cached = _link_pages[key] = _build_link_page(n)
+    page, spans = cached
 
-    for i in xrange(n):
-        if i == offset:
-            html.append("{0} ".format(i))
-        else:
-            html.append(
-                link.format(url_for("dynamic_data.link_page", n=n, offset=i), i)
-            )
-    html.append("</body></html>")
+    if offset >= n:
+        return page
+    start, end = spans[offset]
+    return f"{page[:start]}{offset} {page[end:]}"
 
-    return "".join(html)
+
+def graph_link(graph):
+    """Return a function building the link to a node of graph."""
+    template = url_template("dynamic_data.graph_page", "node", seed=graph.seed)
+    query = graph.query()
+    return lambda node: f"{template(node)}{query}"
+
+
+@bp.route("/graph/<int:seed>/<int:node>")
+def graph_page(seed, node):
+    """Serve a node of the implicit link graph of seed, see :mod:`.graph`.
+
+    ``degree``, ``depth``, ``dead``, ``slow``, ``delay`` and ``extra`` query
+    arguments shape the graph and are carried over to every link.
+    """
+    try:
+        graph = Graph.from_args(seed, request.args)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    kind = graph.kind(node) if node < graph.size else DEAD
+    if kind == DEAD:
+        abort(404)
+    if kind == SLOW:
+        # Only slow nodes hold the worker, so only they take a slot.
+        with admission.hold("slow") as rejected:
+            if rejected is not None:
+                return rejected
+            time.sleep(graph.delay)
+    return graph.page(node, graph_link(graph))
 
 
 def __parse_request_range(range_header_text):
@@ -248,8 +300,8 @@ def range_request(numbytes):
 
     if (
         first_byte_pos > last_byte_pos
-        or first_byte_pos not in xrange(0, numbytes)
-        or last_byte_pos not in xrange(0, numbytes)
+        or first_byte_pos not in range(0, numbytes)
+        or last_byte_pos not in range(0, numbytes)
     ):
         response = Response(
             headers={
@@ -265,7 +317,7 @@ def range_request(numbytes):
     def generate_bytes():
         chunks = bytearray()
 
-        for i in xrange(first_byte_pos, last_byte_pos + 1):
+        for i in range(first_byte_pos, last_byte_pos + 1):
             # We don't want the resource to change across requests, so we need
             # to use a predictable data generation function.
             chunks.append(ord("a") + (i % 26))
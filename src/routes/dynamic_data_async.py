@@ -0,0 +1,216 @@
+"""
+Async versions of the waiting and streaming dynamic data routes.
+
+Served natively by the ASGI entry point (:mod:`src.asgi`); responses match
+the Flask views in :mod:`src.routes.dynamic_data`, whose parsing helpers
+they reuse.
+"""
+import json
+import random
+import time
+
+from .dynamic_data import get_request_range, graph_link
+from .graph import DEAD, SLOW, Graph
+from .http_methods import RequestInfo, requested_fields
+from .utils import utcnow
+from ..asgi import route
+from ..errors import get_error_pages
+
+# Bytes per drip chunk are chosen so that we sleep at most this often.
+DRIP_TICK = 0.01
+
+
+@route("/delay/<int:seconds>", "dynamic_data.delay_response")
+async def delay_response(exchange, seconds):
+    """Return a delayed response."""
+    json_headers = [("Content-Type", "application/json")]
+    if seconds > 60:
+        body = exchange.json_body({"error": "Maximum delay is 60 seconds"})
+        await exchange.respond(400, json_headers, body)
+        return
+
+    start_time = time.time()
+    if not await exchange.sleep(seconds):
+        return
+    end_time = time.time()
+
+    body = exchange.json_body(
+        {
+            "delay": seconds,
+            "actual_delay": round(end_time - start_time, 3),
+            "timestamp": utcnow(),
+            "message": f"Delayed response after {seconds} seconds",
+        }
+    )
+    await exchange.respond(200, json_headers, body)
+
+
+@route("/drip", "dynamic_data.drip")
+async def drip(exchange):
+    """Drips data over a duration after an optional initial delay."""
+    args = exchange.request.args
+    duration = float(args.get("duration", 2))
+    numbytes = min(int(args.get("numbytes", 10)), 10 * 1024 * 1024)  # set 10mb limited
+    code = int(args.get("code", 200))
+
+    if numbytes <= 0:
+        await exchange.respond(
+            400,
+            [("Content-Type", "text/html; charset=utf-8")],
+            b"number of bytes must be positive",
+        )
+        return
+
+    delay = float(args.get("delay", 0))
+    if delay > 0 and not await exchange.sleep(delay):
+        return
+
+    pause = duration / numbytes
+    # The Flask view sleeps after every byte; group bytes instead of
+    # waking the event loop more than once per DRIP_TICK.
+    step = min(max(1, int(DRIP_TICK / pause)) if pause > 0 else numbytes, 64 * 1024)
+
+    await exchange.start(
+        code,
+        [("Content-Type", "application/octet-stream"), ("Content-Length", str(numbytes))],
+    )
+    sent = 0
+    while sent < numbytes:
+        count = min(step, numbytes - sent)
+        await exchange.write(b"*" * count)
+        sent += count
+        if not await exchange.sleep(pause * count):
+            return
+    await exchange.end()
+
+
+@route("/stream/<int:n>", "dynamic_data.stream_n_messages")
+async def stream_n_messages(exchange, n):
+    """Stream n JSON responses."""
+    n = min(n, 100)
+    request = exchange.request
+    response = dict(RequestInfo(request, requested_fields(request)))
+
+    await exchange.start(200, [("Content-Type", "application/json")])
+    for i in range(n):
+        response["id"] = i
+        await exchange.write((json.dumps(response) + "\n").encode())
+    await exchange.end()
+
+
+@route("/stream-bytes/<int:n>", "dynamic_data.stream_random_bytes")
+async def stream_random_bytes(exchange, n):
+    """Streams n random bytes generated with given seed, at given chunk size per packet."""
+    n = min(n, 100 * 1024)  # set 100kb limited
+    args = exchange.request.args
+    # A private generator keeps seeded output reproducible while other
+    # requests run between our chunks.
+    rng = random.Random(int(args["seed"])) if "seed" in args else random
+
+    if "chunk_size" in args:
+        chunk_size = max(1, int(args["chunk_size"]))
+    else:
+        chunk_size = 10 * 1024
+
+    await exchange.start(200, [("Content-Type", "application/octet-stream")])
+    for offset in range(0, n, chunk_size):
+        count = min(chunk_size, n - offset)
+        await exchange.write(bytes(rng.randint(0, 255) for _ in range(count)))
+        if exchange.disconnected:
+            return
+    await exchange.end()
+
+
+@route("/range/<int:numbytes>", "dynamic_data.range_request")
+async def range_request(exchange, numbytes):
+    """Streams n random bytes generated with given seed, at given chunk size per packet."""
+    if numbytes <= 0 or numbytes > (100 * 1024):
+        await exchange.respond(
+            400,
+            [
+                ("Content-Type", "text/html; charset=utf-8"),
+                ("ETag", f"range{numbytes}"),
+                ("Accept-Ranges", "bytes"),
+            ],
+            b"number of bytes must be in the range (0, 102400)",
+        )
+        return
+
+    request = exchange.request
+    params = request.args
+    if "chunk_size" in params:
+        chunk_size = max(1, int(params["chunk_size"]))
+    else:
+        chunk_size = 10 * 1024
+
+    duration = float(params.get("duration", 0))
+    pause_per_byte = duration / numbytes
+
+    first_byte_pos, last_byte_pos = get_request_range(request.headers, numbytes)
+    range_length = last_byte_pos - first_byte_pos + 1
+
+    if (
+        first_byte_pos > last_byte_pos
+        or not 0 <= first_byte_pos < numbytes
+        or not 0 <= last_byte_pos < numbytes
+    ):
+        await exchange.start(
+            416,
+            [
+                ("ETag", f"range{numbytes}"),
+                ("Accept_Ranges", "bytes"),
+                ("Content-Range", f"bytes */{numbytes}"),
+                ("Content-Length", "0"),
+            ],
+        )
+        await exchange.end()
+        return
+
+    if first_byte_pos == 0 and last_byte_pos == numbytes - 1:
+        status = 200
+    else:
+        status = 206
+
+    await exchange.start(
+        status,
+        [
+            ("Content-Type", "application/octet-stream"),
+            ("ETag", f"range{numbytes}"),
+            ("Accept-Ranges", "bytes"),
+            ("Content-Length", str(range_length)),
+            ("Content-Range", f"byte {first_byte_pos}-{last_byte_pos}/{numbytes}"),
+        ],
+    )
+    for start in range(first_byte_pos, last_byte_pos + 1, chunk_size):
+        end = min(start + chunk_size, last_byte_pos + 1)
+        # Same predictable content as the Flask view.
+        await exchange.write(bytes(ord("a") + (i % 26) for i in range(start, end)))
+        if not await exchange.sleep(pause_per_byte * (end - start)):
+            return
+    await exchange.end()
+
+
+@route("/graph/<int:seed>/<int:node>", "dynamic_data.graph_page")
+async def graph_page(exchange, seed, node):
+    """Serve a node of the implicit link graph of seed."""
+    app = exchange.app
+    request = exchange.request
+    try:
+        graph = Graph.from_args(seed, request.args)
+    except ValueError as error:
+        body = exchange.json_body({"error": str(error)})
+        await exchange.respond(400, [("Content-Type", "application/json")], body)
+        return
+
+    kind = graph.kind(node) if node < graph.size else DEAD
+    if kind == DEAD:
+        pages = get_error_pages(app)
+        body = pages.body(404, app.json.pretty or app.debug)
+        await exchange.respond(404, [("Content-Type", pages.mimetype)], body)
+        return
+    if kind == SLOW and not await exchange.sleep(graph.delay):
+        return
+
+    with app.request_context(request.environ):
+        page = graph.page(node, graph_link(graph))
+    await exchange.respond(200, [("Content-Type", "text/html; charset=utf-8")], page.encode())
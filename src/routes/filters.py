@@ -1,85 +1,83 @@
 """
 Provides response filter decorators.
+
+The codecs are imported on first use, so workers that never compress do
+not pay for loading them.
 """
-import brotli as _brotli
-import gzip as _gzip
 import zlib
-from six import BytesIO
-from flask import Response
-
-from decorator import decorator
+from functools import wraps
+from io import BytesIO
 
+from flask import Response
 
-@decorator
-def brotli(f, *args, **kwargs):
-    """Brotli Flask response Decorator."""
+from ..server_timing import probe
 
-    data = f(*args, **kwargs)
 
+def _encode(data, compress, encoding):
+    """Compress a view's return value, updating the headers of a Response."""
     if isinstance(data, Response):
         content = data.data
     else:
         content = data
 
-    deflated_data = _brotli.compress(content)
+    with probe("compress"):
+        encoded = compress(content)
 
     if isinstance(data, Response):
-        data.data = deflated_data
-        data.headers["Content-Encoding"] = "br"
+        data.data = encoded
+        data.headers["Content-Encoding"] = encoding
         data.headers["Content-Length"] = str(len(data.data))
 
         return data
-    return deflated_data
+    return encoded
 
 
-@decorator
-def deflate(f, *args, **kwargs):
-    """Deflate Flask Response Decorator."""
+def _brotli(content):
+    import brotli as _brotli
 
-    data = f(*args, **kwargs)
+    return _brotli.compress(content)
 
-    if isinstance(data, Response):
-        content = data.data
-    else:
-        content = data
 
+def _deflate(content):
     deflater = zlib.compressobj()
-    deflated_data = deflater.compress(content)
-    deflated_data += deflater.flush()
+    return deflater.compress(content) + deflater.flush()
 
-    if isinstance(data, Response):
-        data.data = deflated_data
-        data.headers["Content-Encoding"] = "deflate"
-        data.headers["Content-Length"] = str(len(data.data))
 
-        return data
+def _gzip(content):
+    import gzip as _gzip
 
-    return deflated_data
+    gzip_buffer = BytesIO()
+    gzip_file = _gzip.GzipFile(mode="wb", compresslevel=4, fileobj=gzip_buffer)
+    gzip_file.write(content)
+    gzip_file.close()
+    return gzip_buffer.getvalue()
 
 
-@decorator
-def gzip(f, *args, **kwargs):
-    """GZip Flask Response Decorator."""
+def brotli(f):
+    """Brotli Flask response Decorator."""
 
-    data = f(*args, **kwargs)
+    @wraps(f)
+    def view(*args, **kwargs):
+        return _encode(f(*args, **kwargs), _brotli, "br")
 
-    if isinstance(data, Response):
-        content = data.data
-    else:
-        content = data
+    return view
 
-    gzip_buffer = BytesIO()
-    gzip_file = _gzip.GzipFile(mode="wb", compresslevel=4, fileobj=gzip_buffer)
-    gzip_file.write(content)
-    gzip_file.close()
 
-    gzip_data = gzip_buffer.getvalue()
+def deflate(f):
+    """Deflate Flask Response Decorator."""
 
-    if isinstance(data, Response):
-        data.data = gzip_data
-        data.headers["Content-Encoding"] = "gzip"
-        data.headers["Content-Length"] = str(len(data.data))
+    @wraps(f)
+    def view(*args, **kwargs):
+        return _encode(f(*args, **kwargs), _deflate, "deflate")
 
-        return data
+    return view
+
+
+def gzip(f):
+    """GZip Flask Response Decorator."""
+
+    @wraps(f)
+    def view(*args, **kwargs):
+        return _encode(f(*args, **kwargs), _gzip, "gzip")
 
-    return gzip_data
+    return view
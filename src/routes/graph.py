@@ -0,0 +1,161 @@
+"""
+Deterministic link graph for crawler benchmarks, served by ``/graph/<seed>/<node>``.
+
+The graph is never stored. Nodes are numbered level by level: node 0 is
+the root, level ``d`` holds ``degree ** d`` nodes and the last level is
+``depth``. Every node above the last level links to ``degree`` nodes of
+the next level, picked by a seeded permutation of that level, so each
+node has exactly one parent and the whole graph is reachable from the
+root. Each page also links back to its parent and to ``extra`` (at most
+``degree``) nodes anywhere in the graph picked by a hash of (seed, node,
+i), so crawlers find nodes more than once. Whether a node is dead (404)
+or slow (answers after ``delay`` seconds) is decided by a hash of (seed,
+node).
+
+Everything is derived from the seed and the parameters, so a page costs
+O(depth + degree) and any worker can serve any node.
+"""
+from bisect import bisect_right
+from math import gcd
+
+MASK = (1 << 64) - 1
+
+MAX_DEGREE = 200
+MAX_DEPTH = 100
+MAX_NODES = 10**9
+MAX_DELAY = 10.0
+
+# name: (type, default)
+PARAMS = {
+    "degree": (int, 10),
+    "depth": (int, 6),
+    "dead": (float, 0.01),
+    "slow": (float, 0.01),
+    "delay": (float, 1.0),
+    "extra": (int, 2),
+}
+
+OK, DEAD, SLOW = "ok", "dead", "slow"
+
+
+def mix(*values):
+    """Hash integers to 64 bits with the splitmix64 finalizer."""
+    h = 0
+    for value in values:
+        h = (h + value + 0x9E3779B97F4A7C15) & MASK
+        h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+        h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & MASK
+        h ^= h >> 31
+    return h
+
+
+class Graph:
+    """The graph of one seed and parameter set."""
+
+    def __init__(self, seed, degree=10, depth=6, dead=0.01, slow=0.01, delay=1.0, extra=2):
+        if not 1 <= degree <= MAX_DEGREE:
+            raise ValueError(f"degree must be between 1 and {MAX_DEGREE}")
+        if not 0 <= depth <= MAX_DEPTH:
+            raise ValueError(f"depth must be between 0 and {MAX_DEPTH}")
+        if not (0 <= dead <= 1 and 0 <= slow <= 1 and dead + slow <= 1):
+            raise ValueError("dead and slow must be shares between 0 and 1")
+        if not 0 <= delay <= MAX_DELAY:
+            raise ValueError(f"delay must be between 0 and {MAX_DELAY} seconds")
+        if not 0 <= extra <= MAX_DEGREE:
+            raise ValueError(f"extra must be between 0 and {MAX_DEGREE}")
+
+        self.seed = seed
+        self.degree = degree
+        self.depth = depth
+        self.dead = dead
+        self.slow = slow
+        self.delay = delay
+        self.extra = extra
+
+        # starts[d] is the first node of level d, starts[depth + 1] the size
+        self.starts = [0]
+        for level in range(depth + 1):
+            self.starts.append(self.starts[-1] + degree**level)
+            if self.starts[-1] > MAX_NODES:
+                raise ValueError(f"the graph must have at most {MAX_NODES} nodes")
+
+    @classmethod
+    def from_args(cls, seed, args):
+        """Build the graph from query arguments, raising ValueError if invalid."""
+        values = {}
+        for name, (type_, default) in PARAMS.items():
+            value = args.get(name)
+            try:
+                values[name] = default if value is None else type_(value)
+            except ValueError:
+                raise ValueError(f"{name} must be a number") from None
+        return cls(seed, **values)
+
+    @property
+    def size(self):
+        return self.starts[-1]
+
+    def query(self):
+        """Return the HTML-escaped query string selecting these parameters."""
+        pairs = [
+            f"{name}={getattr(self, name)}"
+            for name, (_, default) in PARAMS.items()
+            if getattr(self, name) != default
+        ]
+        return "?" + "&amp;".join(pairs) if pairs else ""
+
+    def level(self, node):
+        return bisect_right(self.starts, node) - 1
+
+    def kind(self, node):
+        """Return OK, DEAD or SLOW for a node; the root is always OK."""
+        if node == 0:
+            return OK
+        share = mix(self.seed, node) / 2**64
+        if share < self.dead:
+            return DEAD
+        if share < self.dead + self.slow:
+            return SLOW
+        return OK
+
+    def _permutation(self, level):
+        """Return (a, b, size) of the permutation i -> (a * i + b) % size."""
+        size = self.degree**level
+        a = mix(self.seed, level, 1) % size | 1
+        while gcd(a, size) != 1:
+            a += 2
+        return a, mix(self.seed, level, 2) % size, size
+
+    def children(self, node):
+        level = self.level(node)
+        if level >= self.depth:
+            return []
+        a, b, size = self._permutation(level + 1)
+        first = (node - self.starts[level]) * self.degree
+        start = self.starts[level + 1]
+        return [start + (a * i + b) % size for i in range(first, first + self.degree)]
+
+    def parent(self, node):
+        """Return the node linking to node, or None for the root."""
+        level = self.level(node)
+        if level <= 0:
+            return None
+        a, b, size = self._permutation(level)
+        index = (node - self.starts[level] - b) * pow(a, -1, size) % size
+        return self.starts[level - 1] + index // self.degree
+
+    def extra_links(self, node):
+        """Return the hash-picked nodes linked from node besides its children."""
+        size = self.size
+        return [mix(self.seed, node, i) % size for i in range(min(self.extra, self.degree))]
+
+    def page(self, node, url):
+        """Render a node's page; url(node) returns the link to a node."""
+        html = [f"<html><head><title>Node {node}</title></head><body>"]
+        parent = self.parent(node)
+        if parent is not None:
+            html.append(f"<a href='{url(parent)}'>up</a> ")
+        for child in self.children(node) + self.extra_links(node):
+            html.append(f"<a href='{url(child)}'>{child}</a> ")
+        html.append("</body></html>")
+        return "".join(html)
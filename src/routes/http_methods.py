@@ -1,22 +1,102 @@
 """HTTP methods testing routes."""
 
-from flask import Blueprint, request, jsonify
+import time
+from collections.abc import MutableMapping
 
+from flask import Blueprint, current_app, request, jsonify
+
+from .body import read_request_body, parse_form, parse_json, drain, echo_limit_error
 from .utils import utcnow
 
 bp = Blueprint("http_methods", __name__)
 
+FORM_MIMETYPES = ("application/x-www-form-urlencoded", "multipart/form-data")
+
+
+class RequestInfo(MutableMapping):
+    """Common request information, computed lazily.
+
+    Each section is only built when it is read, which normally happens while
+    the object is being serialized. If the client passes ``?fields=a,b`` only
+    those top-level keys are produced, including keys set by the view.
+    """
+
+    sections = {
+        "method": lambda req: req.method,
+        "url": lambda req: req.url,
+        "args": lambda req: dict(req.args),
+        "headers": lambda req: dict(req.headers),
+        "origin": lambda req: req.environ.get("REMOTE_ADDR"),
+        "timestamp": lambda req: utcnow(),
+    }
+
+    def __init__(self, req, fields=None):
+        self._request = req
+        self._fields = fields
+        self._values = {}
+        self._extra = {}
+        self._deleted = set()
+
+    def _selected(self, key):
+        if key in self._deleted:
+            return False
+        return self._fields is None or key in self._fields
+
+    def __getitem__(self, key):
+        if not self._selected(key):
+            raise KeyError(key)
+        if key in self._extra:
+            return self._extra[key]
+        if key not in self.sections:
+            raise KeyError(key)
+        if key not in self._values:
+            self._values[key] = self.sections[key](self._request)
+        return self._values[key]
+
+    def __setitem__(self, key, value):
+        self._deleted.discard(key)
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._extra.pop(key, None)
+        if key in self.sections:
+            self._deleted.add(key)
+
+    def __iter__(self):
+        for key in self.sections:
+            if key not in self._extra and self._selected(key):
+                yield key
+        for key in self._extra:
+            if self._selected(key):
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"<RequestInfo fields={sorted(self)}>"
+
+
+def requested_fields(req=None):
+    """Return the set of fields asked for with ``?fields=``, or None for all.
+
+    Reads the current Flask request unless another request object is given.
+    """
+    if req is None:
+        req = request
+    if b"fields" not in req.query_string:
+        return None
+    fields = req.args.get("fields")
+    if not fields:
+        return None
+    return {field.strip() for field in fields.split(",") if field.strip()}
+
 
 def get_request_info():
     """Get common request information."""
-    return {
-        "method": request.method,
-        "url": request.url,
-        "args": dict(request.args),
-        "headers": dict(request.headers),
-        "origin": request.environ.get("REMOTE_ADDR"),
-        "timestamp": utcnow(),
-    }
+    return RequestInfo(request._get_current_object(), requested_fields())
 
 
 @bp.route("/get", methods=["GET"])
@@ -26,49 +106,51 @@ def view_get():
     return jsonify(info)
 
 
-@bp.route("/post", methods=["POST"])
-def test_post():
-    """Test POST requests."""
-    info = get_request_info()
+def echo_body(info, form=False, data=True):
+    """Stream the request body and add it to info.
 
-    # Add form data
-    if request.form:
-        info["form"] = dict(request.form)
+    Adds body statistics under ``body`` and, when the body fits in the echo
+    limit, the parsed ``form``/``json`` and the raw ``data`` like before.
+    Bodies too large to parse get a ``form_error``/``json_error`` instead.
+    """
+    body = read_request_body()
+    info["body"] = body.to_dict()
+
+    is_form = request.mimetype in FORM_MIMETYPES
+    if form and is_form:
+        parsed = parse_form(body)
+        if parsed is None:
+            info["form_error"] = echo_limit_error(body)
+        elif parsed:
+            info["form"] = dict(parsed)
 
-    # Add JSON data
     if request.is_json:
         try:
-            info["json"] = request.get_json()
+            info["json"] = parse_json(body)
         except Exception as e:
             info["json_error"] = str(e)
 
-    # Add raw data
-    if request.data:
-        try:
-            info["data"] = request.data.decode("utf-8")
-        except UnicodeDecodeError:
-            info["data"] = f"<binary data, {len(request.data)} bytes>"
+    if data and body.size and not is_form:
+        text = body.text()
+        if text is None:
+            info["data"] = f"<binary data, {body.size} bytes>"
+        else:
+            info["data"] = text
 
+    return info
+
+
+@bp.route("/post", methods=["POST"])
+def test_post():
+    """Test POST requests."""
+    info = echo_body(get_request_info(), form=True)
     return jsonify(info)
 
 
 @bp.route("/put", methods=["PUT"])
 def test_put():
     """Test PUT requests."""
-    info = get_request_info()
-
-    if request.is_json:
-        try:
-            info["json"] = request.get_json()
-        except Exception as e:
-            info["json_error"] = str(e)
-
-    if request.data:
-        try:
-            info["data"] = request.data.decode("utf-8")
-        except UnicodeDecodeError:
-            info["data"] = f"<binary data, {len(request.data)} bytes>"
-
+    info = echo_body(get_request_info())
     return jsonify(info)
 
 
@@ -82,14 +164,7 @@ def test_delete():
 @bp.route("/patch", methods=["PATCH"])
 def test_patch():
     """Test PATCH requests."""
-    info = get_request_info()
-
-    if request.is_json:
-        try:
-            info["json"] = request.get_json()
-        except Exception as e:
-            info["json_error"] = str(e)
-
+    info = echo_body(get_request_info(), data=False)
     return jsonify(info)
 
 
@@ -106,3 +181,25 @@ def test_options():
     response = jsonify(get_request_info())
     response.headers["Allow"] = "GET, POST, PUT, DELETE, PATCH, HEAD, OPTIONS"
     return response
+
+
+@bp.route(
+    "/sink", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"]
+)
+def sink():
+    """Discard the request body as fast as possible and report read timing."""
+    start = time.perf_counter()
+    config = current_app.config
+    stats = drain(
+        request.stream,
+        config["SINK_CHUNK_SIZE"],
+        config["SINK_STALL_THRESHOLD"],
+        config["SINK_MAX_STALLS"],
+        start,
+    )
+
+    result = stats.to_dict()
+    result["method"] = request.method
+    result["content_length"] = request.content_length
+    result["chunked"] = request.headers.get("Transfer-Encoding", "").lower() == "chunked"
+    return jsonify(result)
@@ -2,6 +2,7 @@
 
 from flask import Blueprint, render_template, jsonify
 from .. import __version__
+from ..fast_lane import fast_lane
 
 bp = Blueprint("main", __name__)
 
@@ -13,12 +14,14 @@ def index():
 
 
 @bp.route("/health")
+@fast_lane()
 def health():
     """Health check endpoint."""
     return jsonify({"status": "ok", "message": "HTTPilot is running"})
 
 
 @bp.route("/api")
+@fast_lane()
 def api_info():
     """API information endpoint."""
     return jsonify(
@@ -35,6 +38,8 @@ def api_info():
                     "/patch": "PATCH request testing",
                     "/head": "HEAD request testing",
                     "/options": "OPTIONS request testing",
+                    "/upload": "Streaming multipart/form-data upload with per-part digests (POST, PUT)",
+                    "/sink": "Discard the request body and report upload throughput (any method)",
                 },
                 "Status Codes": {
                     "/status/<code>": "Return specific HTTP status code (supports GET, POST, PUT, PATCH, OPTIONS)",
@@ -97,6 +102,7 @@ def api_info():
                 "System": {
                     "/health": "Health check endpoint",
                     "/api": "API information and endpoint list",
+                    "/metrics": "Request counts, sizes and latency histograms in Prometheus format",
                 },
             },
         }
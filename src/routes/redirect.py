@@ -1,21 +1,41 @@
 """Returns different redirect responses."""
+import time
+
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    has_request_context,
+    request,
+    redirect,
+    make_response,
+    jsonify,
+)
+
+from .utils import url_template, utcnow
+from .. import admission
 
-from flask import Blueprint, request, url_for, redirect, make_response, jsonify
+bp = Blueprint("redirect", __name__)
 
-from .utils import utcnow
+CHAIN_STATUSES = (301, 302, 303, 307, 308)
+MAX_CHAIN_HOPS = 100_000
+MAX_HOP_DELAY = 10.0
+# (host URL, query string): Chain; the Host header is part of the key.
+MAX_CHAINS = 1024
 
-bp = Blueprint("redirect", __name__)
+_chains = {}
 
 
 @bp.route("/redirect/<int:n>")
 def redirect_times(n):
     """302 Redirects n times."""
-    assert n > 0
+    if n < 1:
+        abort(404)
 
     absolute = request.args.get("absolute", "false").lower() == "true"
 
     if n == 1:
-        return redirect(url_for("http_methods.view_get", _external=absolute))
+        return redirect(url_template("http_methods.view_get", external=absolute)())
 
     if absolute:
         return _redirect("absolute", n, True)
@@ -25,30 +45,32 @@ def redirect_times(n):
 
 def _redirect(kind, n, external):
     return redirect(
-        url_for(f"redirect.{kind}_redirect_n_times", n=n - 1, _external=external)
+        url_template(f"redirect.{kind}_redirect_n_times", "n", external)(n - 1)
     )
 
 
 @bp.route("/absolute-redirect/<int:n>")
 def absolute_redirect_n_times(n):
     """Absolutely 302 Redirects n times."""
-    assert n > 0
+    if n < 1:
+        abort(404)
 
     if n == 1:
-        return redirect(url_for("http_methods.view_get", _external=True))
+        return redirect(url_template("http_methods.view_get", external=True)())
     return _redirect("absolute", n, True)
 
 
 @bp.route("/relative-redirect/<int:n>")
 def relative_redirect_n_times(n):
     """Relatively 302 Redirects n times."""
-    assert n > 0
+    if n < 1:
+        abort(404)
 
     response = make_response()
     response.status_code = 302
 
     if n == 1:
-        return redirect(url_for("http_methods.view_get", _external=False))
+        return redirect(url_template("http_methods.view_get")())
 
     return _redirect("relative", n, False)
 
@@ -88,3 +110,130 @@ def redirect_to():
     response.headers["Location"] = args["url"]
 
     return response
+
+
+class Chain:
+    """Options of a /redirect-chain request and the targets of its hops.
+
+    Targets are built once per host and query string; a hop only formats
+    its number into a precomputed prefix.
+    """
+
+    __slots__ = ("statuses", "delay", "loop", "hosts", "query", "prefixes", "suffix", "finals")
+
+    def __init__(self, statuses=(302,), delay=0.0, loop=None, hosts=False):
+        self.statuses = statuses
+        self.delay = delay
+        self.loop = loop
+        self.hosts = hosts
+
+        query = []
+        if statuses != (302,):
+            query.append("status=" + ",".join(map(str, statuses)))
+        if delay:
+            query.append(f"delay={delay}")
+        if loop is not None:
+            query.append(f"loop={loop}")
+        if hosts:
+            query.append("hosts=1")
+        self.query = "?" + "&".join(query) if query else ""
+
+    @classmethod
+    def from_args(cls, args):
+        """Parse the query arguments, raising ValueError if they are invalid."""
+        try:
+            statuses = tuple(int(code) for code in args.get("status", "302").split(","))
+            delay = float(args.get("delay", 0))
+            loop = int(args["loop"]) if "loop" in args else None
+        except ValueError:
+            raise ValueError("status, delay and loop must be numbers") from None
+        if not set(statuses) <= set(CHAIN_STATUSES):
+            raise ValueError(f"status must be one of {', '.join(map(str, CHAIN_STATUSES))}")
+        if not 0 <= delay <= MAX_HOP_DELAY:
+            raise ValueError(f"delay must be between 0 and {MAX_HOP_DELAY} seconds")
+        if loop is not None and not 1 <= loop <= MAX_CHAIN_HOPS:
+            raise ValueError(f"loop must be between 1 and {MAX_CHAIN_HOPS}")
+        hosts = args.get("hosts", "").lower() in ("1", "true")
+        return cls(statuses, delay, loop, hosts)
+
+    def build(self, aliases):
+        """Precompute the targets for the current request's host and scheme."""
+        template = url_template("redirect.redirect_chain", "n")
+        final = url_template("http_methods.view_get")()
+        if self.hosts and aliases:
+            host = request.host
+            port = host[host.rindex(":"):] if ":" in host.rpartition("]")[2] else ""
+            origins = [
+                f"{request.scheme}://{alias}{'' if ':' in alias.rpartition(']')[2] else port}"
+                for alias in aliases
+            ]
+        else:
+            origins = [""]
+        self.prefixes = [origin + template.prefix for origin in origins]
+        self.suffix = template.suffix + self.query
+        self.finals = [origin + final for origin in origins]
+        return self
+
+    def status(self, n):
+        """Return the status of hop n; hop 1 uses the last one."""
+        return self.statuses[-n % len(self.statuses)]
+
+    def target(self, n):
+        """Return the Location of hop n: hop n - 1, the loop hop or /get."""
+        host = n % len(self.prefixes)
+        following = n - 1 if n > 1 else self.loop
+        if following is None:
+            return self.finals[host]
+        return f"{self.prefixes[host]}{following}{self.suffix}"
+
+
+def get_chain(app, req):
+    """Return the Chain of a /redirect-chain request, raising ValueError if invalid."""
+    key = (req.host_url, req.query_string)
+    chain = _chains.get(key)
+    if chain is None:
+        chain = Chain.from_args(req.args)
+        aliases = app.config.get("REDIRECT_HOST_ALIASES", ())
+        if has_request_context():
+            chain.build(aliases)
+        else:
+            # The ASGI handlers run without a Flask request context.
+            with app.request_context(req.environ):
+                chain.build(aliases)
+        if len(_chains) >= MAX_CHAINS:
+            _chains.clear()
+        _chains[key] = chain
+    return chain
+
+
+@bp.route("/redirect-chain/<int:n>")
+def redirect_chain(n):
+    """Redirects n times with a chosen status, delay, loop and hosts per hop.
+
+    ``status`` is one code or a comma separated list used in turn (the
+    last hop uses the last code),
+    ``delay`` the seconds each hop waits, ``loop`` the hop the last one
+    redirects to instead of /get, and ``hosts=1`` sends the hops to the
+    REDIRECT_HOST_ALIASES in turn.
+
+    Here a delayed hop holds the worker thread while it waits, so it takes
+    a slow admission slot for the wait; the ASGI handler in redirect_async
+    does not block.
+    """
+    if n < 1:
+        abort(404)
+    if n > MAX_CHAIN_HOPS:
+        return jsonify({"error": f"n must be at most {MAX_CHAIN_HOPS}"}), 400
+    try:
+        chain = get_chain(current_app, request)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    if chain.delay > 0:
+        with admission.hold("slow") as rejected:
+            if rejected is not None:
+                return rejected
+            time.sleep(chain.delay)
+    return current_app.response_class(
+        status=chain.status(n), headers={"Location": chain.target(n)}
+    )
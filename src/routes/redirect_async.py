@@ -0,0 +1,35 @@
+"""
+Async version of the ``/redirect-chain`` route.
+
+Served natively by the ASGI entry point (:mod:`src.asgi`), so hops with a
+``delay`` wait on the event loop instead of holding a worker thread.
+"""
+from .redirect import MAX_CHAIN_HOPS, get_chain
+from ..asgi import route
+from ..errors import get_error_pages
+
+JSON_HEADERS = [("Content-Type", "application/json")]
+
+
+@route("/redirect-chain/<int:n>", "redirect.redirect_chain")
+async def redirect_chain(exchange, n):
+    """Redirects n times with a chosen status, delay, loop and hosts per hop."""
+    app = exchange.app
+    if n < 1:
+        pages = get_error_pages(app)
+        body = pages.body(404, app.json.pretty or app.debug)
+        await exchange.respond(404, [("Content-Type", pages.mimetype)], body)
+        return
+    if n > MAX_CHAIN_HOPS:
+        body = exchange.json_body({"error": f"n must be at most {MAX_CHAIN_HOPS}"})
+        await exchange.respond(400, JSON_HEADERS, body)
+        return
+    try:
+        chain = get_chain(app, exchange.request)
+    except ValueError as error:
+        await exchange.respond(400, JSON_HEADERS, exchange.json_body({"error": str(error)}))
+        return
+
+    if chain.delay and not await exchange.sleep(chain.delay):
+        return
+    await exchange.respond(chain.status(n), [("Location", chain.target(n))])
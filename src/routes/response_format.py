@@ -4,6 +4,7 @@ from flask import Blueprint, render_template, jsonify, make_response
 
 from .utils import utcnow
 from . import filters
+from ..fast_lane import fast_lane
 
 
 bp = Blueprint("request_format", __name__)
@@ -14,6 +15,7 @@ Disallow: /deny
 
 
 @bp.route("/json")
+@fast_lane(ttl=1)
 def return_json():
     """Return sample JSON data."""
     return jsonify(
@@ -39,6 +41,7 @@ def return_json():
 
 
 @bp.route("/xml")
+@fast_lane(ttl=1)
 def return_xml():
     """Return sample XML data."""
     xml_data = """<?xml version="1.0" encoding="UTF-8"?>
@@ -63,6 +66,7 @@ def return_xml():
 
 
 @bp.route("/html")
+@fast_lane(ttl=1)
 def return_html():
     """Return sample HTML data."""
     html_data = """<!DOCTYPE html>
@@ -92,6 +96,7 @@ def return_html():
 
 
 @bp.route("/robots.txt")
+@fast_lane()
 def robots():
     """Returns some robots.txt rules."""
     response = make_response(ROBOT_TXT)
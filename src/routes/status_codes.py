@@ -5,6 +5,7 @@ from werkzeug.exceptions import HTTPException
 import json
 
 from .utils import utcnow
+from ..server_timing import timed
 
 bp = Blueprint("status_codes", __name__)
 
@@ -30,6 +31,7 @@ ASCII_ART = """
 
 
 @bp.route("/status/<int:code>", methods=["GET", "PUT", "PATCH", "POST", "OPTIONS"])
+@timed("status_code")
 def status_code(code):
     """Return a response with the specified status code."""
 
@@ -0,0 +1,156 @@
+"""Streaming multipart/form-data upload routes."""
+
+import tempfile
+import time
+
+from flask import Blueprint, current_app, request, jsonify
+from werkzeug.sansio.multipart import (
+    MultipartDecoder,
+    Field,
+    File,
+    Data,
+    Epilogue,
+    NeedData,
+)
+
+from .body import BodyStats, requested_digests
+
+bp = Blueprint("upload", __name__)
+
+STORE_MODES = ("hash", "spool")
+
+
+class UploadPart:
+    """One part of a multipart upload, hashed and optionally spooled to disk."""
+
+    def __init__(self, event, digests, echo_limit, spool_limit, spool_dir):
+        self.name = event.name
+        self.filename = getattr(event, "filename", None)
+        self.content_type = event.headers.get("Content-Type")
+        self.stats = BodyStats(digests, echo_limit)
+        self.spool = None
+        self.spool_limit = spool_limit
+        self.spooled = 0
+        if spool_limit:
+            self.spool = tempfile.TemporaryFile(dir=spool_dir)
+        self.start = time.perf_counter()
+
+    def update(self, data):
+        self.stats.update(data)
+        if self.spool is not None and self.spooled < self.spool_limit:
+            data = data[: self.spool_limit - self.spooled]
+            self.spool.write(data)
+            self.spooled += len(data)
+
+    def finish(self):
+        self.stats.elapsed = time.perf_counter() - self.start
+        if self.spool is not None:
+            self.spool.flush()
+
+    def close(self):
+        if self.spool is not None:
+            self.spool.close()
+
+    def to_dict(self):
+        part = {"name": self.name}
+        if self.filename is not None:
+            part["filename"] = self.filename
+        if self.content_type:
+            part["content_type"] = self.content_type
+
+        stats = self.stats.to_dict()
+        del stats["truncated"]
+        part.update(stats)
+
+        if self.filename is None:
+            part["value"] = self.stats.text()
+        if self.spool is not None:
+            part["spooled"] = self.spooled
+            part["spool_truncated"] = self.stats.size > self.spooled
+        return part
+
+
+def error(message, status=400):
+    response = jsonify({"error": message})
+    response.status_code = status
+    return response
+
+
+@bp.route("/upload", methods=["POST", "PUT"])
+def upload():
+    """Parse a multipart/form-data upload incrementally and report each part.
+
+    ``?store=hash`` (default) only hashes the parts, ``?store=spool`` also
+    writes file parts to a temporary file capped at UPLOAD_SPOOL_LIMIT bytes.
+    The spool files are deleted as soon as the body is parsed, before the
+    response is built, so spooling measures the cost of writing only.
+    """
+    config = current_app.config
+
+    if request.mimetype != "multipart/form-data":
+        return error("expected a multipart/form-data body")
+    boundary = request.mimetype_params.get("boundary")
+    if not boundary:
+        return error("missing multipart boundary")
+
+    store = request.args.get("store", "hash")
+    if store not in STORE_MODES:
+        return error(f"store must be one of: {', '.join(STORE_MODES)}")
+
+    digests = requested_digests(config["BODY_DIGESTS"])
+    chunk_size = config["BODY_CHUNK_SIZE"]
+    decoder = MultipartDecoder(
+        boundary.encode("latin-1"),
+        max_form_memory_size=config["UPLOAD_MAX_BUFFER"],
+        max_parts=config["UPLOAD_MAX_PARTS"],
+    )
+
+    spool_limit = config["UPLOAD_SPOOL_LIMIT"] if store == "spool" else 0
+    parts = []
+    part = None
+    size = 0
+    read = request.stream.read
+    start = time.perf_counter()
+
+    try:
+        while True:
+            chunk = read(chunk_size)
+            size += len(chunk)
+            decoder.receive_data(chunk or None)
+
+            event = decoder.next_event()
+            while not isinstance(event, (NeedData, Epilogue)):
+                if isinstance(event, (Field, File)):
+                    is_file = isinstance(event, File)
+                    part = UploadPart(
+                        event,
+                        digests,
+                        0 if is_file else config["UPLOAD_FIELD_ECHO_LIMIT"],
+                        spool_limit if is_file else 0,
+                        config["UPLOAD_SPOOL_DIR"],
+                    )
+                    parts.append(part)
+                elif isinstance(event, Data):
+                    part.update(event.data)
+                    if not event.more_data:
+                        part.finish()
+                event = decoder.next_event()
+
+            if not chunk:
+                break
+    except ValueError as e:
+        return error(f"invalid multipart body: {e}")
+    finally:
+        for part in parts:
+            part.close()
+
+    elapsed = time.perf_counter() - start
+    return jsonify(
+        {
+            "parts": [part.to_dict() for part in parts],
+            "size": size,
+            "elapsed": round(elapsed, 6),
+            "throughput": int(size / elapsed) if elapsed else 0,
+            "store": store,
+        }
+    )
@@ -1,9 +1,97 @@
 """
 Some shared functions.
 """
-from datetime import datetime, timezone
+import time
+
+from flask import request, url_for
+from werkzeug.http import http_date as _http_date
+
+# Stands in for the variable argument while a URL template is built.
+PLACEHOLDER = 987654321
+# The Host header picks the key of external templates, so bound the cache.
+MAX_URL_TEMPLATES = 1024
+
+_url_templates = {}
+
+
+class Clock:
+    """Wall clock that formats each second once for every handler.
+
+    The date and time up to the second is formatted when the second
+    changes; the microseconds are appended per call, so timestamps stay
+    exact. Formatted seconds are kept in one tuple, so threads that race
+    on a new second at worst both format it.
+    """
+
+    def __init__(self, time_ns=time.time_ns):
+        self._time_ns = time_ns
+        self._second = (None, "", "")
+
+    def _format(self, second):
+        cached = self._second
+        if cached[0] != second:
+            parts = time.gmtime(second)
+            cached = self._second = (
+                second,
+                time.strftime("%Y-%m-%dT%H:%M:%S", parts),
+                _http_date(second),
+            )
+        return cached
+
+    def iso(self):
+        """Return the current UTC time as ``2024-01-01T12:00:00.000000Z``."""
+        second, micros = divmod(self._time_ns() // 1000, 1_000_000)
+        return f"{self._format(second)[1]}.{micros:06d}Z"
+
+    def http_date(self):
+        """Return the current time as an IMF-fixdate for HTTP headers."""
+        return self._format(self._time_ns() // 1_000_000_000)[2]
+
+
+clock = Clock()
 
 
 def utcnow():
     """Return UTC timestamp of the current."""
-    return datetime.now(timezone.utc).isoformat() + "Z"
+    return clock.iso()
+
+
+def http_date():
+    """Return the current time formatted for HTTP headers."""
+    return clock.http_date()
+
+
+class URLTemplate:
+    """A URL built once by url_for, with one integer argument left open."""
+
+    __slots__ = ("prefix", "suffix")
+
+    def __init__(self, url):
+        prefix, sep, suffix = url.rpartition(str(PLACEHOLDER))
+        if not sep:
+            prefix, suffix = url, ""
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def __call__(self, value=""):
+        return f"{self.prefix}{value}{self.suffix}"
+
+
+def url_template(endpoint, name=None, external=False, **values):
+    """Return a URLTemplate of endpoint for the current host and scheme.
+
+    The template fills in the argument ``name``, the other ``values`` are
+    fixed; without ``name`` it returns the same URL every time. Templates
+    are built by url_for once per host, scheme and script root.
+    """
+    root = request.host_url if external else request.script_root
+    key = (endpoint, name, external, root, tuple(values.items()))
+    template = _url_templates.get(key)
+    if template is None:
+        if name is not None:
+            values[name] = PLACEHOLDER
+        template = URLTemplate(url_for(endpoint, _external=external, **values))
+        if len(_url_templates) >= MAX_URL_TEMPLATES:
+            _url_templates.clear()
+        _url_templates[key] = template
+    return template
@@ -0,0 +1,53 @@
+"""
+URL rule class with lazily compiled URL builders.
+
+When a rule is added to the URL map Werkzeug compiles two ``url_for``
+builders for it by generating and compiling Python source, which is most
+of the time ``create_app`` takes. Only a handful of HTTPilot's routes are
+ever built with ``url_for``, so :class:`LazyRule` compiles each builder the
+first time it is used. Matching is unaffected.
+
+This overrides ``Rule._compile_builder``, a private Werkzeug method. If it
+is missing or its signature changed, :func:`rule_class` returns the plain
+:class:`~werkzeug.routing.Rule` and builders are compiled eagerly again.
+"""
+import inspect
+
+from werkzeug.routing import Rule
+
+
+def _hook_supported():
+    """Return True if Rule._compile_builder is the method LazyRule wraps."""
+    compile_builder = getattr(Rule, "_compile_builder", None)
+    if not callable(compile_builder):
+        return False
+    try:
+        parameters = list(inspect.signature(compile_builder).parameters)
+    except (TypeError, ValueError):
+        return False
+    return parameters == ["self", "append_unknown"]
+
+
+LAZY_BUILDERS = _hook_supported()
+
+
+class LazyRule(Rule):
+    """A Rule whose URL builders are compiled on first use."""
+
+    def _compile_builder(self, append_unknown=True):
+        compile_builder = super()._compile_builder
+        name = "_build_unknown" if append_unknown else "_build"
+
+        def build(rule, **values):
+            # Replace this stub on the instance, later builds go straight
+            # to the compiled builder.
+            builder = compile_builder(append_unknown).__get__(rule, None)
+            setattr(rule, name, builder)
+            return builder(**values)
+
+        return build
+
+
+def rule_class():
+    """Return LazyRule, or Rule if this Werkzeug has no hook for it."""
+    return LazyRule if LAZY_BUILDERS else Rule
@@ -0,0 +1,241 @@
+"""
+Continuous low-overhead sampling profiler.
+
+When ``SAMPLING_PROFILER`` is enabled a background thread wakes every
+``SAMPLING_INTERVAL`` seconds and records the stacks of all threads that
+are serving a request at that moment. Stacks are merged into a trie per
+minute, the last ``SAMPLING_WINDOW`` minutes are kept, and each trie holds
+at most ``SAMPLING_MAX_NODES`` nodes; deeper stacks that do not fit are
+counted under a ``[truncated]`` node.
+
+``/debug/flamegraph`` renders the last N minutes as folded stacks or SVG.
+"""
+import html
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+
+from .lifecycle import get_lifecycle
+from .profiling import collapse_stack
+
+EXTENSION = "httpilot.sampler"
+TRUNCATED = "[truncated]"
+
+
+class StackTrie:
+    """Sample counts of call stacks, sharing common prefixes.
+
+    A node is a ``[self_count, children]`` list, children keyed by frame name.
+    """
+
+    def __init__(self, max_nodes):
+        self.max_nodes = max_nodes
+        self.root = [0, {}]
+        self.nodes = 1
+        self.samples = 0
+
+    def add(self, stack, count=1):
+        node = self.root
+        for name in stack:
+            children = node[1]
+            child = children.get(name)
+            if child is None:
+                if self.nodes >= self.max_nodes:
+                    child = children.get(TRUNCATED)
+                    if child is None:
+                        child = children[TRUNCATED] = [0, {}]
+                    node = child
+                    break
+                child = children[name] = [0, {}]
+                self.nodes += 1
+            node = child
+        node[0] += count
+        self.samples += count
+
+    def merge(self, other):
+        for stack, count in other.items():
+            self.add(stack, count)
+
+    def items(self):
+        """Yield ``(stack, self_count)`` for every node with samples."""
+        pending = [((), self.root)]
+        while pending:
+            stack, (count, children) = pending.pop()
+            if count:
+                yield stack, count
+            for name, child in children.items():
+                pending.append((stack + (name,), child))
+
+
+def format_folded(trie):
+    """Render a trie as folded stack lines, heaviest first."""
+    lines = sorted(trie.items(), key=lambda item: -item[1])
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in lines if stack)
+
+
+def _totals(node):
+    """Return ``[total, [(name, subtree), ...]]`` with cumulative counts."""
+    children = [(name, _totals(child)) for name, child in node[1].items()]
+    total = node[0] + sum(child[0] for _, child in children)
+    children.sort(key=lambda item: item[0])
+    return [total, children]
+
+
+def render_svg(trie, title="HTTPilot flame graph", width=1200, row_height=16):
+    """Render a trie as a self-contained flame graph SVG (root at the bottom)."""
+    tree = _totals(trie.root)
+    total = tree[0] or 1
+    rects = []
+    max_depth = [0]
+
+    def walk(node, depth, x):
+        for name, child in node[1]:
+            w = child[0] / total * width
+            if w >= 0.3:
+                max_depth[0] = max(max_depth[0], depth)
+                rects.append((name, child[0], depth, x, w))
+                walk(child, depth + 1, x)
+            x += w
+
+    walk(tree, 0, 0.0)
+
+    height = (max_depth[0] + 1) * row_height + 40
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" '
+        f'height="{height}" font-family="monospace" font-size="11">',
+        f'<text x="4" y="16">{html.escape(title)} ({tree[0]} samples)</text>',
+    ]
+    for name, count, depth, x, w in rects:
+        y = height - (depth + 1) * row_height
+        hue = zlib.crc32(name.encode("utf-8")) % 60
+        label = html.escape(name)
+        out.append(
+            f'<g><title>{label} ({count} samples, {count * 100 / total:.2f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row_height - 1}" '
+            f'fill="hsl({hue},85%,60%)"/>'
+        )
+        chars = int(w / 7)
+        if chars >= 3:
+            text = name if len(name) <= chars else name[: chars - 2] + ".."
+            out.append(f'<text x="{x + 2:.1f}" y="{y + 11}">{html.escape(text)}</text>')
+        out.append("</g>")
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+class SamplingProfiler:
+    """Background thread sampling the stacks of threads serving requests."""
+
+    def __init__(self, interval=0.01, window=10, max_nodes=20000):
+        self.interval = interval
+        self.window = window
+        self.max_nodes = max_nodes
+        self.buckets = deque(maxlen=window)
+        self.active = {}
+        self._lock = threading.Lock()
+        self._buckets_lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def request_started(self, record):
+        ident = record.thread_ident = threading.get_ident()
+        with self._lock:
+            self.active[ident] = self.active.get(ident, 0) + 1
+
+    def request_finished(self, record):
+        # The body may be finished on another thread (e.g. by the ASGI
+        # bridge), so forget the thread the request was started on.
+        ident = record.thread_ident
+        if ident is None:
+            return
+        record.thread_ident = None
+        with self._lock:
+            left = self.active.get(ident, 0) - 1
+            if left > 0:
+                self.active[ident] = left
+            else:
+                self.active.pop(ident, None)
+
+    def _bucket(self, minute):
+        if not self.buckets or self.buckets[-1][0] != minute:
+            self.buckets.append((minute, StackTrie(self.max_nodes)))
+        return self.buckets[-1][1]
+
+    def sample(self):
+        """Record the current stack of every thread serving a request."""
+        with self._lock:
+            idents = list(self.active)
+        if not idents:
+            return
+        frames = sys._current_frames()
+        stacks = [collapse_stack(frames[i]) for i in idents if i in frames]
+        del frames
+        with self._buckets_lock:
+            trie = self._bucket(int(time.time() // 60))
+            for stack in stacks:
+                trie.add(stack)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="httpilot-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _after_fork(self):
+        # Threads do not survive fork(): forget the parent's samples and
+        # start sampling the child.
+        self.buckets.clear()
+        self.active.clear()
+        self._lock = threading.Lock()
+        self._buckets_lock = threading.Lock()
+        if self._thread is not None:
+            self.start()
+
+    def snapshot(self, minutes=None):
+        """Return one trie with the samples of the last minutes."""
+        minutes = self.window if minutes is None else minutes
+        since = int(time.time() // 60) - minutes + 1
+        merged = StackTrie(self.max_nodes * self.window)
+        with self._buckets_lock:
+            for minute, trie in self.buckets:
+                if minute >= since:
+                    merged.merge(trie)
+        return merged
+
+
+def get_sampler(app):
+    """Return the app's SamplingProfiler, or None if it is not running."""
+    return app.extensions.get(EXTENSION)
+
+
+def init_app(app):
+    """Start the sampling profiler if SAMPLING_PROFILER and DEBUG_SECRET are set."""
+    if not (app.config.get("SAMPLING_PROFILER") and app.config.get("DEBUG_SECRET")):
+        return
+
+    sampler = SamplingProfiler(
+        interval=app.config.get("SAMPLING_INTERVAL", 0.01),
+        window=app.config.get("SAMPLING_WINDOW", 10),
+        max_nodes=app.config.get("SAMPLING_MAX_NODES", 20000),
+    )
+    lifecycle = get_lifecycle(app)
+    lifecycle.on_start(sampler.request_started)
+    lifecycle.on_finish(sampler.request_finished)
+    sampler.start()
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=sampler._after_fork)
+    app.extensions[EXTENSION] = sampler
@@ -0,0 +1,90 @@
+"""
+Run HTTPilot under gunicorn with the project's production settings.
+
+Usage: httpilot-serve [--worker-class gthread|sync|uvicorn] [--workers N]
+                      [--threads N] [--no-preload] [--bind ADDR]
+                      [--print-config] [-- extra gunicorn arguments]
+
+Options become the environment variables read by ``gunicorn.conf.py``, so
+the settings are the same as when running ``gunicorn`` directly.
+"""
+import argparse
+import os
+import runpy
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG = os.path.join(ROOT, "gunicorn.conf.py")
+SHOWN = (
+    "bind",
+    "wsgi_app",
+    "worker_class",
+    "workers",
+    "threads",
+    "preload_app",
+    "keepalive",
+    "timeout",
+    "graceful_timeout",
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--worker-class", choices=["gthread", "sync", "uvicorn"])
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--no-preload", action="store_true")
+    parser.add_argument("--bind")
+    parser.add_argument(
+        "--print-config", action="store_true", help="show the settings and exit"
+    )
+    parser.add_argument("extra", nargs="*", help="passed on to gunicorn")
+    return parser.parse_args(argv)
+
+
+def environment(args, base=None):
+    """Return the environment for gunicorn.conf.py reflecting args."""
+    env = dict(os.environ if base is None else base)
+    if args.worker_class:
+        env["GUNICORN_WORKER_CLASS"] = args.worker_class
+    if args.workers:
+        env["WEB_CONCURRENCY"] = str(args.workers)
+    if args.threads:
+        env["GUNICORN_THREADS"] = str(args.threads)
+    if args.no_preload:
+        env["GUNICORN_PRELOAD"] = "0"
+    if args.bind:
+        env["GUNICORN_BIND"] = args.bind
+    return env
+
+
+def load_settings(env):
+    """Evaluate gunicorn.conf.py under env and return its settings."""
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)  # gunicorn.conf.py imports src
+    saved = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        namespace = runpy.run_path(CONFIG)
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+    return {name: namespace[name] for name in SHOWN if name in namespace}
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    env = environment(args)
+    if args.print_config:
+        for name, value in load_settings(env).items():
+            print(f"{name} = {value!r}")
+        return 0
+
+    command = [sys.executable, "-m", "gunicorn", "--config", CONFIG, *args.extra]
+    os.chdir(ROOT)
+    os.execve(sys.executable, command, env)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
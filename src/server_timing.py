@@ -0,0 +1,177 @@
+"""
+``Server-Timing`` response header with a per-phase breakdown.
+
+When ``SERVER_TIMING`` is enabled every response carries e.g.::
+
+    Server-Timing: routing;dur=0.081, handler;dur=1.204, json;dur=0.113, ttfb;dur=1.322
+
+Phases are collected by cheap ``perf_counter_ns`` probes (:func:`probe` and
+:func:`timed`) that do nothing when timing is off. ``ttfb`` is measured up
+to the first chunk of the body, which the middleware produces before
+sending the headers; for streamed responses this means the headers wait
+for the first chunk.
+"""
+import contextvars
+import functools
+import time
+
+_timings = contextvars.ContextVar("httpilot_server_timing", default=None)
+
+HEADER = "Server-Timing"
+
+
+class Timings:
+    """Accumulated phase durations of one request, in nanoseconds."""
+
+    __slots__ = ("start_ns", "handler_start_ns", "phases")
+
+    def __init__(self, start_ns):
+        self.start_ns = start_ns
+        self.handler_start_ns = None
+        self.phases = {}
+
+    def add(self, name, duration_ns):
+        self.phases[name] = self.phases.get(name, 0) + duration_ns
+
+    def header(self):
+        return ", ".join(
+            f"{name};dur={duration / 1e6:.3f}" for name, duration in self.phases.items()
+        )
+
+
+class probe:
+    """Context manager adding the time spent in its block to phase name."""
+
+    __slots__ = ("name", "timings", "start_ns")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.timings = _timings.get()
+        if self.timings is not None:
+            self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        if self.timings is not None:
+            self.timings.add(self.name, time.perf_counter_ns() - self.start_ns)
+
+
+def timed(name):
+    """Decorator adding the duration of each call to phase name."""
+
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            timings = _timings.get()
+            if timings is None:
+                return f(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                timings.add(name, time.perf_counter_ns() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class ServerTimingMiddleware:
+    """Collect Timings for each request and add them as a response header."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        timings = Timings(time.perf_counter_ns())
+        token = _timings.set(timings)
+        captured = []
+        # Data passed to the legacy write() callable, sent ahead of the
+        # chunks that follow it (the headers are held back until then).
+        written = []
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return written.append
+
+        try:
+            body = self.wsgi_app(environ, capture_start_response)
+            iterator = iter(body)
+            try:
+                first = [next(iterator)]
+            except StopIteration:
+                first = []
+            except BaseException:
+                close = getattr(body, "close", None)
+                if close is not None:
+                    close()
+                raise
+            timings.add("ttfb", time.perf_counter_ns() - timings.start_ns)
+        finally:
+            _timings.reset(token)
+
+        status, headers, exc_info = captured
+        start_response(status, headers + [(HEADER, timings.header())], exc_info)
+        return _Body(first, iterator, body, written)
+
+
+class _Body:
+    """The prefetched first chunk followed by the rest of the body."""
+
+    def __init__(self, first, iterator, body, written):
+        self._first = first
+        self._iterator = iterator
+        self._body = body
+        self._written = written
+
+    def _flush(self):
+        written = self._written
+        while written:
+            yield written.pop(0)
+
+    def __iter__(self):
+        yield from self._flush()
+        for chunk in self._first:
+            yield chunk
+        for chunk in self._iterator:
+            if self._written:
+                yield from self._flush()
+            yield chunk
+        yield from self._flush()
+
+    def close(self):
+        close = getattr(self._body, "close", None)
+        if close is not None:
+            close()
+
+
+def _before_request():
+    timings = _timings.get()
+    if timings is not None:
+        now = time.perf_counter_ns()
+        timings.add("routing", now - timings.start_ns)
+        timings.handler_start_ns = now
+
+
+def _after_request(response):
+    timings = _timings.get()
+    if timings is not None and timings.handler_start_ns is not None:
+        timings.add("handler", time.perf_counter_ns() - timings.handler_start_ns)
+    return response
+
+
+def init_app(app):
+    """Add the Server-Timing header to app's responses if SERVER_TIMING is set.
+
+    ``routing`` covers everything from WSGI entry until the view is about
+    to run, ``handler`` the view and response building; the other phases
+    are nested in ``handler``.
+    """
+    if not app.config.get("SERVER_TIMING", False):
+        return
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.wsgi_app = ServerTimingMiddleware(app.wsgi_app)
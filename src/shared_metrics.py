@@ -0,0 +1,278 @@
+"""
+Metrics shared between worker processes through memory-mapped files.
+
+Each worker writes its samples to its own files in ``METRICS_DIR``
+(``counter_<pid>.db`` and ``gauge_<pid>.db``), so recording is a plain
+memory write with no IPC. Any worker can serve ``/metrics`` by summing all
+files in the directory.
+
+Samples from collectors (admission occupancy, access log drops, ...) are
+per-process values. Each worker writes them to its files as well, from a
+background thread every ``publish_interval`` seconds and right before it
+serves a scrape, so they are summed like everything else.
+
+When a worker exits, :func:`mark_process_dead` folds its counters and
+histograms into ``counter_archive.db`` and removes its files, dropping its
+gauges (its in-flight requests are gone with it).
+
+File layout: an 8 byte header holding the number of bytes in use, then
+entries of ``[uint32 key length][key][padding to 8][float64 value]``. New
+entries are written in full before the header is updated, so readers never
+see a partial entry.
+"""
+import fcntl
+import glob
+import json
+import mmap
+import os
+import shutil
+import struct
+import threading
+import time
+
+from .metrics import Registry
+
+INITIAL_SIZE = 64 * 1024
+PUBLISH_INTERVAL = 1.0
+ARCHIVE = "counter_archive.db"
+LOCK_FILE = "archive.lock"
+
+_header = struct.Struct("i")
+_value = struct.Struct("d")
+
+
+def _encode_key(key):
+    name, labels = key
+    return json.dumps([name, labels], separators=(",", ":")).encode("utf-8")
+
+
+def _decode_key(data):
+    name, labels = json.loads(data)
+    return name, tuple(tuple(pair) for pair in labels)
+
+
+def _padded(length):
+    return length + (-length % 8)
+
+
+class MmapValues:
+    """Float values keyed by ``(name, labels)`` in a memory-mapped file.
+
+    Only one thread of one process may write a file at a time.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a+b")
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._file.truncate(INITIAL_SIZE)
+            size = INITIAL_SIZE
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._used = _header.unpack_from(self._map, 0)[0]
+        if self._used == 0:
+            self._used = 8
+            _header.pack_into(self._map, 0, self._used)
+        self._offsets = {
+            key: offset for key, _, offset in _read_entries(self._map, self._used)
+        }
+
+    def add(self, key, amount):
+        offset = self._offsets.get(key)
+        if offset is None:
+            offset = self._append(key)
+        value = _value.unpack_from(self._map, offset)[0]
+        _value.pack_into(self._map, offset, value + amount)
+
+    def set(self, key, value):
+        offset = self._offsets.get(key)
+        if offset is None:
+            offset = self._append(key)
+        _value.pack_into(self._map, offset, value)
+
+    def _append(self, key):
+        encoded = _encode_key(key)
+        entry = struct.pack(f"i{len(encoded)}s", len(encoded), encoded)
+        entry = entry.ljust(_padded(len(entry)), b"\0") + _value.pack(0.0)
+
+        if self._used + len(entry) > len(self._map):
+            self._grow(self._used + len(entry))
+
+        self._map[self._used : self._used + len(entry)] = entry
+        self._used += len(entry)
+        _header.pack_into(self._map, 0, self._used)
+
+        offset = self._used - _value.size
+        self._offsets[key] = offset
+        return offset
+
+    def _grow(self, needed):
+        size = len(self._map)
+        while size < needed:
+            size *= 2
+        self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def _read_entries(data, used):
+    pos = 8
+    while pos < used:
+        length = _header.unpack_from(data, pos)[0]
+        key = _decode_key(bytes(data[pos + 4 : pos + 4 + length]))
+        pos += _padded(4 + length)
+        yield key, _value.unpack_from(data, pos)[0], pos
+        pos += _value.size
+
+
+def read_values(path):
+    """Return ``{key: value}`` of a metrics file written by any process."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < 8:
+        return {}
+    used = min(_header.unpack_from(data, 0)[0], len(data))
+    return {key: value for key, value, _ in _read_entries(data, used)}
+
+
+class _ArchiveLock:
+    """flock on the directory's lock file, shared for readers."""
+
+    def __init__(self, directory, exclusive):
+        self.path = os.path.join(directory, LOCK_FILE)
+        self.mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+
+    def __enter__(self):
+        self._file = open(self.path, "a")
+        fcntl.flock(self._file, self.mode)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+class _ProcessFiles:
+    """The files one process writes in a directory, shared by its registries."""
+
+    def __init__(self, directory, pid):
+        self.pid = pid
+        self.lock = threading.Lock()
+        self.counters = MmapValues(os.path.join(directory, f"counter_{pid}.db"))
+        self.gauges = MmapValues(os.path.join(directory, f"gauge_{pid}.db"))
+
+
+_process_files = {}
+_process_files_lock = threading.Lock()
+
+
+def _files_for(directory):
+    pid = os.getpid()
+    files = _process_files.get(directory)
+    if files is None or files.pid != pid:
+        # First use, or a fork: the parent's files are not ours to write.
+        with _process_files_lock:
+            files = _process_files.get(directory)
+            if files is None or files.pid != pid:
+                files = _process_files[directory] = _ProcessFiles(directory, pid)
+    return files
+
+
+class SharedRegistry(Registry):
+    """Registry whose values live in METRICS_DIR and are summed across workers."""
+
+    def __init__(self, directory, publish_interval=PUBLISH_INTERVAL, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = os.path.abspath(directory)
+        self.publish_interval = publish_interval
+        self._publisher_pid = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _values(self, files, name):
+        family = self.families.get(name)
+        return files.gauges if family and family[0] == "gauge" else files.counters
+
+    def _add(self, key, amount):
+        files = _files_for(self.directory)
+        if self._publisher_pid != files.pid and self.collectors:
+            self._start_publisher(files.pid)
+        values = self._values(files, key[0])
+        with files.lock:
+            values.add(key, amount)
+
+    def _start_publisher(self, pid):
+        # Started by the first sample of each process, so after a fork.
+        with self._lock:
+            if self._publisher_pid == pid:
+                return
+            self._publisher_pid = pid
+        thread = threading.Thread(
+            target=self._publish_forever, name="httpilot-metrics-publisher", daemon=True
+        )
+        thread.start()
+
+    def _publish_forever(self):
+        while True:
+            time.sleep(self.publish_interval)
+            self.publish()
+
+    def publish(self):
+        """Write the current collector samples to this process's files."""
+        samples = [sample for collector in self.collectors for sample in collector()]
+        if not samples:
+            return
+        files = _files_for(self.directory)
+        with files.lock:
+            for name, labels, value in samples:
+                self._values(files, name).set((name, labels), value)
+
+    def collect(self):
+        """Return the value of every sample key summed over all workers."""
+        self.publish()
+        totals = {}
+        with _ArchiveLock(self.directory, exclusive=False):
+            paths = glob.glob(os.path.join(self.directory, "*.db"))
+            for path in paths:
+                try:
+                    values = read_values(path)
+                except FileNotFoundError:
+                    continue
+                for key, value in values.items():
+                    totals[key] = totals.get(key, 0) + value
+        return totals
+
+
+def mark_process_dead(pid, directory=None):
+    """Fold the counters of an exited worker into the archive.
+
+    Call this from the server's child-exit hook. Gauges of the worker are
+    discarded.
+    """
+    directory = directory or os.environ.get("METRICS_DIR")
+    if not directory:
+        return
+
+    counters = os.path.join(directory, f"counter_{pid}.db")
+    gauges = os.path.join(directory, f"gauge_{pid}.db")
+    with _ArchiveLock(directory, exclusive=True):
+        if os.path.exists(counters):
+            archive = MmapValues(os.path.join(directory, ARCHIVE))
+            try:
+                for key, value in read_values(counters).items():
+                    archive.add(key, value)
+            finally:
+                archive.close()
+            os.remove(counters)
+        if os.path.exists(gauges):
+            os.remove(gauges)
+
+
+def clear(directory):
+    """Empty directory of files left by a previous run; call before forking."""
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory)
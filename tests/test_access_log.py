@@ -0,0 +1,94 @@
+"""Tests for the structured access log."""
+
+import json
+import threading
+import time
+import pytest
+
+from config import TestingConfig
+from src.access_log import AccessLog, get_access_log
+from src.app import create_app
+from src.lifecycle import RequestRecord
+
+
+@pytest.fixture
+def logged_app(tmp_path, monkeypatch):
+    """App writing its access log to a temporary file."""
+    monkeypatch.setattr(TestingConfig, "ACCESS_LOG", str(tmp_path / "access.log"))
+    app = create_app("testing")
+    yield app
+    get_access_log(app).stop()
+
+
+def make_record(path="/get"):
+    """Return a finished RequestRecord."""
+    record = RequestRecord(time.perf_counter_ns(), "GET", path, "", "", 0)
+    record.status = 200
+    record.end_ns = record.start_ns + 1000
+    return record
+
+
+def test_disabled_by_default(app):
+    """Test no access log is installed unless ACCESS_LOG is set."""
+    assert get_access_log(app) is None
+
+
+def test_lines_are_json(logged_app, tmp_path):
+    """Test each finished request is written as one JSON line."""
+    client = logged_app.test_client()
+    client.post("/post", data=b"abc").data
+    client.get("/stream-bytes/100").data
+    get_access_log(logged_app).stop()
+
+    lines = (tmp_path / "access.log").read_text().splitlines()
+    entries = [json.loads(line) for line in lines]
+    assert [entry["path"] for entry in entries] == ["/post", "/stream-bytes/100"]
+
+    post, stream = entries
+    assert post["method"] == "POST"
+    assert post["status"] == 200
+    assert post["bytes_in"] == 3
+    assert post["endpoint"] == "http_methods.test_post"
+    assert post["time"].endswith("Z")
+    assert stream["bytes_out"] == 100
+    assert stream["completed"] is True
+    assert stream["duration"] >= 0
+    assert isinstance(stream["worker"], int)
+
+
+def test_slow_sink_does_not_block(tmp_path, monkeypatch):
+    """Test requests never wait for the writer and overflow is counted."""
+    release = threading.Event()
+
+    class SlowStream:
+        def write(self, data):
+            release.wait(5)
+
+        def flush(self):
+            pass
+
+        def close(self):
+            pass
+
+    access_log = AccessLog(str(tmp_path / "x.log"), queue_size=10, batch_size=2)
+    monkeypatch.setattr(access_log, "_open", SlowStream)
+    access_log.start()
+    try:
+        start = time.perf_counter()
+        for _ in range(100):
+            access_log.request_finished(make_record())
+        assert time.perf_counter() - start < 0.5
+        assert access_log.dropped >= 80
+        assert ("httpilot_access_log_dropped_total", (), access_log.dropped) in (
+            access_log.samples()
+        )
+    finally:
+        release.set()
+        access_log.stop()
+
+
+def test_dropped_counter_on_metrics(logged_app):
+    """Test the dropped counter and queue depth are exported on /metrics."""
+    text = logged_app.test_client().get("/metrics").data.decode("utf-8")
+    assert "httpilot_access_log_dropped_total 0" in text
+    assert "# TYPE httpilot_access_log_queue_depth gauge" in text
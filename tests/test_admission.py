@@ -0,0 +1,156 @@
+"""Tests for concurrency admission control."""
+
+import threading
+import time
+import pytest
+
+from config import TestingConfig
+from src.admission import Limiter, get_admission
+from src.app import create_app
+
+
+@pytest.fixture
+def limited_app(monkeypatch):
+    """App allowing one slow request at a time and no queue."""
+    monkeypatch.setattr(
+        TestingConfig,
+        "ADMISSION_CLASSES",
+        {
+            "slow": {
+                "endpoints": ("dynamic_data.delay_response", "dynamic_data.drip"),
+                "concurrency": 1,
+                "queue": 0,
+                "retry_after": 3,
+            }
+        },
+    )
+    return create_app("testing")
+
+
+def test_limiter_sheds_when_queue_is_full():
+    """Test a full limiter rejects at once when no queue is allowed."""
+    limiter = Limiter("slow", 1)
+    assert limiter.acquire()
+    assert not limiter.acquire()
+    assert limiter.shed["queue_full"] == 1
+    limiter.release()
+    assert limiter.acquire()
+
+
+def test_limiter_queue_waits_for_a_slot():
+    """Test a queued request is admitted when a slot is released."""
+    limiter = Limiter("slow", 1, queue=1, timeout=5)
+    assert limiter.acquire()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(limiter.acquire()))
+    waiter.start()
+    while not limiter.waiting:
+        time.sleep(0.001)
+    assert not limiter.acquire()  # the queue is full
+    limiter.release()
+    waiter.join()
+    assert results == [True]
+    assert limiter.active == 1 and limiter.waiting == 0
+
+
+def test_limiter_queue_timeout():
+    """Test a queued request is shed when no slot frees up in time."""
+    limiter = Limiter("slow", 1, queue=1, timeout=0.01)
+    assert limiter.acquire()
+    assert not limiter.acquire()
+    assert limiter.shed["timeout"] == 1
+    assert limiter.waiting == 0
+
+
+def test_shed_request_gets_503(limited_app):
+    """Test requests beyond the limit get 503 while other endpoints still work."""
+    client = limited_app.test_client()
+    limiter = get_admission(limited_app).limiters["slow"]
+    assert limiter.acquire()
+
+    response = client.get("/delay/0")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert response.get_json()["status"] == 503
+    assert client.get("/health").status_code == 200
+
+    limiter.release()
+    response = client.get("/delay/0")
+    assert response.status_code == 200
+    response.data
+    assert limiter.active == 0
+
+
+def test_slot_held_until_body_is_sent(limited_app):
+    """Test a streamed response keeps its slot until the body is read."""
+    client = limited_app.test_client()
+    limiter = get_admission(limited_app).limiters["slow"]
+
+    streaming = client.get("/drip?duration=0&numbytes=5")
+    assert limiter.active == 1
+    assert client.get("/drip?duration=0&numbytes=5").status_code == 503
+    assert streaming.data == b"*****"
+    assert limiter.active == 0
+
+
+def test_admission_metrics(limited_app):
+    """Test admission occupancy and outcomes are exported on /metrics."""
+    client = limited_app.test_client()
+    limiter = get_admission(limited_app).limiters["slow"]
+    limiter.acquire()
+    client.get("/delay/0").data
+    limiter.release()
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert 'httpilot_admission_limit{class="slow"} 1' in text
+    assert 'httpilot_admission_active{class="slow"} 0' in text
+    assert 'httpilot_admission_shed_total{class="slow",reason="queue_full"} 1' in text
+
+
+@pytest.mark.parametrize(
+    "endpoint",
+    [
+        "dynamic_data.delay_response",
+        "dynamic_data.drip",
+    ],
+)
+def test_sleeping_endpoints_are_limited(endpoint):
+    """Test endpoints that hold a thread while they wait are in the slow class."""
+    admission = get_admission(create_app("testing"))
+    assert admission.by_endpoint[endpoint].name == "slow"
+
+
+def test_only_slow_graph_nodes_take_a_slot(limited_app):
+    """Test /graph takes a slow slot around the wait of slow nodes only."""
+    client = limited_app.test_client()
+    admission = get_admission(limited_app)
+    limiter = admission.limiters["slow"]
+    assert "dynamic_data.graph_page" not in admission.by_endpoint
+    query = "?dead=0&slow=1&delay=0"  # every node but the root is slow
+
+    assert limiter.acquire()
+    assert client.get(f"/graph/1/0{query}").status_code == 200
+    response = client.get(f"/graph/1/1{query}")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    limiter.release()
+
+    assert client.get(f"/graph/1/1{query}").status_code == 200
+    assert limiter.active == 0 and limiter.admitted == 2
+
+
+def test_only_delayed_redirect_hops_take_a_slot(limited_app, monkeypatch):
+    """Test /redirect-chain takes a slow slot around the wait of delayed hops only."""
+    monkeypatch.setattr("src.routes.redirect.time.sleep", lambda seconds: None)
+    client = limited_app.test_client()
+    admission = get_admission(limited_app)
+    limiter = admission.limiters["slow"]
+    assert "redirect.redirect_chain" not in admission.by_endpoint
+
+    assert limiter.acquire()
+    assert client.get("/redirect-chain/2").status_code == 302
+    assert client.get("/redirect-chain/2?delay=0.5").status_code == 503
+    limiter.release()
+
+    assert client.get("/redirect-chain/2?delay=0.5").status_code == 302
+    assert limiter.active == 0 and limiter.admitted == 2
@@ -0,0 +1,62 @@
+"""Tests for per-endpoint allocation tracking."""
+
+import tracemalloc
+import pytest
+
+from config import TestingConfig
+from src.app import create_app
+
+SECRET = "s3cret"
+HEADERS = {"X-Debug-Secret": SECRET}
+
+
+@pytest.fixture
+def debug_client(monkeypatch):
+    """Client of an app with DEBUG_SECRET set."""
+    monkeypatch.setattr(TestingConfig, "DEBUG_SECRET", SECRET)
+    client = create_app("testing").test_client()
+    yield client
+    client.post("/debug/allocations/stop", headers=HEADERS)
+
+
+def test_requires_secret(debug_client):
+    """Test the allocation routes are hidden without the secret."""
+    assert debug_client.get("/debug/allocations").status_code == 404
+    assert debug_client.post("/debug/allocations/start").status_code == 404
+
+
+def test_window_reports_endpoints(debug_client):
+    """Test a window records peak memory and allocation sites per endpoint."""
+    response = debug_client.post("/debug/allocations/start?seconds=30", headers=HEADERS)
+    assert response.json["active"] is True
+    assert tracemalloc.is_tracing()
+
+    for _ in range(2):
+        debug_client.get("/bytes/20000").data
+    debug_client.get("/get").data
+
+    report = debug_client.get("/debug/allocations", headers=HEADERS).json
+    endpoint = report["endpoints"]["dynamic_data.random_bytes"]
+    assert endpoint["requests"] == 2
+    assert endpoint["peak"]["max"] >= 20000
+    assert endpoint["top"] and ":" in endpoint["top"][0]["site"]
+    assert report["endpoints"]["http_methods.view_get"]["requests"] == 1
+
+    stopped = debug_client.post("/debug/allocations/stop", headers=HEADERS).json
+    assert stopped["active"] is False
+    assert not tracemalloc.is_tracing()
+    assert stopped["endpoints"]["dynamic_data.random_bytes"]["requests"] == 2
+
+
+def test_window_without_reset_peak(debug_client, monkeypatch):
+    """Test requests are measured on Pythons without tracemalloc.reset_peak."""
+    monkeypatch.setattr("src.allocations.RESET_PEAK", False)
+    monkeypatch.delattr(tracemalloc, "reset_peak", raising=False)
+    debug_client.post("/debug/allocations/start?seconds=30", headers=HEADERS)
+
+    debug_client.get("/bytes/20000").data
+
+    report = debug_client.get("/debug/allocations", headers=HEADERS).json
+    endpoint = report["endpoints"]["dynamic_data.random_bytes"]
+    assert endpoint["requests"] == 1
+    assert endpoint["peak"]["max"] > 10000
@@ -0,0 +1,162 @@
+"""Tests for the ASGI entry point."""
+
+import asyncio
+import json
+import threading
+import time
+import pytest
+
+from src.asgi import HTTPilotASGI
+from src.metrics import get_registry
+
+
+@pytest.fixture
+def asgi_app(app):
+    """The testing app wrapped for ASGI."""
+    asgi = HTTPilotASGI(app)
+    yield asgi
+    asgi.bridge.executor.shutdown()
+
+
+async def request(asgi, path, method="GET", query=b"", headers=(), body=b"", disconnect=None):
+    """Drive one HTTP request through asgi; return (status, headers, body)."""
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+    gone = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if disconnect is not None and len(sent) >= disconnect:
+            gone.set()
+
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "query_string": query,
+        "root_path": "",
+        "headers": [(b"host", b"localhost")] + list(headers),
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 80),
+    }
+    await asgi(scope, receive, send)
+    start = sent[0]
+    headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    data = b"".join(m.get("body", b"") for m in sent[1:])
+    return start["status"], headers, data
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_bridged_routes(asgi_app):
+    """Test routes without a native handler are served by Flask."""
+    status, headers, body = run(request(asgi_app, "/get", query=b"a=1"))
+    assert status == 200
+    assert b'"a"' in body
+    assert headers["content-type"] == "application/json"
+
+    status, _, body = run(
+        request(
+            asgi_app,
+            "/post",
+            method="POST",
+            headers=[(b"content-type", b"text/plain"), (b"content-length", b"5")],
+            body=b"hello",
+        )
+    )
+    assert status == 200
+    assert b"hello" in body
+
+
+def test_native_routes_match_flask(app, asgi_app):
+    """Test native handlers answer like the Flask views they replace."""
+    client = app.test_client()
+
+    status, _, body = run(request(asgi_app, "/stream-bytes/3000", query=b"seed=7&chunk_size=512"))
+    assert status == 200
+    assert body == client.get("/stream-bytes/3000?seed=7&chunk_size=512").data
+
+    status, headers, body = run(
+        request(asgi_app, "/range/100", headers=[(b"range", b"bytes=10-19")])
+    )
+    expected = client.get("/range/100", headers={"Range": "bytes=10-19"})
+    assert status == expected.status_code == 206
+    assert body == expected.data
+    assert headers["content-range"] == expected.headers["Content-Range"]
+
+    status, _, _ = run(request(asgi_app, "/range/100", headers=[(b"range", b"bytes=200-")]))
+    assert status == 416
+
+    status, _, body = run(request(asgi_app, "/drip", query=b"duration=0&numbytes=7&code=201"))
+    assert (status, body) == (201, b"*******")
+
+    status, _, body = run(request(asgi_app, "/stream/3"))
+    lines = body.decode().splitlines()
+    assert [line.count('"id"') for line in lines] == [1, 1, 1]
+
+    status, _, body = run(request(asgi_app, "/stream/1", query=b"fields=url"))
+    assert set(json.loads(body)) == {"url", "id"}
+
+    status, _, body = run(request(asgi_app, "/delay/61"))
+    assert status == 400
+
+    graph = [("/graph/3/12", b"depth=4"), ("/graph/3/0", b""), ("/graph/3/99999999", b"")]
+    for path, query in graph:
+        status, _, body = run(request(asgi_app, path, query=query))
+        expected = client.get(f"{path}?{query.decode()}")
+        assert (status, body) == (expected.status_code, expected.data)
+
+    chain = [("/redirect-chain/2", b"status=307&hosts=1"), ("/redirect-chain/0", b"")]
+    chain.append(("/redirect-chain/1", b"status=200"))
+    for path, query in chain:
+        status, headers, body = run(request(asgi_app, path, query=query))
+        expected = client.get(f"{path}?{query.decode()}")
+        assert (status, body) == (expected.status_code, expected.data)
+        assert headers.get("location") == expected.headers.get("Location")
+
+
+def test_native_requests_are_counted(app, asgi_app):
+    """Test native requests reach the lifecycle hooks like WSGI ones."""
+    run(request(asgi_app, "/delay/0"))
+    text = get_registry(app).exposition()
+    assert 'endpoint="dynamic_data.delay_response",method="GET",status_class="2xx"' in text
+
+
+def test_streams_share_one_thread(asgi_app):
+    """Test concurrent streams are served without a thread each."""
+    threads = threading.active_count()
+
+    async def many():
+        return await asyncio.gather(
+            *(
+                request(asgi_app, "/drip", query=b"duration=0.2&numbytes=4")
+                for _ in range(200)
+            )
+        )
+
+    start = time.monotonic()
+    results = run(many())
+    assert time.monotonic() - start < 2
+    assert all(body == b"****" for _, _, body in results)
+    assert threading.active_count() == threads
+
+
+def test_disconnect_stops_stream(asgi_app):
+    """Test a native stream stops once the client goes away."""
+    start = time.monotonic()
+    status, _, body = run(
+        request(asgi_app, "/drip", query=b"duration=30&numbytes=30", disconnect=2)
+    )
+    assert time.monotonic() - start < 5
+    assert status == 200
+    assert len(body) < 30
@@ -217,3 +217,86 @@ def test_empty_cookie_value(client):
     response = client.get("/cookies/set/empty_test/")
     # Flask route requires a value, empty path segment results in 404
     assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "a=1; b=2",
+        " a = 1 ;b=x=y;;c;=d; a=3 ",
+        'q="quoted \\"value\\""; r=plain',
+        "long=" + "v" * 10000,
+    ],
+)
+def test_get_cookies_matches_werkzeug(app, header):
+    """Test /cookies returns the first value of each cookie like Werkzeug parses them."""
+    from werkzeug.http import parse_cookie
+
+    client = app.test_client(use_cookies=False)
+    response = client.get("/cookies", headers={"Cookie": header})
+    assert response.get_json()["cookies"] == dict(parse_cookie(header).items())
+
+
+def test_get_cookies_many(app):
+    """Test /cookies with thousands of cookies in one header."""
+    header = "; ".join(f"c{i}={i}" for i in range(5000))
+    client = app.test_client(use_cookies=False)
+    cookies = client.get("/cookies", headers={"Cookie": header}).get_json()["cookies"]
+    assert len(cookies) == 5000
+    assert cookies["c4999"] == "4999"
+
+
+def test_bulk_cookies(client):
+    """Test /cookies/bulk sets deterministic cookies in one response."""
+    url = "/cookies/bulk?count=6&size=5&domain_spread=2&expiry_mix=1,1,1"
+    response = client.get(url, base_url="https://www.example.com:8443")
+    assert response.status_code == 200
+    lines = response.headers.getlist("Set-Cookie")
+    assert lines == [
+        "c0=abcde; Secure; HttpOnly; Path=/",
+        "c1=bcdef; Domain=www.example.com; Secure; HttpOnly; Path=/",
+        "c2=cdefg; Max-Age=3600; Secure; HttpOnly; Path=/",
+        "c3=defgh; Domain=www.example.com; Max-Age=3600; Secure; HttpOnly; Path=/",
+        "c4=efghi; Expires=Thu, 01 Jan 1970 00:00:00 GMT; Max-Age=0; Secure; HttpOnly; Path=/",
+        "c5=fghij; Domain=www.example.com; Expires=Thu, 01 Jan 1970 00:00:00 GMT; Max-Age=0;"
+        " Secure; HttpOnly; Path=/",
+    ]
+    assert response.get_json() == {
+        "count": 6,
+        "size": 5,
+        "domains": [None, "www.example.com"],
+        "expiry": {"session": 2, "persistent": 2, "expired": 2},
+        "header_bytes": sum(map(len, lines)),
+    }
+
+    again = client.get(url, base_url="https://www.example.com:8443")
+    assert again.headers.getlist("Set-Cookie") == lines
+
+
+def test_bulk_cookies_at_scale(client):
+    """Test thousands of cookies and the domains a client accepts."""
+    response = client.get(
+        "/cookies/bulk?count=5000&size=100&domain_spread=10&expiry_mix=3,1,0",
+        base_url="http://a.b.example.com",
+    )
+    lines = response.headers.getlist("Set-Cookie")
+    assert len(lines) == 5000
+    assert len(set(line.partition("=")[0] for line in lines)) == 5000
+    data = response.get_json()
+    assert data["domains"] == [None, "a.b.example.com", "b.example.com", "example.com"]
+    assert data["expiry"] == {"session": 3752, "persistent": 1248, "expired": 0}
+    assert sum("Max-Age" in line for line in lines) == 1248
+
+    ip = client.get("/cookies/bulk?domain_spread=5", base_url="http://127.0.0.1:5000")
+    assert ip.get_json()["domains"] == [None]
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["count=0", "count=10001", "size=4001", "count=10000&size=1000", "expiry_mix=1,1", "size=x"],
+)
+def test_bulk_cookies_invalid(client, query):
+    """Test invalid /cookies/bulk arguments are a 400."""
+    response = client.get(f"/cookies/bulk?{query}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
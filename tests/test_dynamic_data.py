@@ -348,6 +348,26 @@ def test_links_exceeds_limit(client):
     assert "Links" in html
 
 
+def test_links_cached_page_per_offset(client):
+    """Test every offset of a cached page links all other entries."""
+    for offset in (0, 1, 3, 9):
+        html = client.get("/links/4/%d" % offset).data.decode()
+        for i in range(4):
+            link = "<a href='/links/4/%d'>%d</a> " % (i, i)
+            if i == offset:
+                assert link not in html
+                assert "%d " % i in html
+            else:
+                assert link in html
+
+
+def test_links_script_root(client):
+    """Test links are built for the script root of the request."""
+    client.get("/links/3/0")
+    html = client.get("/links/3/0", base_url="http://localhost/prefix").data.decode()
+    assert "<a href='/prefix/links/3/1'>1</a>" in html
+
+
 def test_range_requests_no_range_header(client):
     """Test range requests without Range header."""
     response = client.get("/range/1000")
@@ -0,0 +1,95 @@
+"""Tests for error responses and the cheap path for unmatched URLs."""
+
+from config import TestingConfig
+from src.app import create_app
+from src.errors import TopPaths, get_top_paths
+
+SECRET = "s3cret"
+
+
+def test_not_found_body(client):
+    """Test unmatched URLs get the JSON error body."""
+    response = client.get("/wp-login.php")
+    assert response.status_code == 404
+    assert response.mimetype == "application/json"
+    assert response.get_json() == {
+        "error": "Not Found",
+        "message": "The requested resource was not found on this server.",
+        "status": 404,
+    }
+
+    pretty = client.get("/wp-login.php?pretty")
+    assert pretty.get_json() == response.get_json()
+    assert b'\n  "error"' in pretty.data
+
+
+def test_repeated_paths_skip_flask(app, client):
+    """Test known missing paths are answered before Flask runs."""
+    calls = []
+    app.before_request_funcs[None].append(lambda: calls.append(1))
+
+    first = client.get("/.env")
+    assert len(calls) == 0  # the 404 is returned by the first hook
+    second = client.get("/.env")
+    assert second.status_code == 404
+    assert second.data == first.data
+    assert second.headers["Content-Length"] == str(len(first.data))
+    assert client.head("/.env").data == b""
+    assert get_top_paths(app).counts["/.env"] == 3
+
+
+def test_matched_routes_are_not_counted(app, client):
+    """Test 404s returned by views do not make their path a missing path."""
+    assert client.get("/status/404").status_code == 404
+    assert client.get("/redirect/abc").status_code == 404
+    top = get_top_paths(app)
+    assert "/status/404" not in top
+    assert "/redirect/abc" in top
+
+
+def test_unmatched_requests_are_counted(client):
+    """Test 404s answered by the middleware still reach the metrics."""
+    for _ in range(3):
+        client.get("/admin.php").data
+    text = client.get("/metrics").get_data(as_text=True)
+    assert (
+        'httpilot_requests_total{blueprint="",endpoint="unmatched",'
+        'method="GET",status_class="4xx"} 3'
+    ) in text
+
+
+def test_top_paths_space_saving():
+    """Test the sketch keeps heavy hitters within its size."""
+    top = TopPaths(4)
+    for path in ["/a"] * 50 + ["/b"] * 20 + [f"/junk{i}" for i in range(30)]:
+        top.add(path)
+    assert len(top) == 4
+    assert top.total == 100
+    assert top.top(2) == [("/a", 50, 0), ("/b", 20, 0)]
+    # Junk paths inherit the smallest count as their error.
+    for path, count, error in top.top()[2:]:
+        assert count - error <= 1 <= count
+
+
+def test_debug_route(monkeypatch):
+    """Test /debug/not-found lists the most requested missing paths."""
+    monkeypatch.setattr(TestingConfig, "DEBUG_SECRET", SECRET)
+    client = create_app("testing").test_client()
+    for path in ["/.git/config"] * 3 + ["/phpmyadmin"]:
+        client.get(path).data
+
+    assert client.get("/debug/not-found").status_code == 404
+    report = client.get("/debug/not-found?n=1", headers={"X-Debug-Secret": SECRET}).get_json()
+    assert report["total"] == 4
+    assert report["tracked"] == 2
+    assert report["paths"] == [{"path": "/.git/config", "count": 3, "error": 0}]
+
+
+def test_disabled(monkeypatch):
+    """Test NOT_FOUND_TOP_PATHS=0 keeps 404s but tracks nothing."""
+    monkeypatch.setattr(TestingConfig, "NOT_FOUND_TOP_PATHS", 0)
+    app = create_app("testing")
+    assert get_top_paths(app) is None
+    client = app.test_client()
+    for _ in range(2):
+        assert client.get("/.env").get_json()["status"] == 404
@@ -0,0 +1,79 @@
+"""Tests for the raw WSGI fast lane."""
+
+from config import TestingConfig
+from src.app import create_app
+from src.fast_lane import get_fast_lane
+
+
+def count_calls(app, endpoint):
+    """Wrap a view to count how often Flask runs it."""
+    calls = []
+    view = app.view_functions[endpoint]
+
+    def counted(*args, **kwargs):
+        calls.append(1)
+        return view(*args, **kwargs)
+
+    app.view_functions[endpoint] = counted
+    return calls
+
+
+def test_marked_routes_are_registered(app):
+    """Test routes marked with @fast_lane are in the table."""
+    routes = get_fast_lane(app)
+    assert {"/health", "/robots.txt", "/json", "/xml", "/html"} <= set(routes)
+    assert "/get" not in routes
+
+
+def test_repeated_requests_skip_flask(app, client):
+    """Test only the first request of a fast lane route runs the view."""
+    calls = count_calls(app, "main.health")
+    first = client.get("/health")
+    second = client.get("/health")
+    assert len(calls) == 1
+    assert second.status_code == 200
+    assert second.data == first.data
+    assert second.headers["Content-Type"] == first.headers["Content-Type"]
+
+    head = client.head("/health")
+    assert head.status_code == 200
+    assert head.data == b""
+    assert len(calls) == 1
+
+
+def test_query_string_goes_through_flask(app, client):
+    """Test requests with a query string are not answered by the fast lane."""
+    calls = count_calls(app, "main.health")
+    client.get("/health").data
+    client.get("/health?pretty").data
+    assert len(calls) == 2
+
+
+def test_ttl_renders_again(app, client):
+    """Test an expired response is rendered again."""
+    calls = count_calls(app, "request_format.return_json")
+    client.get("/json").data
+    client.get("/json").data
+    assert len(calls) == 1
+    get_fast_lane(app)["/json"].expires = 0
+    client.get("/json").data
+    assert len(calls) == 2
+
+
+def test_fast_lane_requests_are_counted(app, client):
+    """Test requests answered by the fast lane still reach the metrics."""
+    for _ in range(3):
+        client.get("/robots.txt").data
+    text = client.get("/metrics").get_data(as_text=True)
+    assert (
+        'httpilot_requests_total{blueprint="request_format",'
+        'endpoint="request_format.robots",method="GET",status_class="2xx"} 3'
+    ) in text
+
+
+def test_disabled(monkeypatch):
+    """Test FAST_LANE=0 serves everything through Flask."""
+    monkeypatch.setattr(TestingConfig, "FAST_LANE", False)
+    app = create_app("testing")
+    assert get_fast_lane(app) is None
+    assert app.test_client().get("/health").status_code == 200
@@ -0,0 +1,123 @@
+"""Tests for the implicit link graph behind /graph/<seed>/<node>."""
+
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from src.routes.graph import DEAD, OK, SLOW, Graph
+
+LINK = re.compile(r"<a href='/graph/(\d+)/(\d+)([^']*)'>([^<]+)</a>")
+
+
+def test_every_node_has_one_parent():
+    """Test the graph is a tree below the root links, reachable from node 0."""
+    graph = Graph(7, degree=3, depth=5)
+    seen = {0}
+    frontier = [0]
+    while frontier:
+        node = frontier.pop()
+        for child in graph.children(node):
+            assert child not in seen
+            assert graph.parent(child) == node
+            seen.add(child)
+            frontier.append(child)
+    assert seen == set(range(graph.size))
+    assert graph.size == 364
+
+
+def test_large_graph_is_deterministic():
+    """Test a graph of millions of nodes is computed, not stored."""
+    graph = Graph(42)
+    assert graph.size == 1111111
+    rng = random.Random(0)
+    for node in rng.sample(range(1, graph.size), 200):
+        assert node in graph.children(graph.parent(node))
+    assert Graph(42).children(12345) == graph.children(12345)
+    assert Graph(43).children(12345) != graph.children(12345)
+
+
+def test_extra_links():
+    """Test extra links are deterministic, capped by degree and shared."""
+    graph = Graph(7, degree=3, depth=5)
+    assert graph.extra_links(12) == Graph(7, degree=3, depth=5).extra_links(12)
+    assert len(Graph(7, degree=1, depth=5, extra=4).extra_links(3)) == 1
+    assert Graph(7, degree=3, depth=5, extra=0).extra_links(12) == []
+
+    in_degree = Counter()
+    for node in range(graph.size):
+        in_degree.update(graph.children(node) + graph.extra_links(node))
+    assert all(0 <= target < graph.size for target in in_degree)
+    assert max(in_degree.values()) > 1
+
+
+def test_dead_and_slow_shares():
+    """Test the shares of dead and slow nodes follow the parameters."""
+    graph = Graph(1, dead=0.1, slow=0.2)
+    kinds = [graph.kind(node) for node in range(1, 20001)]
+    assert graph.kind(0) == OK
+    assert 0.08 < kinds.count(DEAD) / len(kinds) < 0.12
+    assert 0.18 < kinds.count(SLOW) / len(kinds) < 0.22
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"degree": 0},
+        {"degree": 201},
+        {"depth": 101},
+        {"degree": 100, "depth": 10},
+        {"dead": 0.7, "slow": 0.5},
+        {"delay": 11},
+        {"extra": -1},
+    ],
+)
+def test_invalid_parameters(params):
+    """Test out of range parameters are rejected."""
+    with pytest.raises(ValueError):
+        Graph(1, **params)
+
+
+def test_graph_page(client):
+    """Test a page links its children and its parent with the same parameters."""
+    query = "?degree=4&depth=3&dead=0&slow=0"
+    response = client.get(f"/graph/5/3{query}")
+    assert response.status_code == 200
+    assert response.mimetype == "text/html"
+
+    links = LINK.findall(response.data.decode())
+    graph = Graph(5, degree=4, depth=3, dead=0, slow=0)
+    expected = [0] + graph.children(3) + graph.extra_links(3)
+    assert [int(node) for _, node, _, _ in links] == expected
+    assert links[0][3] == "up"
+    assert {link[2] for link in links} == {"?degree=4&amp;depth=3&amp;dead=0.0&amp;slow=0.0"}
+
+    leaf = graph.children(graph.children(3)[0])[0]
+    html = client.get(f"/graph/5/{leaf}{query}").data.decode()
+    assert len(LINK.findall(html)) == 1 + 2
+
+
+def test_graph_dead_and_missing_nodes(client):
+    """Test dead nodes and nodes beyond the graph are 404."""
+    graph = Graph(9)
+    dead = next(node for node in range(1, 10000) if graph.kind(node) == DEAD)
+    assert client.get(f"/graph/9/{dead}").status_code == 404
+    assert client.get(f"/graph/9/{graph.size}").status_code == 404
+
+
+def test_graph_slow_nodes(client, monkeypatch):
+    """Test slow nodes wait for the delay."""
+    sleeps = []
+    monkeypatch.setattr("src.routes.dynamic_data.time.sleep", sleeps.append)
+    graph = Graph(9, delay=0.5)
+    slow = next(node for node in range(1, 10000) if graph.kind(node) == SLOW)
+    assert client.get(f"/graph/9/{slow}?delay=0.5").status_code == 200
+    assert sleeps == [0.5]
+
+
+def test_graph_invalid_parameters(client):
+    """Test invalid parameters are a 400 with an error message."""
+    response = client.get("/graph/1/0?degree=abc")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "degree must be a number"}
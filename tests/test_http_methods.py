@@ -85,3 +85,248 @@ def test_options_method(client):
     assert "Allow" in response.headers
     data = json.loads(response.data)
     assert data["method"] == "OPTIONS"
+
+
+def test_get_fields_projection(client):
+    """Test ?fields= returns only the requested keys."""
+    response = client.get("/get?fields=headers,args&x=1")
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert set(data) == {"headers", "args"}
+    assert data["args"]["x"] == "1"
+
+
+def test_get_fields_unknown_ignored(client):
+    """Test unknown fields are ignored rather than rejected."""
+    response = client.get("/get?fields=method,nope")
+    assert response.status_code == 200
+    assert json.loads(response.data) == {"method": "GET"}
+
+
+def test_post_fields_apply_to_body_keys(client):
+    """Test ?fields= also filters keys added by the view."""
+    response = client.post("/post?fields=json", json={"key": "value"})
+    assert response.status_code == 200
+    assert json.loads(response.data) == {"json": {"key": "value"}}
+
+
+def test_request_info_is_lazy(app, monkeypatch):
+    """Test sections are only computed when read."""
+    from src.routes.http_methods import RequestInfo, get_request_info
+
+    calls = []
+    sections = dict(RequestInfo.sections)
+    sections["headers"] = lambda req: calls.append("headers") or dict(req.headers)
+    monkeypatch.setattr(RequestInfo, "sections", sections)
+
+    with app.test_request_context("/get?fields=method"):
+        info = get_request_info()
+        assert dict(info) == {"method": "GET"}
+        assert calls == []
+
+    with app.test_request_context("/get"):
+        info = get_request_info()
+        assert calls == []
+        info["headers"]
+        info["headers"]
+        assert calls == ["headers"]
+
+
+def test_request_info_mapping_behaviour(app):
+    """Test RequestInfo behaves like a dict for views."""
+    from src.routes.http_methods import get_request_info
+
+    with app.test_request_context("/get?a=1"):
+        info = get_request_info()
+        info["extra"] = 1
+        assert list(info) == [
+            "method", "url", "args", "headers", "origin", "timestamp", "extra"
+        ]
+        del info["headers"]
+        assert "headers" not in info
+        assert info["args"] == {"a": "1"}
+
+
+def test_request_info_set_after_delete(app):
+    """Test keys set after a deletion are kept, including deleted ones."""
+    from src.routes.http_methods import get_request_info
+
+    with app.test_request_context("/get?fields=url,json,headers"):
+        info = get_request_info()
+        del info["url"]
+        info["json"] = 1
+        assert "json" in info
+        assert dict(info) == {"headers": info["headers"], "json": 1}
+        info["url"] = "set"
+        assert info["url"] == "set"
+        del info["json"]
+        assert list(info) == ["headers", "url"]
+
+
+def test_post_body_stats(client):
+    """Test POST reports size and digests of the body."""
+    import hashlib
+    import zlib
+
+    payload = b"hello world" * 100
+    response = client.post(
+        "/post", data=payload, content_type="application/octet-stream"
+    )
+    assert response.status_code == 200
+    body = json.loads(response.data)["body"]
+    assert body["size"] == len(payload)
+    assert body["sha256"] == hashlib.sha256(payload).hexdigest()
+    assert body["md5"] == hashlib.md5(payload).hexdigest()
+    assert body["crc32"] == f"{zlib.crc32(payload):08x}"
+    assert body["truncated"] is False
+    assert body["throughput"] >= 0
+
+
+def test_post_large_body_echoes_prefix(app):
+    """Test bodies over the echo limit are hashed but only partly echoed."""
+    import hashlib
+
+    app.config["BODY_ECHO_LIMIT"] = 1024
+    app.config["BODY_CHUNK_SIZE"] = 4096
+    payload = b"x" * 100000
+    response = app.test_client().post(
+        "/post", data=payload, content_type="text/plain"
+    )
+    data = json.loads(response.data)
+    assert data["body"]["size"] == len(payload)
+    assert data["body"]["sha256"] == hashlib.sha256(payload).hexdigest()
+    assert data["body"]["truncated"] is True
+    assert data["data"] == "x" * 1024
+
+
+def test_post_large_json_reports_error(app):
+    """Test JSON over the echo limit is not parsed."""
+    app.config["BODY_ECHO_LIMIT"] = 16
+    response = app.test_client().post("/post", json={"key": "x" * 100})
+    data = json.loads(response.data)
+    assert "json" not in data
+    assert "echo limit" in data["json_error"]
+
+
+def test_post_large_form_reports_error(app):
+    """Test a form over the echo limit gets a form_error like JSON does."""
+    app.config["BODY_ECHO_LIMIT"] = 16
+    response = app.test_client().post("/post", data={"key": "x" * 100})
+    data = json.loads(response.data)
+    assert "form" not in data
+    assert "data" not in data
+    size = data["body"]["size"]
+    assert data["form_error"] == (
+        f"body of {size} bytes exceeds the echo limit of 16 bytes"
+    )
+
+
+def test_post_digest_selection(client):
+    """Test ?digest= limits the digests computed."""
+    response = client.post("/post?digest=crc32", data=b"abc")
+    body = json.loads(response.data)["body"]
+    assert "crc32" in body
+    assert "sha256" not in body and "md5" not in body
+
+    response = client.post("/post?digest=none", data=b"abc")
+    body = json.loads(response.data)["body"]
+    assert body["size"] == 3
+    assert "crc32" not in body
+
+
+def test_post_binary_data(client):
+    """Test non UTF-8 bodies are summarized."""
+    response = client.post(
+        "/post", data=b"\xff\xfe\x00", content_type="application/octet-stream"
+    )
+    data = json.loads(response.data)
+    assert data["data"] == "<binary data, 3 bytes>"
+
+
+def test_post_truncated_multibyte_prefix(app):
+    """Test a prefix cut inside a UTF-8 character is still decoded."""
+    app.config["BODY_ECHO_LIMIT"] = 4
+    response = app.test_client().post(
+        "/post", data="abcé€".encode("utf-8"), content_type="text/plain"
+    )
+    assert json.loads(response.data)["data"] == "abc"
+
+
+def test_put_and_patch_body_stats(client):
+    """Test PUT and PATCH report body statistics."""
+    response = client.put("/put", data=b"12345")
+    data = json.loads(response.data)
+    assert data["body"]["size"] == 5
+    assert data["data"] == "12345"
+
+    response = client.patch("/patch", json={"a": 1})
+    data = json.loads(response.data)
+    assert data["json"] == {"a": 1}
+    assert "data" not in data
+    assert data["body"]["size"] > 0
+
+
+def test_sink_counts_bytes(client):
+    """Test the sink reports the size of a discarded body."""
+    payload = b"z" * 300000
+    response = client.post("/sink", data=payload)
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data["size"] == len(payload)
+    assert data["content_length"] == len(payload)
+    assert data["method"] == "POST"
+    assert data["reads"] >= 2
+    assert data["ttfb"] is not None
+    assert "data" not in data
+
+
+def test_sink_any_method(client):
+    """Test the sink accepts every method, with or without a body."""
+    for method in ["GET", "PUT", "PATCH", "DELETE", "OPTIONS"]:
+        response = client.open("/sink", method=method, data=b"abc")
+        assert response.status_code == 200
+        assert json.loads(response.data)["size"] == 3
+
+    response = client.get("/sink")
+    data = json.loads(response.data)
+    assert data["size"] == 0
+    assert data["ttfb"] is None
+
+
+def test_sink_chunked_body(client):
+    """Test bodies without Content-Length (chunked) are drained to the end."""
+    import io
+
+    response = client.post(
+        "/sink",
+        input_stream=io.BytesIO(b"q" * 70000),
+        headers={"Transfer-Encoding": "chunked"},
+        environ_overrides={"wsgi.input_terminated": True},
+    )
+    data = json.loads(response.data)
+    assert data["size"] == 70000
+    assert data["chunked"] is True
+
+
+def test_drain_reports_stalls():
+    """Test slow reads are reported as stalls."""
+    import time
+    from src.routes.body import drain
+
+    class SlowStream:
+        def __init__(self):
+            self.chunks = [b"a" * 10, b"b" * 10, b"c" * 10]
+
+        def read(self, size):
+            if not self.chunks:
+                return b""
+            if len(self.chunks) == 1:
+                time.sleep(0.05)
+            return self.chunks.pop(0)
+
+    stats = drain(SlowStream(), 1024, stall_threshold=0.02).to_dict()
+    assert stats["size"] == 30
+    assert stats["reads"] == 3
+    assert stats["stalls"]["count"] == 1
+    assert stats["stalls"]["intervals"][0]["offset"] == 20
+    assert stats["stalls"]["longest"] >= 0.02
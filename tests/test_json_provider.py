@@ -0,0 +1,98 @@
+"""Tests for the JSON provider."""
+
+import json
+import uuid
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from src import json_provider
+
+
+@pytest.fixture
+def compact_app(app):
+    """App with debug off, as in production."""
+    app.debug = False
+    return app
+
+
+def test_provider_installed(app):
+    """Test create_app installs the fast provider."""
+    assert isinstance(app.json, json_provider.FastJSONProvider)
+
+
+def test_compact_output_by_default(compact_app):
+    """Test responses are compact outside of debug mode."""
+    response = compact_app.test_client().get("/get?a=1")
+    assert response.status_code == 200
+    body = response.data.decode("utf-8")
+    assert "\n  " not in body
+    assert '"method":"GET"' in body
+    assert json.loads(body)["args"] == {"a": "1"}
+
+
+def test_pretty_query_parameter(compact_app):
+    """Test ?pretty switches to indented output."""
+    response = compact_app.test_client().get("/get?pretty")
+    body = response.data.decode("utf-8")
+    assert '\n  "method": "GET"' in body
+
+
+def test_pretty_query_parameter_false(compact_app):
+    """Test ?pretty=false keeps compact output."""
+    response = compact_app.test_client().get("/get?pretty=false")
+    assert "\n  " not in response.data.decode("utf-8")
+
+
+def test_debug_mode_is_pretty(client):
+    """Test debug mode (testing config) keeps indented output."""
+    response = client.get("/health")
+    assert b'\n  "status": "ok"' in response.data
+
+
+def test_keys_not_sorted(compact_app):
+    """Test JSON_SORT_KEYS = False keeps insertion order."""
+    with compact_app.app_context():
+        assert compact_app.json.dumps({"b": 1, "a": 2}) == '{"b":1,"a":2}'
+
+
+def test_stdlib_fallback_matches(compact_app, monkeypatch):
+    """Test output decodes the same without orjson installed."""
+    data = {"id": uuid.UUID(int=1), "text": "héllo", "list": (1, 2), "none": None}
+    with compact_app.app_context():
+        fast = compact_app.json.response(data).get_data(as_text=True)
+        monkeypatch.setattr(json_provider, "orjson", None)
+        slow = compact_app.json.response(data).get_data(as_text=True)
+
+    assert json.loads(fast) == json.loads(slow)
+    assert json.loads(fast)["id"] == "00000000-0000-0000-0000-000000000001"
+
+
+def test_multidict_uses_first_values(compact_app):
+    """Test dict subclasses are serialized through items()."""
+    data = MultiDict([("a", "1"), ("a", "2"), ("b", "3")])
+    with compact_app.app_context():
+        assert json.loads(compact_app.json.dumps(data)) == {"a": "1", "b": "3"}
+
+
+def test_large_integer_falls_back(compact_app):
+    """Test integers orjson rejects are still serialized."""
+    with compact_app.app_context():
+        compact = compact_app.json.dumps({"n": 2**70, "a": [1]})
+        indented = compact_app.json.dumps({"n": 2**70}, indent=4)
+    assert compact == '{"n":1180591620717411303424,"a":[1]}'
+    assert indented == '{\n  "n": 1180591620717411303424\n}'
+
+
+def test_loads_accepts_stdlib_extensions(compact_app):
+    """Test loads falls back to the stdlib for NaN and big integers."""
+    with compact_app.app_context():
+        assert compact_app.json.loads('{"n": 18446744073709551616}')["n"] == 2**64
+        value = compact_app.json.loads("[NaN]")[0]
+        assert value != value
+
+
+def test_post_json_roundtrip(compact_app):
+    """Test request JSON is parsed by the provider."""
+    response = compact_app.test_client().post("/post", json={"key": "välue"})
+    assert response.status_code == 200
+    assert json.loads(response.data)["json"] == {"key": "välue"}
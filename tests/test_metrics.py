@@ -0,0 +1,290 @@
+"""Tests for request metrics."""
+
+import os
+import threading
+import time
+
+from src.metrics import Registry, get_registry
+
+
+def sample(text, name, **labels):
+    """Return the value of one sample line from a metrics exposition."""
+    for line in text.splitlines():
+        if line.startswith("#") or not line.startswith(name):
+            continue
+        series, value = line.rsplit(" ", 1)
+        if series.split("{")[0] != name:
+            continue
+        if all(f'{k}="{v}"' in series for k, v in labels.items()):
+            return float(value)
+    return None
+
+
+def test_metrics_endpoint(client):
+    """Test /metrics serves the Prometheus text format."""
+    client.get("/get").data
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = response.data.decode("utf-8")
+    assert "# TYPE httpilot_requests_total counter" in text
+    assert "# TYPE httpilot_request_duration_seconds histogram" in text
+
+
+def test_request_counts_by_endpoint_and_status(client):
+    """Test requests are counted per endpoint and status class."""
+    # Requests are finished once their body has been read.
+    for _ in range(3):
+        client.get("/get").data
+    client.get("/status/404").data
+    client.get("/no-such-path").data
+
+    text = client.get("/metrics").data.decode("utf-8")
+    assert sample(
+        text,
+        "httpilot_requests_total",
+        blueprint="http_methods",
+        endpoint="http_methods.view_get",
+        status_class="2xx",
+    ) == 3
+    assert sample(
+        text,
+        "httpilot_requests_total",
+        endpoint="status_codes.status_code",
+        status_class="4xx",
+    ) == 1
+    assert sample(
+        text, "httpilot_requests_total", endpoint="unmatched", status_class="4xx"
+    ) == 1
+
+
+def test_unknown_methods_share_a_label(client):
+    """Test methods outside the HTTP standard are counted as "other"."""
+    for method in ("FOO", "BAR", "get"):
+        client.open("/anything", method=method).data
+    client.open("/anything", method="PATCH").data
+
+    text = client.get("/metrics").data.decode("utf-8")
+    assert sample(text, "httpilot_requests_total", method="other") == 3
+    assert sample(text, "httpilot_requests_total", method="PATCH") == 1
+    assert 'method="FOO"' not in text
+
+
+def test_latency_histogram_is_cumulative(client):
+    """Test histogram buckets are cumulative and match the count."""
+    for _ in range(4):
+        client.get("/health").data
+
+    text = client.get("/metrics").data.decode("utf-8")
+    endpoint = "main.health"
+    count = sample(text, "httpilot_request_duration_seconds_count", endpoint=endpoint)
+    assert count == 4
+    assert sample(
+        text, "httpilot_request_duration_seconds_bucket", endpoint=endpoint, le="+Inf"
+    ) == 4
+
+    buckets = [
+        float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines()
+        if line.startswith("httpilot_request_duration_seconds_bucket")
+        and f'endpoint="{endpoint}"' in line
+    ]
+    assert buckets == sorted(buckets)
+
+
+def test_byte_counters(client):
+    """Test request and response bytes are counted, including streams."""
+    client.post("/post", data=b"x" * 1000).data
+    response = client.get("/stream-bytes/5000")
+    assert len(response.data) == 5000
+
+    text = client.get("/metrics").data.decode("utf-8")
+    assert sample(
+        text, "httpilot_request_bytes_total", endpoint="http_methods.test_post"
+    ) == 1000
+    assert sample(
+        text,
+        "httpilot_response_bytes_total",
+        endpoint="dynamic_data.stream_random_bytes",
+    ) == 5000
+
+
+def test_chunked_request_bytes_are_counted(client):
+    """Test bodies without Content-Length count the bytes the app read."""
+    import io
+
+    for path in ("/sink", "/post"):
+        client.post(
+            path,
+            input_stream=io.BytesIO(b"q" * 70000),
+            headers={"Transfer-Encoding": "chunked"},
+            # The test client would fill in CONTENT_LENGTH from the stream
+            environ_overrides={"wsgi.input_terminated": True, "CONTENT_LENGTH": ""},
+        ).data
+
+    text = client.get("/metrics").data.decode("utf-8")
+    for endpoint in ("http_methods.sink", "http_methods.test_post"):
+        assert sample(text, "httpilot_request_bytes_total", endpoint=endpoint) == 70000
+
+
+def test_in_flight_gauge_returns_to_zero(client):
+    """Test the in-flight gauge is decremented when streams finish."""
+    client.get("/get").data
+    with client.get("/stream/2") as response:
+        response.data
+
+    text = client.get("/metrics").data.decode("utf-8")
+    assert sample(
+        text, "httpilot_requests_in_flight", endpoint="http_methods.view_get"
+    ) == 0
+    assert sample(
+        text, "httpilot_requests_in_flight", endpoint="dynamic_data.stream_n_messages"
+    ) == 0
+
+
+def test_metrics_disabled():
+    """Test METRICS_ENABLED = False installs nothing."""
+    from flask import Flask
+    from src import metrics
+
+    app = Flask(__name__)
+    app.config["METRICS_ENABLED"] = False
+    metrics.init_app(app)
+    assert get_registry(app) is None
+    assert app.test_client().get("/metrics").status_code == 404
+
+
+def test_registry_sums_thread_shards():
+    """Test values recorded from several threads are summed."""
+    registry = Registry()
+    registry.describe("hits_total", "counter", "Hits.")
+
+    def work():
+        for _ in range(1000):
+            registry.inc("hits_total", (("t", "x"),))
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.collect()[("hits_total", (("t", "x"),))] == 8000
+    # Dead threads' shards are folded into the retired totals.
+    registry.inc("hits_total", (("t", "x"),))
+    assert len(registry._shards) == 1
+    assert registry.collect()[("hits_total", (("t", "x"),))] == 8001
+
+
+def test_registry_collectors():
+    """Test collector samples are included in the exposition."""
+    registry = Registry()
+    registry.describe("queue_depth", "gauge", "Depth.")
+    registry.add_collector(lambda: [("queue_depth", (), 7)])
+    assert "queue_depth 7" in registry.exposition()
+
+
+def test_shared_registry_aggregates_workers(tmp_path):
+    """Test values written by several processes are summed on collect."""
+    from src.shared_metrics import SharedRegistry, mark_process_dead
+
+    registry = SharedRegistry(str(tmp_path))
+    registry.describe("hits_total", "counter", "Hits.")
+    registry.describe("busy", "gauge", "Busy.")
+    registry.inc("hits_total")
+
+    pids = []
+    for _ in range(2):
+        pid = os.fork()
+        if pid == 0:
+            registry.inc("hits_total", amount=10)
+            registry.inc("busy")
+            os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    values = registry.collect()
+    assert values[("hits_total", ())] == 21
+    assert values[("busy", ())] == 2
+
+    # Exited workers keep their counters but not their gauges.
+    for pid in pids:
+        mark_process_dead(pid, str(tmp_path))
+    values = registry.collect()
+    assert values[("hits_total", ())] == 21
+    assert values.get(("busy", ()), 0) == 0
+    assert set(os.listdir(tmp_path)) == {
+        "archive.lock",
+        "counter_archive.db",
+        f"counter_{os.getpid()}.db",
+        f"gauge_{os.getpid()}.db",
+    }
+
+
+def test_shared_registry_sums_collectors(tmp_path):
+    """Test collector samples of every worker are summed, not overwritten."""
+    from src.shared_metrics import SharedRegistry, mark_process_dead
+
+    registry = SharedRegistry(str(tmp_path), publish_interval=0.01)
+    registry.describe("dropped_total", "counter", "Dropped.")
+    registry.describe("depth", "gauge", "Depth.")
+    state = {"dropped": 1, "depth": 1}
+    registry.add_collector(
+        lambda: [("dropped_total", (), state["dropped"]), ("depth", (), state["depth"])]
+    )
+
+    pids = []
+    for _ in range(2):
+        pid = os.fork()
+        if pid == 0:
+            state["dropped"], state["depth"] = 5, 2
+            # The first sample starts the publisher thread of the worker.
+            registry.inc("hits_total")
+            state["dropped"] = 10
+            time.sleep(0.2)
+            os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    values = registry.collect()
+    assert values[("dropped_total", ())] == 21
+    assert values[("depth", ())] == 5
+
+    for pid in pids:
+        mark_process_dead(pid, str(tmp_path))
+    state["dropped"] = 2
+    values = registry.collect()
+    assert values[("dropped_total", ())] == 22
+    assert values[("depth", ())] == 1
+
+
+def test_shared_registry_file_grows(tmp_path):
+    """Test many series fit after the file is resized."""
+    from src.shared_metrics import SharedRegistry, read_values
+
+    registry = SharedRegistry(str(tmp_path))
+    for i in range(3000):
+        registry.observe("latency_seconds", (("endpoint", f"e{i}"),), 0.01)
+
+    values = registry.collect()
+    assert values[("latency_seconds_count", (("endpoint", "e2999"),))] == 1
+    path = tmp_path / f"counter_{os.getpid()}.db"
+    assert len(read_values(str(path))) == 3 * 3000
+
+
+def test_metrics_dir_shares_between_apps(tmp_path, monkeypatch):
+    """Test apps with the same METRICS_DIR report each other's requests."""
+    from config import TestingConfig
+    from src.app import create_app
+
+    monkeypatch.setattr(TestingConfig, "METRICS_DIR", str(tmp_path))
+    clients = [create_app("testing").test_client() for _ in range(2)]
+    for client in clients:
+        client.get("/get").data
+
+    text = clients[0].get("/metrics").data.decode("utf-8")
+    assert sample(
+        text, "httpilot_requests_total", endpoint="http_methods.view_get"
+    ) == 2
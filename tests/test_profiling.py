@@ -0,0 +1,88 @@
+"""Tests for on-demand request profiling."""
+
+import marshal
+import pytest
+
+from config import TestingConfig
+from src.app import create_app
+from src.profiling import get_profiler
+
+SECRET = "s3cret"
+
+
+@pytest.fixture
+def debug_app(monkeypatch):
+    """App with DEBUG_SECRET set."""
+    monkeypatch.setattr(TestingConfig, "DEBUG_SECRET", SECRET)
+    return create_app("testing")
+
+
+@pytest.fixture
+def debug_client(debug_app):
+    """Client of the app with DEBUG_SECRET set."""
+    return debug_app.test_client()
+
+
+def profile_headers(fmt, **extra):
+    """Return the headers requesting a profile in fmt."""
+    return {"X-Debug-Secret": SECRET, "X-Profile": fmt, **extra}
+
+
+def test_not_installed_without_secret(app, client):
+    """Test nothing is installed when DEBUG_SECRET is unset."""
+    assert get_profiler(app) is None
+    response = client.get("/get", headers=profile_headers("pstats"))
+    assert response.is_json
+    assert client.get("/debug/profiles/x").status_code == 404
+
+
+def test_wrong_secret_is_ignored(debug_client):
+    """Test the profile header is ignored without the right secret."""
+    headers = profile_headers("pstats", **{"X-Debug-Secret": "nope"})
+    response = debug_client.get("/get", headers=headers)
+    assert response.is_json
+
+
+def test_pstats_replaces_body(debug_client):
+    """Test X-Profile: pstats returns the cProfile report."""
+    response = debug_client.get("/status/418", headers=profile_headers("pstats"))
+    assert response.status_code == 200
+    assert response.headers["X-Profile-Status"] == "418"
+    assert b"function calls" in response.data
+    assert b"status_code" in response.data
+
+
+def test_prof_dump(debug_client):
+    """Test X-Profile: prof returns a loadable cProfile dump."""
+    response = debug_client.get("/get", headers=profile_headers("prof"))
+    stats = marshal.loads(response.data)
+    assert any(func[2] == "view_get" for func in stats)
+
+
+def test_collapsed_covers_streaming_body(debug_client):
+    """Test sampled stacks include the streaming generator of /drip."""
+    response = debug_client.get(
+        "/drip?duration=0.2&numbytes=4", headers=profile_headers("collapsed")
+    )
+    assert response.status_code == 200
+    lines = response.data.decode("utf-8").splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("dynamic_data:" in line for line in lines)
+
+
+def test_attach_mode(debug_client):
+    """Test attach mode keeps the response and stores the profile."""
+    response = debug_client.get(
+        "/get", headers=profile_headers("pstats", **{"X-Profile-Mode": "attach"})
+    )
+    assert response.is_json
+    profile_id = response.headers["X-Profile-Id"]
+
+    stored = debug_client.get(
+        f"/debug/profiles/{profile_id}", headers={"X-Debug-Secret": SECRET}
+    )
+    assert stored.status_code == 200
+    assert b"function calls" in stored.data
+    assert debug_client.get(f"/debug/profiles/{profile_id}").status_code == 404
@@ -226,11 +226,8 @@ def test_redirect_to_with_encoded_url(client):
 
 def test_redirect_zero_times(client):
     """Test redirect with zero times (edge case)."""
-    # The implementation has assert n > 0, which causes AssertionError
-    # This test will raise an exception, so we skip it as it tests invalid server behavior
-    import pytest
-
-    pytest.skip("Implementation asserts n > 0, causing unhandled exception")
+    for path in ("/redirect/0", "/absolute-redirect/0", "/relative-redirect/0"):
+        assert client.get(path).status_code == 404
 
 
 def test_redirect_negative_times(client):
@@ -297,3 +294,87 @@ def test_redirect_response_body(client):
             response.data.decode("utf-8")
         except UnicodeDecodeError:
             pytest.fail("Redirect response body is not valid UTF-8")
+
+
+def test_redirect_chain_follows_to_get(client):
+    """Test a chain counts down to /get."""
+    response = client.get("/redirect-chain/3")
+    assert response.status_code == 302
+    assert response.headers["Location"] == "/redirect-chain/2"
+    assert client.get("/redirect-chain/1").headers["Location"] == "/get"
+
+    response = client.get("/redirect-chain/2000", follow_redirects=True)
+    assert response.status_code == 200
+    assert len(response.history) == 2000
+
+
+def test_redirect_chain_statuses(client):
+    """Test the status list is used in turn and carried over to each hop."""
+    statuses = [
+        client.get(f"/redirect-chain/{n}?status=301,307,308") for n in range(3, 0, -1)
+    ]
+    assert [response.status_code for response in statuses] == [301, 307, 308]
+    assert statuses[0].headers["Location"] == "/redirect-chain/2?status=301,307,308"
+    assert client.get("/redirect-chain/1?status=303").status_code == 303
+
+
+def test_redirect_chain_loop(client):
+    """Test the last hop of a loop goes back instead of to /get."""
+    response = client.get("/redirect-chain/1?loop=3")
+    assert response.headers["Location"] == "/redirect-chain/3?loop=3"
+
+
+def test_redirect_chain_hosts(client):
+    """Test hosts=1 alternates between the host aliases."""
+    base_url = "https://localhost:8443"
+    hosts = [
+        client.get(f"/redirect-chain/{n}?hosts=1", base_url=base_url).headers["Location"]
+        for n in (3, 2, 1)
+    ]
+    assert hosts == [
+        "https://127.0.0.1:8443/redirect-chain/2?hosts=1",
+        "https://localhost:8443/redirect-chain/1?hosts=1",
+        "https://127.0.0.1:8443/get",
+    ]
+
+
+def test_redirect_chain_delay(client, monkeypatch):
+    """Test every hop waits for the delay."""
+    sleeps = []
+    monkeypatch.setattr("src.routes.redirect.time.sleep", sleeps.append)
+    response = client.get("/redirect-chain/2?delay=0.25")
+    assert response.headers["Location"] == "/redirect-chain/1?delay=0.25"
+    assert sleeps == [0.25]
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/redirect-chain/3?status=200",
+        "/redirect-chain/3?delay=11",
+        "/redirect-chain/3?loop=abc",
+        "/redirect-chain/100001",
+    ],
+)
+def test_redirect_chain_invalid(client, path):
+    """Test invalid chains are a 400 with an error message."""
+    response = client.get(path)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+    assert client.get("/redirect-chain/0").status_code == 404
+
+
+def test_redirect_chain_uses_current_request_context(app, monkeypatch):
+    """Test a chain is built in the current request, without a nested context."""
+    from src.routes import redirect
+
+    monkeypatch.setattr(redirect, "_chains", {})
+    contexts = []
+    request_context = app.request_context
+    monkeypatch.setattr(
+        app, "request_context", lambda environ: contexts.append(1) or request_context(environ)
+    )
+    response = app.test_client().get("/redirect-chain/3?hosts=1")
+    assert response.status_code == 302
+    assert len(contexts) == 1
+    assert response.headers["Location"].startswith("http://127.0.0.1/redirect-chain/2")
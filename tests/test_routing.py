@@ -0,0 +1,57 @@
+"""Tests for lazily compiled URL builders."""
+
+import inspect
+
+import pytest
+from werkzeug.routing import Map, Rule
+
+from src import routing
+from src.app import create_app
+
+
+def test_werkzeug_still_has_the_builder_hook():
+    """Test Rule._compile_builder is still the private method LazyRule wraps.
+
+    If this fails, Werkzeug changed: LazyRule is no longer used and builders
+    are compiled eagerly again. Update src/routing.py for the new Werkzeug.
+    """
+    assert hasattr(Rule, "_compile_builder"), "Rule._compile_builder is gone"
+    parameters = list(inspect.signature(Rule._compile_builder).parameters)
+    assert parameters == ["self", "append_unknown"], parameters
+    assert routing.LAZY_BUILDERS
+    assert create_app("testing").url_rule_class is routing.LazyRule
+
+
+def test_builders_compile_on_first_use():
+    """Test LazyRule builds the same URLs as Rule, compiling on first build."""
+    lazy = routing.LazyRule("/items/<int:n>", endpoint="items")
+    eager = Rule("/items/<int:n>", endpoint="items")
+    lazy_urls = Map([lazy]).bind("example.com")
+    eager_urls = Map([eager]).bind("example.com")
+
+    stub = lazy._build_unknown
+    assert lazy_urls.build("items", {"n": 3, "q": "x"}) == "/items/3?q=x"
+    assert lazy._build_unknown is not stub
+    for values in ({"n": 3}, {"n": 4, "q": "x"}):
+        assert lazy_urls.build("items", values) == eager_urls.build("items", values)
+
+
+@pytest.mark.parametrize("hook", [None, lambda self: None])
+def test_falls_back_to_eager_builders(monkeypatch, hook):
+    """Test a missing or changed Rule._compile_builder selects the plain Rule."""
+    if hook is None:
+        monkeypatch.delattr(Rule, "_compile_builder")
+    else:
+        monkeypatch.setattr(Rule, "_compile_builder", hook)
+    assert routing._hook_supported() is False
+
+
+def test_eager_fallback_builds_urls(monkeypatch):
+    """Test the app builds URLs with the plain Rule when LazyRule is off."""
+    from flask import url_for
+
+    monkeypatch.setattr(routing, "LAZY_BUILDERS", False)
+    app = create_app("testing")
+    assert app.url_rule_class is Rule
+    with app.test_request_context():
+        assert url_for("redirect.redirect_times", n=2) == "/redirect/2"
@@ -0,0 +1,91 @@
+"""Tests for the continuous sampling profiler."""
+
+import pytest
+
+from config import TestingConfig
+from src.app import create_app
+from src.sampling import StackTrie, TRUNCATED, format_folded, get_sampler, render_svg
+
+SECRET = "s3cret"
+
+
+@pytest.fixture
+def sampled_app(monkeypatch):
+    """App with the sampling profiler running."""
+    monkeypatch.setattr(TestingConfig, "DEBUG_SECRET", SECRET)
+    monkeypatch.setattr(TestingConfig, "SAMPLING_PROFILER", True)
+    monkeypatch.setattr(TestingConfig, "SAMPLING_INTERVAL", 0.001)
+    app = create_app("testing")
+    yield app
+    get_sampler(app).stop()
+
+
+def test_trie_counts_and_folds():
+    """Test stacks share prefixes and fold back to their counts."""
+    trie = StackTrie(max_nodes=100)
+    trie.add(("a", "b", "c"))
+    trie.add(("a", "b", "c"))
+    trie.add(("a", "d"))
+    assert trie.nodes == 5
+    assert trie.samples == 3
+    assert format_folded(trie) == "a;b;c 2\na;d 1\n"
+
+
+def test_trie_is_bounded():
+    """Test stacks beyond max_nodes are counted under a truncated node."""
+    trie = StackTrie(max_nodes=3)
+    trie.add(("a", "b"))
+    trie.add(("a", "x", "y"))
+    assert trie.nodes == 3
+    assert dict(trie.items()) == {("a", "b"): 1, ("a", TRUNCATED): 1}
+
+
+def test_render_svg():
+    """Test the SVG has a frame per stack entry with escaped names."""
+    trie = StackTrie(max_nodes=100)
+    trie.add(("main", "f<x>"), 3)
+    svg = render_svg(trie)
+    assert svg.startswith("<svg")
+    assert "f&lt;x&gt; (3 samples, 100.00%)" in svg
+
+
+def test_flamegraph_disabled(client):
+    """Test /debug/flamegraph does not exist without DEBUG_SECRET."""
+    assert client.get("/debug/flamegraph").status_code == 404
+
+
+def test_flamegraph_samples_requests(sampled_app):
+    """Test request threads are sampled and served as folded stacks."""
+    client = sampled_app.test_client()
+    client.get("/drip?duration=0.3&numbytes=3").data
+
+    headers = {"X-Debug-Secret": SECRET}
+    folded = client.get("/debug/flamegraph?minutes=1", headers=headers)
+    assert folded.status_code == 200
+    assert "src.routes.dynamic_data:drip" in folded.data.decode("utf-8")
+
+    svg = client.get("/debug/flamegraph?format=svg", headers=headers)
+    assert svg.headers["Content-Type"] == "image/svg+xml"
+    assert b"<rect" in svg.data
+
+
+def test_request_finished_on_another_thread():
+    """Test a request finished by another thread stops its thread being sampled."""
+    import threading
+
+    from src.lifecycle import RequestRecord
+    from src.sampling import SamplingProfiler
+
+    sampler = SamplingProfiler()
+    record = RequestRecord(0, "GET", "/drip", "", "", 0)
+    sampler.request_started(record)
+    assert list(sampler.active) == [threading.get_ident()]
+
+    finisher = threading.Thread(target=sampler.request_finished, args=(record,))
+    finisher.start()
+    finisher.join()
+    assert sampler.active == {}
+
+    # A second finish (e.g. close() after iteration) changes nothing.
+    sampler.request_finished(record)
+    assert sampler.active == {}
@@ -0,0 +1,35 @@
+"""Tests for the gunicorn settings and the httpilot-serve wrapper."""
+
+from src.serve import environment, load_settings, parse_args
+
+
+def settings(argv, base):
+    return load_settings(environment(parse_args(argv), base))
+
+
+def test_default_settings():
+    """Test gthread workers sized from the CPUs with the app preloaded."""
+    config = settings([], {})
+    assert config["worker_class"] == "gthread"
+    assert config["wsgi_app"] == "wsgi:app"
+    assert config["workers"] >= 1
+    assert config["threads"] == 32
+    assert config["preload_app"] is True
+    # /delay allows 60 seconds
+    assert config["timeout"] > 60
+    assert config["bind"] == "0.0.0.0:8000"
+
+
+def test_settings_from_options():
+    """Test options and environment variables override the defaults."""
+    config = settings(["--worker-class", "sync", "--no-preload"], {"PORT": "5001"})
+    assert config["worker_class"] == "sync"
+    assert config["threads"] == 1
+    assert config["workers"] % 2 == 1
+    assert config["preload_app"] is False
+    assert config["bind"] == "0.0.0.0:5001"
+
+    config = settings(["--worker-class", "uvicorn", "--workers", "3"], {})
+    assert config["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert config["wsgi_app"] == "asgi:app"
+    assert config["workers"] == 3
@@ -0,0 +1,91 @@
+"""Tests for the Server-Timing header."""
+
+import pytest
+
+from config import TestingConfig
+from src.app import create_app
+
+
+@pytest.fixture
+def timed_client(monkeypatch):
+    """Client of an app with SERVER_TIMING enabled."""
+    monkeypatch.setattr(TestingConfig, "SERVER_TIMING", True)
+    return create_app("testing").test_client()
+
+
+def phases(response):
+    """Return {phase: duration in ms} from a Server-Timing header."""
+    result = {}
+    for entry in response.headers["Server-Timing"].split(","):
+        name, duration = entry.strip().split(";dur=")
+        result[name] = float(duration)
+    return result
+
+
+def test_disabled_by_default(client):
+    """Test no header is added unless SERVER_TIMING is set."""
+    assert "Server-Timing" not in client.get("/get").headers
+
+
+def test_json_response_phases(timed_client):
+    """Test a JSON view reports routing, handler, json and ttfb."""
+    response = timed_client.get("/get")
+    assert response.status_code == 200
+    timings = phases(response)
+    assert {"routing", "json", "handler", "ttfb"} <= set(timings)
+    assert all(duration >= 0 for duration in timings.values())
+    assert timings["ttfb"] >= timings["handler"]
+    # Request info sections are built while serializing, under "json".
+    assert "request_info" not in timings
+
+
+def test_compress_phase(timed_client):
+    """Test the compression filters are timed."""
+    response = timed_client.get("/gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "compress" in phases(response)
+
+
+def test_status_code_phase(timed_client):
+    """Test /status/<code> is timed."""
+    response = timed_client.get("/status/418")
+    assert response.status_code == 418
+    assert "status_code" in phases(response)
+
+
+def test_stream_ttfb(timed_client):
+    """Test streamed bodies are intact and report time to first byte."""
+    response = timed_client.get("/stream/3")
+    assert len(response.data.decode("utf-8").strip().split("\n")) == 3
+    assert "ttfb" in phases(response)
+
+
+def test_empty_body(timed_client):
+    """Test responses without a body still get the header."""
+    response = timed_client.head("/get")
+    assert response.data == b""
+    assert "ttfb" in phases(response)
+
+
+def test_legacy_write_is_kept():
+    """Test data passed to write() is sent in order, ahead of the body."""
+    from werkzeug.test import Client
+    from werkzeug.wrappers import Response
+
+    from src.server_timing import ServerTimingMiddleware
+
+    def legacy_app(environ, start_response):
+        write = start_response("200 OK", [("Content-Type", "text/plain")])
+        write(b"one ")
+        write(b"two ")
+
+        def body():
+            yield b"three "
+            write(b"four ")
+            yield b"five"
+
+        return body()
+
+    response = Client(ServerTimingMiddleware(legacy_app), Response).get("/")
+    assert response.data == b"one two three four five"
+    assert "ttfb" in response.headers["Server-Timing"]
@@ -0,0 +1,63 @@
+"""Startup time regression tests."""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+from bench.startup import ROOT, measure, plain_flask_app
+from src.app import create_app
+
+# Imported on first use only: codecs, profilers and compatibility shims.
+LAZY_MODULES = ("brotli", "gzip", "six", "decorator", "cProfile", "pstats")
+
+# Budgets are shares of Flask baselines measured in the same run, so a slow
+# or loaded machine slows both sides alike.
+# Import time HTTPilot adds on top of Flask, as a share of `import flask`
+# (10ms of 166ms when this was set, 11ms of about 50ms on a fast laptop)
+IMPORT_SHARE = 0.35
+# One create_app call, as a share of a plain Flask app with as many routes
+# (3ms of 18ms when this was set, thanks to LazyRule)
+CREATE_APP_SHARE = 0.5
+
+
+def fastest(f, rounds=5):
+    f()
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        f()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def test_optional_modules_are_not_imported():
+    """Test creating the app does not import modules only some requests need."""
+    code = (
+        "import json, sys; from src.app import create_app; create_app('testing'); "
+        "print(json.dumps(sorted(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules = set(json.loads(result.stdout))
+    assert not modules & set(LAZY_MODULES)
+    if not os.path.exists(os.path.join(ROOT, ".env")):
+        assert "dotenv" not in modules
+
+
+def test_create_app_budget():
+    """Test create_app stays cheap next to a plain Flask app of the same size."""
+    rules = len(list(create_app("testing").url_map.iter_rules()))
+    duration = fastest(lambda: create_app("testing"))
+    baseline = fastest(lambda: plain_flask_app(rules))
+    assert duration < CREATE_APP_SHARE * baseline, (duration, baseline)
+
+
+def test_import_budget():
+    """Test the import time added on top of Flask stays within budget."""
+    result = measure(rounds=3)
+    slowest = list(result["modules_us"].items())[:5]
+    budget = IMPORT_SHARE * result["flask_import_ms"]
+    assert result["import_overhead_ms"] < budget, (result["flask_import_ms"], slowest)
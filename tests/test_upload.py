@@ -0,0 +1,122 @@
+"""Tests for the streaming upload route."""
+
+import hashlib
+import io
+import json
+
+
+def test_upload_files_and_fields(client):
+    """Test each part is reported with size and digests."""
+    payload = b"0123456789" * 5000
+    response = client.post(
+        "/upload",
+        data={
+            "title": "hello",
+            "file": (io.BytesIO(payload), "data.bin", "application/octet-stream"),
+        },
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data["store"] == "hash"
+    assert data["size"] > len(payload)
+
+    parts = {part["name"]: part for part in data["parts"]}
+    assert parts["title"]["value"] == "hello"
+    assert parts["title"]["size"] == 5
+
+    upload = parts["file"]
+    assert upload["filename"] == "data.bin"
+    assert upload["content_type"] == "application/octet-stream"
+    assert upload["size"] == len(payload)
+    assert upload["sha256"] == hashlib.sha256(payload).hexdigest()
+    assert upload["md5"] == hashlib.md5(payload).hexdigest()
+    assert "value" not in upload
+    assert "spooled" not in upload
+
+
+def test_upload_multiple_files(app):
+    """Test several files are parsed across many small reads."""
+    app.config["BODY_CHUNK_SIZE"] = 1000
+    files = [(io.BytesIO(bytes([i]) * 20000), f"f{i}.bin") for i in range(5)]
+    response = app.test_client().post(
+        "/upload?digest=crc32",
+        data={"files": files},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200
+    parts = json.loads(response.data)["parts"]
+    assert [part["filename"] for part in parts] == [f"f{i}.bin" for i in range(5)]
+    assert all(part["size"] == 20000 for part in parts)
+    assert all("sha256" not in part and "crc32" in part for part in parts)
+
+
+def test_upload_spool(app):
+    """Test ?store=spool writes file parts up to the spool limit."""
+    app.config["UPLOAD_SPOOL_LIMIT"] = 1000
+    response = app.test_client().post(
+        "/upload?store=spool",
+        data={"file": (io.BytesIO(b"x" * 5000), "big.txt")},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200
+    part = json.loads(response.data)["parts"][0]
+    assert part["size"] == 5000
+    assert part["spooled"] == 1000
+    assert part["spool_truncated"] is True
+
+
+def test_upload_spool_small_file(client):
+    """Test small files are spooled completely."""
+    response = client.post(
+        "/upload?store=spool",
+        data={"file": (io.BytesIO(b"abc"), "small.txt")},
+        content_type="multipart/form-data",
+    )
+    part = json.loads(response.data)["parts"][0]
+    assert part["spooled"] == 3
+    assert part["spool_truncated"] is False
+
+
+def test_upload_requires_multipart(client):
+    """Test non-multipart bodies are rejected."""
+    response = client.post("/upload", data=b"abc", content_type="text/plain")
+    assert response.status_code == 400
+    assert "multipart" in json.loads(response.data)["error"]
+
+
+def test_upload_missing_boundary(client):
+    """Test a multipart content type without boundary is rejected."""
+    response = client.post(
+        "/upload", data=b"abc", content_type="multipart/form-data"
+    )
+    assert response.status_code == 400
+
+
+def test_upload_invalid_store(client):
+    """Test unknown store modes are rejected."""
+    response = client.post(
+        "/upload?store=memory",
+        data={"a": "b"},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 400
+
+
+def test_upload_truncated_body(client):
+    """Test a body without closing boundary is reported as invalid."""
+    body = b'--xyz\r\nContent-Disposition: form-data; name="a"\r\n\r\nvalue'
+    response = client.post(
+        "/upload", data=body, content_type="multipart/form-data; boundary=xyz"
+    )
+    assert response.status_code == 400
+    assert "invalid multipart body" in json.loads(response.data)["error"]
+
+
+def test_upload_put(client):
+    """Test PUT is accepted as well."""
+    response = client.put(
+        "/upload", data={"a": "b"}, content_type="multipart/form-data"
+    )
+    assert response.status_code == 200
+    assert json.loads(response.data)["parts"][0]["value"] == "b"
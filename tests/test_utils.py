@@ -0,0 +1,55 @@
+"""Tests for the shared route helpers."""
+
+import re
+from datetime import datetime, timezone
+
+from werkzeug.http import parse_date
+
+from src.routes.utils import Clock, http_date, url_template, utcnow
+
+
+def test_utcnow_format():
+    """Test timestamps are ISO 8601 UTC with a single Z."""
+    timestamp = utcnow()
+    assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}Z", timestamp)
+    parsed = datetime.fromisoformat(timestamp)
+    assert abs((datetime.now(timezone.utc) - parsed).total_seconds()) < 5
+
+
+def test_http_date_format():
+    """Test HTTP dates are IMF-fixdate."""
+    value = http_date()
+    assert re.fullmatch(r"\w{3}, \d\d \w{3} \d{4} \d\d:\d\d:\d\d GMT", value)
+    assert parse_date(value) is not None
+
+
+def test_clock_formats_each_second_once():
+    """Test the clock reuses the formatted second and keeps microseconds."""
+    now = [1_700_000_000_123_456_000]
+    clock = Clock(lambda: now[0])
+    assert clock.iso() == "2023-11-14T22:13:20.123456Z"
+    assert clock.http_date() == "Tue, 14 Nov 2023 22:13:20 GMT"
+    cached = clock._second
+
+    now[0] += 500_000_000
+    assert clock.iso() == "2023-11-14T22:13:20.623456Z"
+    assert clock._second is cached
+
+    now[0] += 500_000_000
+    assert clock.iso() == "2023-11-14T22:13:21.123456Z"
+    assert clock.http_date() == "Tue, 14 Nov 2023 22:13:21 GMT"
+
+
+def test_url_template(app):
+    """Test URL templates match url_for for each host and scheme."""
+    from flask import url_for
+
+    for base_url in ("http://localhost", "https://example.com:8443/root"):
+        with app.test_request_context("/", base_url=base_url):
+            relative = url_template("redirect.relative_redirect_n_times", "n")
+            assert relative(7) == url_for("redirect.relative_redirect_n_times", n=7)
+            external = url_template("dynamic_data.link_page", "offset", True, n=5)
+            assert external(2) == url_for(
+                "dynamic_data.link_page", n=5, offset=2, _external=True
+            )
+            assert url_template("http_methods.view_get")() == url_for("http_methods.view_get")